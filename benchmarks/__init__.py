@@ -0,0 +1,13 @@
+#
+# This file is part of the invenio-remote-api-provisioner package.
+# Copyright (C) 2024, MESH Research.
+#
+# invenio-remote-api-provisioner is free software; you can redistribute it
+# and/or modify it under the terms of the MIT License; see
+# LICENSE file for more details.
+
+"""Benchmarks for invenio-remote-api-provisioner.
+
+These are not part of the test suite. Run them from the repository root,
+e.g. ``python -m benchmarks.bench_request_compression``.
+"""
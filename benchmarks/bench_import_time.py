@@ -0,0 +1,172 @@
+#
+# This file is part of the invenio-remote-api-provisioner package.
+# Copyright (C) 2024, MESH Research.
+#
+# invenio-remote-api-provisioner is free software; you can redistribute it
+# and/or modify it under the terms of the MIT License; see
+# LICENSE file for more details.
+
+"""Measure the import time of the extension with ``python -X importtime``.
+
+Imports a module (``invenio_remote_api_provisioner.ext`` by default) in
+fresh interpreters, and reports the median cumulative import time of the
+module and the slowest modules the provisioner's own code imports.
+
+It also checks that the web side stays light: the worker-only modules
+must not be imported at all, and the provisioner's modules must not
+import the HTTP stack or the other libraries only the task needs. The
+script exits with status 1 if any such module is imported, or if the
+median import time exceeds ``--max-ms``, so it can gate a CI job.
+
+Usage::
+
+    python -m benchmarks.bench_import_time --runs 5 --max-ms 1500
+"""
+
+import argparse
+import statistics
+import subprocess
+import sys
+from dataclasses import dataclass
+
+PACKAGE = "invenio_remote_api_provisioner"
+
+# Provisioner modules only the Celery workers need
+WORKER_MODULES = (f"{PACKAGE}.tasks", f"{PACKAGE}.executors")
+
+# Libraries the provisioner's web-side modules must not import themselves
+# (they may still be imported by Invenio)
+LAZY_LIBRARIES = ("requests", "arrow", "jsonpatch", "jsonschema")
+
+
+@dataclass
+class ImportEntry:
+    """One line of ``-X importtime`` output."""
+
+    module: str
+    level: int
+    self_us: int
+    cumulative_us: int
+    parent: str | None = None
+
+
+def parse_importtime(output: str) -> list[ImportEntry]:
+    """Parse ``-X importtime`` output into entries, with their importers.
+
+    Modules are listed after the modules they import, indented one level
+    deeper, so the parent of each entry is the next entry one level up.
+    """
+    entries = []
+    for line in output.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:") :].split("|")
+        entries.append(
+            ImportEntry(
+                module=name.strip(),
+                level=(len(name) - len(name.lstrip()) - 1) // 2,
+                self_us=int(self_us),
+                cumulative_us=int(cumulative_us),
+            )
+        )
+    waiting: dict[int, list[ImportEntry]] = {}
+    for entry in entries:
+        for child in waiting.pop(entry.level + 1, []):
+            child.parent = entry.module
+        waiting.setdefault(entry.level, []).append(entry)
+    return entries
+
+
+def import_once(module: str) -> list[ImportEntry]:
+    """Import a module in a fresh interpreter and parse its import times."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+        check=False,
+    )
+    if result.returncode:
+        raise RuntimeError(f"Could not import {module}:\n{result.stderr}")
+    return parse_importtime(result.stderr)
+
+
+def find_eager_imports(entries: list[ImportEntry]) -> list[str]:
+    """Find the imports the web side should leave to the workers.
+
+    Returns:
+        list[str]: A description of each worker-only module imported,
+        and of each lazy library imported by a provisioner module.
+    """
+    problems = []
+    for entry in entries:
+        if entry.module in WORKER_MODULES:
+            problems.append(f"{entry.module} (imported by {entry.parent})")
+        elif (
+            entry.module.split(".")[0] in LAZY_LIBRARIES
+            and entry.parent
+            and entry.parent.startswith(PACKAGE)
+        ):
+            problems.append(f"{entry.module} (imported by {entry.parent})")
+    return problems
+
+
+def cumulative_ms(entries: list[ImportEntry], module: str) -> float:
+    """Get the cumulative import time of a module, in milliseconds."""
+    for entry in entries:
+        if entry.module == module:
+            return entry.cumulative_us / 1000
+    return 0.0
+
+
+def package_imports(entries: list[ImportEntry]) -> list[ImportEntry]:
+    """Get the modules imported by the provisioner's own modules."""
+    return [
+        entry
+        for entry in entries
+        if entry.module.startswith(PACKAGE)
+        or (entry.parent or "").startswith(PACKAGE)
+    ]
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--module", default=f"{PACKAGE}.ext")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=15, help="slowest imports listed")
+    parser.add_argument(
+        "--max-ms",
+        type=float,
+        default=None,
+        help="median cumulative import time (in ms) that counts as a regression",
+    )
+    args = parser.parse_args(argv)
+
+    runs = [import_once(args.module) for _ in range(args.runs)]
+    median = statistics.median(cumulative_ms(entries, args.module) for entries in runs)
+    print(f"{args.module}: {median:.1f} ms (median of {args.runs} runs)\n")
+
+    print(f"{'self ms':>8}  {'cumul. ms':>9}  module (imported by)")
+    slowest = sorted(
+        package_imports(runs[-1]), key=lambda e: e.cumulative_us, reverse=True
+    )
+    for entry in slowest[: args.top]:
+        print(
+            f"{entry.self_us / 1000:>8.1f}  {entry.cumulative_us / 1000:>9.1f}  "
+            f"{entry.module} ({entry.parent or '-'})"
+        )
+
+    status = 0
+    problems = find_eager_imports(runs[-1])
+    if problems:
+        print("\nImported eagerly on the web side:")
+        for problem in problems:
+            print(f"  {problem}")
+        status = 1
+    if args.max_ms is not None and median > args.max_ms:
+        print(f"\nImport time {median:.1f} ms exceeds {args.max_ms:g} ms")
+        status = 1
+    return status
+
+
+if __name__ == "__main__":
+    sys.exit(main())
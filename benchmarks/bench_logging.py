@@ -0,0 +1,149 @@
+#
+# This file is part of the invenio-remote-api-provisioner package.
+# Copyright (C) 2024, MESH Research.
+#
+# invenio-remote-api-provisioner is free software; you can redistribute it
+# and/or modify it under the terms of the MIT License; see
+# LICENSE file for more details.
+
+"""Benchmark the logging overhead of one provisioning task.
+
+Compares the logging done for a successful send by:
+
+- the previous setup: a synchronous ``RotatingFileHandler`` at DEBUG on
+  the task logger, a ``print`` of the response and the full response
+  JSON logged at INFO
+- the queued pipeline from ``invenio_remote_api_provisioner.logs`` at
+  INFO, where the response body is only logged at DEBUG
+
+Reports the time spent in the task's logging calls (what a task waits
+for), and for the queued pipeline also the time until the listener thread
+has written every record.
+
+Usage::
+
+    python -m benchmarks.bench_logging [--tasks 5000]
+"""
+
+import argparse
+import contextlib
+import logging
+import logging.handlers
+import os
+import tempfile
+import time
+from types import SimpleNamespace
+
+from invenio_remote_api_provisioner.logs import (
+    LOGGER_NAME,
+    setup_logging,
+    stop_logging,
+)
+
+RESPONSE_JSON = {
+    "_id": "2E9SqY0Bdd2QL-HGeUuA",
+    "_internal_id": "abcde-12345",
+    "title": "A Romans Story: Empire, Memory and the Provinces",
+    "description": "This study examines the reception of Roman imperial "
+    "narratives in provincial communities. " * 10,
+    "contributors": [
+        {"name": f"Author{i}, Given{i}", "role": "author"} for i in range(8)
+    ],
+    "other_urls": [f"https://example.org/{i}" for i in range(3)],
+}
+FIELDS = {
+    "service_type": "rdm_record",
+    "service_method": "publish",
+    "endpoint": "https://search.hcommons-dev.org/api/v1/documents",
+    "record_id": "abcde-12345",
+}
+
+
+class FakeResponse:
+    """Stands in for a successful ``requests`` response."""
+
+    status_code = 200
+    text = str(RESPONSE_JSON)
+
+    def json(self):
+        return RESPONSE_JSON
+
+    def __str__(self):
+        return "<Response [200]>"
+
+
+def previous_task_logging(logger: logging.Logger, response) -> None:
+    """The logging calls made by a successful task before the pipeline."""
+    print(response)
+    logger.info("Notification sent successfully")
+    logger.info("response:")
+    logger.info(response.json())
+    logger.info("-----------------------")
+
+
+def queued_task_logging(logger: logging.Logger, response) -> None:
+    """The logging calls made by a successful task with the pipeline."""
+    logger.info(
+        "Sent %s %s update for record %s to %s",
+        FIELDS["service_type"],
+        FIELDS["service_method"],
+        FIELDS["record_id"],
+        FIELDS["endpoint"],
+        extra={**FIELDS, "status_code": 200, "elapsed_ms": 12.5},
+    )
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("Response: %s", response.text, extra=FIELDS)
+
+
+def run(tasks: int) -> None:
+    response = FakeResponse()
+    with tempfile.TemporaryDirectory() as log_dir:
+        # Previous setup
+        logger = logging.getLogger("bench_logging.previous")
+        logger.setLevel(logging.DEBUG)
+        logger.propagate = False
+        handler = logging.handlers.RotatingFileHandler(
+            os.path.join(log_dir, "celery.log"), maxBytes=1000000, backupCount=5
+        )
+        handler.setFormatter(
+            logging.Formatter(
+                "%(asctime)s:RemoteAPIProvisioner:%(levelname)s: %(message)s"
+            )
+        )
+        logger.addHandler(handler)
+        with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+            start = time.perf_counter()
+            for _ in range(tasks):
+                previous_task_logging(logger, response)
+            previous = time.perf_counter() - start
+        handler.close()
+
+        # Queued pipeline
+        app = SimpleNamespace(
+            config={
+                "REMOTE_API_PROVISIONER_LOG_ENABLED": True,
+                "REMOTE_API_PROVISIONER_LOG_LEVEL": "INFO",
+                "REMOTE_API_PROVISIONER_LOG_FILE": os.path.join(
+                    log_dir, "provisioner.log"
+                ),
+            }
+        )
+        setup_logging(app)
+        logger = logging.getLogger(f"{LOGGER_NAME}.tasks")
+        start = time.perf_counter()
+        for _ in range(tasks):
+            queued_task_logging(logger, response)
+        queued = time.perf_counter() - start
+        stop_logging()
+        drained = time.perf_counter() - start
+
+    print(f"{'setup':<34}{'us per task':>12}")
+    print(f"{'file handler at DEBUG (previous)':<34}{previous / tasks * 1e6:>12.2f}")
+    print(f"{'queued JSON at INFO (in task)':<34}{queued / tasks * 1e6:>12.2f}")
+    print(f"{'queued JSON at INFO (written)':<34}{drained / tasks * 1e6:>12.2f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--tasks", type=int, default=5000)
+    run(parser.parse_args().tasks)
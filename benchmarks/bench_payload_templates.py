@@ -0,0 +1,137 @@
+#
+# This file is part of the invenio-remote-api-provisioner package.
+# Copyright (C) 2024, MESH Research.
+#
+# invenio-remote-api-provisioner is free software; you can redistribute it
+# and/or modify it under the terms of the MIT License; see
+# LICENSE file for more details.
+
+"""Benchmark a compiled payload template against an equivalent callable.
+
+Compares three ways of building the same Commons search style payload:
+
+- a hand-written payload function
+- a ``PayloadTemplate`` compiled once (how the extension uses templates)
+- a ``PayloadTemplate`` compiled for every event
+
+Usage::
+
+    python -m benchmarks.bench_payload_templates [--number 20000]
+"""
+
+import argparse
+import re
+import timeit
+
+from invenio_remote_api_provisioner.templates import PayloadTemplate
+
+UI_URL_BASE = "https://works.kcommons.org"
+
+TEMPLATE = {
+    "_internal_id": "record.id",
+    "content_type": {"value": "work"},
+    "network_node": {"value": "works"},
+    "primary_url": {"format": UI_URL_BASE + "/records/{record.id}"},
+    "owner": {
+        "fields": {
+            "name": {"path": "owner.full_name", "default": ""},
+            "owner_username": "owner.id_from_idp",
+        }
+    },
+    "title": {
+        "path": "record.metadata.title",
+        "transform": "strip_html",
+        "default": "",
+    },
+    "description": {
+        "path": "record.metadata.description",
+        "transform": "strip_html",
+        "default": "",
+    },
+    "publication_date": {"path": "record.metadata.publication_date", "default": ""},
+    "contributors": {
+        "path": "record.metadata.creators[*]",
+        "default": [],
+        "each": {
+            "name": {"path": "item.person_or_org.name", "default": ""},
+            "role": {"path": "item.role.id", "default": ""},
+        },
+    },
+    "other_urls": {
+        "path": "record.metadata.identifiers[*].identifier",
+        "default": [],
+    },
+}
+
+
+def payload_function(identity, record=None, owner=None, **kwargs):
+    """Build the same payload as TEMPLATE with plain Python."""
+    metadata = record.get("metadata", {})
+    return {
+        "_internal_id": record.get("id"),
+        "content_type": "work",
+        "network_node": "works",
+        "primary_url": f"{UI_URL_BASE}/records/{record.get('id')}",
+        "owner": {
+            "name": owner.get("full_name", ""),
+            "owner_username": owner.get("id_from_idp"),
+        },
+        "title": re.sub("<.*?>", "", metadata.get("title", "")),
+        "description": re.sub("<.*?>", "", metadata.get("description", "")),
+        "publication_date": metadata.get("publication_date", ""),
+        "contributors": [
+            {
+                "name": c.get("person_or_org", {}).get("name", ""),
+                "role": c.get("role", {}).get("id", ""),
+            }
+            for c in metadata.get("creators", [])
+        ],
+        "other_urls": [i["identifier"] for i in metadata.get("identifiers", [])],
+    }
+
+
+RECORD = {
+    "id": "abcde-12345",
+    "metadata": {
+        "title": "<p>A Romans Story</p>",
+        "description": "<p>" + "A description of the work. " * 40 + "</p>",
+        "publication_date": "2020-06-01",
+        "creators": [
+            {
+                "person_or_org": {"name": f"Author{i}, Given{i}"},
+                "role": {"id": "author"},
+            }
+            for i in range(10)
+        ],
+        "identifiers": [
+            {"scheme": "url", "identifier": f"https://example.org/{i}"}
+            for i in range(3)
+        ],
+    },
+}
+OWNER = {"full_name": "My User", "id_from_idp": "myuser"}
+
+
+def run(number: int) -> None:
+    compiled = PayloadTemplate(TEMPLATE)
+    assert compiled(None, record=RECORD, owner=OWNER) == payload_function(
+        None, record=RECORD, owner=OWNER
+    )
+    cases = {
+        "payload function": lambda: payload_function(
+            None, record=RECORD, owner=OWNER
+        ),
+        "compiled template": lambda: compiled(None, record=RECORD, owner=OWNER),
+        "compile per event": lambda: PayloadTemplate(TEMPLATE)(
+            None, record=RECORD, owner=OWNER
+        ),
+    }
+    for label, case in cases.items():
+        best = min(timeit.repeat(case, number=number, repeat=5))
+        print(f"{label:<20}{best / number * 1e6:>10.2f} us per payload")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--number", type=int, default=20000)
+    run(parser.parse_args().number)
@@ -0,0 +1,169 @@
+#
+# This file is part of the invenio-remote-api-provisioner package.
+# Copyright (C) 2024, MESH Research.
+#
+# invenio-remote-api-provisioner is free software; you can redistribute it
+# and/or modify it under the terms of the MIT License; see
+# LICENSE file for more details.
+
+"""Benchmark request body compression for Commons search payloads.
+
+Builds typical Commons search payloads with ``format_commons_search_payload``
+from the test helpers, then sends them to a local HTTP server with each
+compression setting. Reports the bytes put on the wire and the end-to-end
+latency (encoding, compression, request and response) for each setting.
+
+The ``--bandwidth`` option makes the server sleep in proportion to the
+request size, to approximate a link slower than the loopback interface.
+
+Usage::
+
+    python -m benchmarks.bench_request_compression [--iterations 200]
+        [--bandwidth 10000]
+"""
+
+import argparse
+import gzip
+import statistics
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import requests
+from flask import Flask
+
+from invenio_remote_api_provisioner.serializers import (
+    compress_payload,
+    encode_payload,
+)
+from tests.helpers.api_helpers import format_commons_search_payload
+
+SETTINGS = [
+    ("uncompressed", None, None),
+    ("gzip level 1", "gzip", 1),
+    ("gzip level 5", "gzip", 5),
+    ("gzip level 9", "gzip", 9),
+]
+
+
+def make_record_data(size: str) -> dict:
+    """Make record data with a small, typical or large metadata block."""
+    creators, paragraphs = {
+        "small": (2, 2),
+        "typical": (8, 12),
+        "large": (60, 80),
+    }[size]
+    return {
+        "id": "abcde-12345",
+        "metadata": {
+            "title": "<p>A Romans Story: Empire, Memory and the Provinces</p>",
+            "description": "<p>"
+            + (
+                "This study examines the reception of Roman imperial "
+                "narratives in provincial communities and the ways in "
+                "which local elites negotiated their identities. "
+            )
+            * paragraphs
+            + "</p>",
+            "publication_date": "2020-06-01",
+            "languages": [{"id": "eng"}],
+            "creators": [
+                {
+                    "person_or_org": {
+                        "type": "personal",
+                        "name": f"Author{i}, Given{i}",
+                        "given_name": f"Given{i}",
+                        "family_name": f"Author{i}",
+                    },
+                    "role": {"id": "author"},
+                }
+                for i in range(creators)
+            ],
+            "identifiers": [
+                {"scheme": "url", "identifier": f"https://example.org/{i}"}
+                for i in range(3)
+            ],
+        },
+        "files": {"enabled": True},
+    }
+
+
+class RemoteAPIHandler(BaseHTTPRequestHandler):
+    """Accepts a payload, decompressing it the way the remote API would."""
+
+    bandwidth = 0  # bytes per second, 0 for unlimited
+
+    def do_POST(self):  # noqa: N802
+        body = self.rfile.read(int(self.headers["Content-Length"]))
+        if self.bandwidth:
+            time.sleep(len(body) / self.bandwidth)
+        if self.headers.get("Content-Encoding") == "gzip":
+            body = gzip.decompress(body)
+        response = b'{"_id": "2E9SqY0Bdd2QL-HGeUuA"}'
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(response)))
+        self.end_headers()
+        self.wfile.write(response)
+
+    def log_message(self, *args):
+        pass
+
+
+def run(iterations: int, bandwidth: int) -> None:
+    RemoteAPIHandler.bandwidth = bandwidth
+    server = ThreadingHTTPServer(("127.0.0.1", 0), RemoteAPIHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{server.server_port}/api/v1/documents"
+    session = requests.Session()
+
+    app = Flask(__name__)
+    with app.app_context():
+        owner = {"full_name": "My User", "id_from_idp": "myuser"}
+        payloads = {
+            size: format_commons_search_payload(
+                None, data=make_record_data(size), owner=owner
+            )
+            for size in ["small", "typical", "large"]
+        }
+
+    print(
+        f"{'payload':<10}{'setting':<16}{'raw bytes':>11}{'wire bytes':>12}"
+        f"{'ratio':>8}{'p50 ms':>9}{'p95 ms':>9}"
+    )
+    for size, payload in payloads.items():
+        for label, compression, level in SETTINGS:
+            timings = []
+            for _ in range(iterations):
+                start = time.perf_counter()
+                body, content_type = encode_payload(payload)
+                raw_size = len(body)
+                body, content_encoding = compress_payload(
+                    body, compression, threshold=0, level=level
+                )
+                headers = {"Content-Type": content_type}
+                if content_encoding:
+                    headers["Content-Encoding"] = content_encoding
+                session.post(url, data=body, headers=headers, timeout=10)
+                timings.append((time.perf_counter() - start) * 1000)
+            timings.sort()
+            print(
+                f"{size:<10}{label:<16}{raw_size:>11}{len(body):>12}"
+                f"{len(body) / raw_size:>8.2f}"
+                f"{statistics.median(timings):>9.2f}"
+                f"{timings[int(len(timings) * 0.95) - 1]:>9.2f}"
+            )
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--iterations", type=int, default=200)
+    parser.add_argument(
+        "--bandwidth",
+        type=int,
+        default=0,
+        help="simulated link speed in bytes per second (0 for unlimited)",
+    )
+    args = parser.parse_args()
+    run(args.iterations, args.bandwidth)
@@ -0,0 +1,101 @@
+#
+# This file is part of the invenio-remote-api-provisioner package.
+# Copyright (C) 2024, MESH Research.
+#
+# invenio-remote-api-provisioner is free software; you can redistribute it
+# and/or modify it under the terms of the MIT License; see
+# LICENSE file for more details.
+
+"""Compare two pytest-benchmark JSON results and flag regressions.
+
+Benchmarks are matched by their full name and compared by median time,
+which is less affected by outliers than the mean. A benchmark counts as a
+regression if its median grew by more than the threshold percentage. The
+script exits with status 1 if any benchmark regressed, so it can gate a
+CI job.
+
+Usage::
+
+    python -m benchmarks.compare BASELINE.json CURRENT.json [--threshold 10]
+"""
+
+import argparse
+import json
+import sys
+
+
+def load_medians(path: str) -> dict[str, float]:
+    """Load the median time (in seconds) of each benchmark in a result."""
+    with open(path) as result_file:
+        result = json.load(result_file)
+    return {b["fullname"]: b["stats"]["median"] for b in result["benchmarks"]}
+
+
+def compare(
+    baseline: dict[str, float], current: dict[str, float], threshold: float
+) -> tuple[list[tuple], list[str]]:
+    """Compare benchmark medians.
+
+    Returns:
+        tuple[list[tuple], list[str]]: A row (name, baseline, current,
+        change in percent, status) for every benchmark in either result,
+        and the names of the regressed benchmarks.
+    """
+    rows = []
+    regressions = []
+    for name in sorted(baseline.keys() | current.keys()):
+        before, after = baseline.get(name), current.get(name)
+        if before is None or after is None:
+            status = "new" if before is None else "gone"
+            rows.append((name, before, after, None, status))
+            continue
+        change = (after - before) / before * 100
+        if change > threshold:
+            status = "REGRESSED"
+            regressions.append(name)
+        elif change < -threshold:
+            status = "improved"
+        else:
+            status = ""
+        rows.append((name, before, after, change, status))
+    return rows, regressions
+
+
+def _format_time(seconds: float | None) -> str:
+    return "-" if seconds is None else f"{seconds * 1e6:.2f}"
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("baseline", help="pytest-benchmark JSON to compare against")
+    parser.add_argument("current", help="pytest-benchmark JSON to check")
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=10.0,
+        help="percentage increase in the median that counts as a regression",
+    )
+    args = parser.parse_args(argv)
+    rows, regressions = compare(
+        load_medians(args.baseline), load_medians(args.current), args.threshold
+    )
+    width = max([len("benchmark"), *(len(row[0]) for row in rows)])
+    print(f"{'benchmark':<{width}}  {'base us':>10}  {'now us':>10}  {'change':>8}")
+    for name, before, after, change, status in rows:
+        change_text = "-" if change is None else f"{change:+.1f}%"
+        line = (
+            f"{name:<{width}}  {_format_time(before):>10}  "
+            f"{_format_time(after):>10}  {change_text:>8}  {status}"
+        )
+        print(line.rstrip())
+    if regressions:
+        print(
+            f"\n{len(regressions)} benchmark(s) regressed by more than "
+            f"{args.threshold:g}%"
+        )
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
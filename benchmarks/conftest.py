@@ -0,0 +1,97 @@
+#
+# This file is part of the invenio-remote-api-provisioner package.
+# Copyright (C) 2024, MESH Research.
+#
+# invenio-remote-api-provisioner is free software; you can redistribute it
+# and/or modify it under the terms of the MIT License; see
+# LICENSE file for more details.
+
+"""Fixtures for the pytest-benchmark suite.
+
+The suite times the provisioner's own code on its hot paths. Records,
+identities, units of work and the user datastore are replaced with
+in-memory stand-ins (see ``stand_ins``), so that database, search and
+broker round trips do not drown out the differences being measured.
+"""
+
+from types import SimpleNamespace
+
+import pytest
+from flask import Flask
+
+from invenio_remote_api_provisioner.ext import InvenioRemoteAPIProvisioner
+
+from .stand_ins import BenchCallback, BenchUnitOfWork, make_record, owner_payload
+
+ENDPOINT_COUNTS = (1, 10, 100)
+URL_TEMPLATE = "{endpoint}/{record.custom_fields.kcr:commons_search_recid}"
+
+
+def endpoint_url(number: int) -> str:
+    return f"https://search{number}.hcommons-dev.org/api/v1/documents"
+
+
+def make_events(endpoint_count: int) -> dict:
+    """Build an event configuration with one publish event per endpoint."""
+    return {
+        "rdm_record": {
+            endpoint_url(number): {
+                "publish": {
+                    "http_method": "PUT",
+                    "with_record_owner": True,
+                    "payload": owner_payload,
+                    "url_template": URL_TEMPLATE,
+                    "headers": {"X-Source": "works"},
+                    "auth_token": "12345",
+                    "timing_field": "kcr:commons_search_updated",
+                    "callback": BenchCallback(),
+                },
+            }
+            for number in range(endpoint_count)
+        }
+    }
+
+
+def make_app(endpoint_count: int) -> Flask:
+    """Create an app with the extension and ``endpoint_count`` endpoints."""
+    app = Flask("benchmarks")
+    app.config.update(
+        REMOTE_API_PROVISIONER_EVENTS=make_events(endpoint_count),
+        REMOTE_API_PROVISIONER_LOG_ENABLED=False,
+    )
+    InvenioRemoteAPIProvisioner(app)
+    return app
+
+
+@pytest.fixture
+def bench_record():
+    return make_record()
+
+
+@pytest.fixture
+def bench_identity():
+    return SimpleNamespace(id="1")
+
+
+@pytest.fixture
+def bench_uow():
+    return BenchUnitOfWork()
+
+
+@pytest.fixture
+def bench_accounts(monkeypatch):
+    """Serve the record owner from memory instead of the database."""
+    user = SimpleNamespace(
+        email="myuser@example.org",
+        username="myuser",
+        user_profile={"full_name": "My User", "affiliations": "MSU"},
+        external_identifiers=[
+            SimpleNamespace(method="knowledgeCommons", id="myuser")
+        ],
+    )
+    datastore = SimpleNamespace(get_user_by_id=lambda user_id: user)
+    monkeypatch.setattr(
+        "invenio_remote_api_provisioner.tasks.current_accounts",
+        SimpleNamespace(datastore=datastore),
+    )
+    return user
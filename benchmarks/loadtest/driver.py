@@ -0,0 +1,236 @@
+#
+# This file is part of the invenio-remote-api-provisioner package.
+# Copyright (C) 2024, MESH Research.
+#
+# invenio-remote-api-provisioner is free software; you can redistribute it
+# and/or modify it under the terms of the MIT License; see
+# LICENSE file for more details.
+
+"""Push synthetic record events through the provisioner under load.
+
+Starts the fake remote API (``benchmarks.loadtest.server``) and an app
+with one ``publish`` event per fake endpoint, then publishes thousands of
+synthetic records through the real service component and provisioning
+task. Records, identities and units of work are the in-memory stand-ins
+from ``benchmarks.stand_ins``; the user datastore and search index are
+not used (events are sent by the system identity, without the record
+owner).
+
+Tasks run either eagerly (``--mode eager``, in the producing threads,
+where Celery retries immediately) or on a Celery worker with a thread pool
+in the same process (``--mode worker``, with an in-memory broker and the
+task's real retry backoff).
+
+Reports throughput, the latency from queueing each task to its final
+result, the remote API's responses and the retry amplification (requests
+sent per event), along with the mean time tasks spent in each phase.
+
+Usage::
+
+    python -m benchmarks.loadtest.driver --records 2000 --throttle-rate 0.02
+"""
+
+import argparse
+import statistics
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import ExitStack
+from types import SimpleNamespace
+
+from celery.contrib.testing.worker import start_worker
+from celery.signals import task_failure, task_success
+from flask import Flask
+from flask_celeryext import FlaskCeleryExt
+from invenio_cache import InvenioCache
+
+from invenio_remote_api_provisioner.ext import InvenioRemoteAPIProvisioner
+from invenio_remote_api_provisioner.tasks import send_remote_api_update
+from invenio_remote_api_provisioner.timings import get_timings
+
+from ..stand_ins import BenchUnitOfWork, make_record, owner_payload
+from .server import FakeAPIServer, add_server_arguments, config_from_arguments
+
+SYSTEM_IDENTITY = SimpleNamespace(id="system")
+
+
+class Results:
+    """Collects the final outcome of every provisioning task."""
+
+    def __init__(self):
+        """Initialize the results."""
+        self.latencies: list[float] = []
+        self.failed = 0
+        self._lock = threading.Lock()
+        self._done = threading.Condition(self._lock)
+
+    def _finish(self, sender, failed: bool) -> None:
+        if getattr(sender, "name", None) != send_remote_api_update.name:
+            return
+        enqueued_at = (sender.request.kwargs or {}).get("enqueued_at")
+        with self._lock:
+            if enqueued_at:
+                self.latencies.append(time.time() - enqueued_at)
+            self.failed += failed
+            self._done.notify_all()
+
+    def on_success(self, sender=None, **kwargs) -> None:
+        self._finish(sender, failed=False)
+
+    def on_failure(self, sender=None, **kwargs) -> None:
+        self._finish(sender, failed=True)
+
+    @property
+    def finished(self) -> int:
+        return len(self.latencies)
+
+    def wait(self, expected: int, timeout: float) -> bool:
+        """Wait until ``expected`` tasks have finished."""
+        with self._lock:
+            return self._done.wait_for(
+                lambda: self.finished >= expected, timeout=timeout
+            )
+
+
+def make_events(base_url: str, endpoint_count: int, http_method: str) -> dict:
+    """Configure one publish event per fake endpoint."""
+    events = {}
+    for number in range(endpoint_count):
+        event = {
+            "http_method": http_method,
+            "payload": owner_payload,
+            "headers": {"X-Source": "works"},
+            "auth_token": "12345",
+        }
+        if http_method != "POST":
+            event["url_template"] = "{endpoint}/{record.id}"
+        events[f"{base_url}/api/v{number}/documents"] = {"publish": event}
+    return {"rdm_record": events}
+
+
+def create_app(events: dict, mode: str, buffer_size: int) -> tuple:
+    """Create an app and Celery app for the load test."""
+    app = Flask("loadtest")
+    app.config.update(
+        REMOTE_API_PROVISIONER_EVENTS=events,
+        REMOTE_API_PROVISIONER_LOG_ENABLED=False,
+        REMOTE_API_PROVISIONER_TIMINGS_BUFFER_SIZE=buffer_size,
+        CACHE_TYPE="SimpleCache",
+        CELERY_BROKER_URL="memory://",
+        CELERY_RESULT_BACKEND="cache+memory://",
+        CELERY_TASK_ALWAYS_EAGER=mode == "eager",
+    )
+    InvenioCache(app)
+    InvenioRemoteAPIProvisioner(app)
+    celery = FlaskCeleryExt(app).celery
+    celery.conf.update(
+        broker_url="memory://",
+        result_backend="cache+memory://",
+        task_always_eager=mode == "eager",
+        task_eager_propagates=False,
+    )
+    celery.set_default()
+    celery.set_current()
+    return app, celery
+
+
+def publish_records(app: Flask, component, record_ids: list[str]) -> None:
+    """Publish records through the component and queue their tasks."""
+    with app.app_context():
+        for record_id in record_ids:
+            uow = BenchUnitOfWork()
+            component._do_method_action(
+                "publish", SYSTEM_IDENTITY, make_record(record_id), uow=uow
+            )
+            for operation in uow.operations:
+                operation.on_post_commit(uow)
+
+
+def percentile(values: list[float], percent: int) -> float:
+    """Get a percentile (1-99) of some values."""
+    if len(values) < 2:
+        return values[0] if values else 0.0
+    return statistics.quantiles(values, n=100, method="inclusive")[percent - 1]
+
+
+def report(args, results: Results, server, expected: int, elapsed: float) -> None:
+    stats = server.api.stats
+    latencies = sorted(results.latencies)
+    rows = [
+        ("mode", args.mode),
+        ("events (tasks)", expected),
+        ("finished", f"{results.finished} ({results.failed} failed)"),
+        ("wall time", f"{elapsed:.2f} s"),
+        ("throughput", f"{results.finished / elapsed:.1f} events/s"),
+        *(
+            (f"latency p{p}", f"{percentile(latencies, p) * 1000:.1f} ms")
+            for p in (50, 90, 99)
+        ),
+        ("latency max", f"{(latencies[-1] if latencies else 0) * 1000:.1f} ms"),
+        ("remote requests", stats.requests),
+        *(
+            (f"  status {status}", count)
+            for status, count in sorted(stats.statuses.items())
+        ),
+        ("retry amplification", f"{stats.requests / max(expected, 1):.2f}x"),
+    ]
+    phases: dict[str, list[float]] = {}
+    for entry in get_timings():
+        for name, ms in entry["phases_ms"].items():
+            phases.setdefault(name, []).append(ms)
+    rows.extend(
+        (f"  mean {name}", f"{statistics.fmean(values):.2f} ms")
+        for name, values in phases.items()
+    )
+    for label, value in rows:
+        print(f"{label:<22}{value}")
+
+
+def run(args: argparse.Namespace) -> None:
+    results = Results()
+    task_success.connect(results.on_success, weak=False)
+    task_failure.connect(results.on_failure, weak=False)
+    expected = args.records * args.endpoints
+    with FakeAPIServer(config_from_arguments(args)) as server:
+        app, celery = create_app(
+            make_events(server.url, args.endpoints, args.http_method),
+            args.mode,
+            expected,
+        )
+        component = app.config["RDM_RECORDS_SERVICE_COMPONENTS"][-1](None)
+        record_ids = [f"load-{number:06d}" for number in range(args.records)]
+        producers = args.concurrency if args.mode == "eager" else 1
+        chunks = [record_ids[i::producers] for i in range(producers)]
+
+        with ExitStack() as stack:
+            if args.mode == "worker":
+                stack.enter_context(
+                    start_worker(
+                        celery,
+                        pool="threads",
+                        concurrency=args.concurrency,
+                        perform_ping_check=False,
+                        shutdown_timeout=args.timeout,
+                    )
+                )
+            start = time.perf_counter()
+            with ThreadPoolExecutor(producers) as pool:
+                list(pool.map(lambda ids: publish_records(app, component, ids), chunks))
+            if not results.wait(expected, args.timeout):
+                print(f"Timed out with {results.finished} of {expected} finished")
+            elapsed = time.perf_counter() - start
+    report(args, results, server, expected, elapsed)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--records", type=int, default=1000)
+    parser.add_argument("--endpoints", type=int, default=1)
+    parser.add_argument("--http-method", default="PUT", choices=["POST", "PUT"])
+    parser.add_argument("--mode", default="eager", choices=["eager", "worker"])
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument(
+        "--timeout", type=float, default=600, help="seconds to wait for the tasks"
+    )
+    add_server_arguments(parser)
+    run(parser.parse_args())
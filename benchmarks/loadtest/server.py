@@ -0,0 +1,322 @@
+#
+# This file is part of the invenio-remote-api-provisioner package.
+# Copyright (C) 2024, MESH Research.
+#
+# invenio-remote-api-provisioner is free software; you can redistribute it
+# and/or modify it under the terms of the MIT License; see
+# LICENSE file for more details.
+
+"""A local asyncio HTTP server that plays a configurable remote API.
+
+Like the fake DataCite client the tests use, the server accepts the
+requests the provisioner sends to a search index style API, without
+storing anything:
+
+- ``POST`` to a collection returns a new document ``_id``
+- ``PUT``, ``PATCH``, ``GET`` and ``DELETE`` of a document return its
+  ``_id``
+- ``POST`` to a path ending in ``/_bulk`` accepts a JSON array or
+  newline-delimited JSON and returns one result per item
+
+Every response waits for a latency drawn from a configurable distribution,
+and a configurable share of requests get ``429 Too Many Requests`` (with
+``Retry-After``), ``500`` errors or an extra slow delay. The server counts
+requests by status and by target, for the load driver's report.
+
+Usage::
+
+    python -m benchmarks.loadtest.server --port 8899 --error-rate 0.01
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import threading
+import uuid
+from collections import Counter
+from dataclasses import dataclass, field
+
+REASONS = {
+    200: "OK",
+    400: "Bad Request",
+    429: "Too Many Requests",
+    500: "Internal Server Error",
+}
+
+
+@dataclass
+class Latency:
+    """A distribution of response latencies, in seconds.
+
+    Parameters:
+        kind (str): "fixed", "uniform", "exponential" or "lognormal".
+        params (tuple): The delay for "fixed"; the minimum and maximum for
+            "uniform"; the mean for "exponential"; the median and sigma
+            for "lognormal".
+    """
+
+    kind: str = "fixed"
+    params: tuple = (0.0,)
+
+    @classmethod
+    def parse(cls, spec: str) -> "Latency":
+        """Parse a spec like ``"uniform:0.01,0.1"``."""
+        kind, _, params = spec.partition(":")
+        latency = cls(kind, tuple(float(p) for p in params.split(",") if p))
+        latency.sample(random.Random())  # check the spec
+        return latency
+
+    def sample(self, rng: random.Random) -> float:
+        """Draw a latency."""
+        if self.kind == "fixed":
+            return self.params[0]
+        if self.kind == "uniform":
+            return rng.uniform(*self.params)
+        if self.kind == "exponential":
+            return rng.expovariate(1 / self.params[0])
+        if self.kind == "lognormal":
+            median, sigma = self.params
+            return median * rng.lognormvariate(0, sigma)
+        raise ValueError(f"Unknown latency distribution: {self.kind}")
+
+
+@dataclass
+class FakeAPIConfig:
+    """How the fake remote API behaves.
+
+    Parameters:
+        latency (Latency): The latency of every response.
+        error_rate (float): Share of requests answered with a 500 error.
+        throttle_rate (float): Share of requests answered with a 429.
+        retry_after (int): The ``Retry-After`` seconds sent with a 429.
+        slow_rate (float): Share of requests delayed by ``slow_latency``.
+        slow_latency (float): Extra seconds for slow responses.
+        bulk_item_latency (float): Extra seconds per item of a bulk request.
+        seed (int): Seed for the random choices, for repeatable runs.
+    """
+
+    latency: Latency = field(default_factory=Latency)
+    error_rate: float = 0.0
+    throttle_rate: float = 0.0
+    retry_after: int = 1
+    slow_rate: float = 0.0
+    slow_latency: float = 2.0
+    bulk_item_latency: float = 0.0
+    seed: int | None = None
+
+
+@dataclass
+class ServerStats:
+    """What the fake remote API has received."""
+
+    statuses: Counter = field(default_factory=Counter)
+    targets: Counter = field(default_factory=Counter)
+    bulk_items: int = 0
+
+    @property
+    def requests(self) -> int:
+        """The total number of requests."""
+        return sum(self.statuses.values())
+
+
+class FakeRemoteAPI:
+    """Answers HTTP requests as configured, counting them."""
+
+    def __init__(self, config: FakeAPIConfig | None = None):
+        """Initialize the API."""
+        self.config = config or FakeAPIConfig()
+        self.rng = random.Random(self.config.seed)
+        self.stats = ServerStats()
+
+    async def respond(self, method: str, target: str, body: bytes) -> tuple:
+        """Decide the status, extra headers and body of a response."""
+        config = self.config
+        delay = config.latency.sample(self.rng)
+        if self.rng.random() < config.slow_rate:
+            delay += config.slow_latency
+        roll = self.rng.random()
+        path = target.split("?", 1)[0].rstrip("/")
+        headers = {}
+        if roll < config.throttle_rate:
+            status, payload = 429, {"error": "rate limited"}
+            headers["Retry-After"] = str(config.retry_after)
+        elif roll < config.throttle_rate + config.error_rate:
+            status, payload = 500, {"error": "internal error"}
+        elif path.endswith("/_bulk"):
+            status, payload = self._bulk(body)
+            delay += config.bulk_item_latency * len(payload.get("items", []))
+        elif method == "POST":
+            status, payload = 200, {"_id": uuid.uuid4().hex[:20]}
+        else:
+            status, payload = 200, {"_id": path.rsplit("/", 1)[-1]}
+        await asyncio.sleep(delay)
+        self.stats.statuses[status] += 1
+        self.stats.targets[f"{method} {path}"] += 1
+        return status, headers, payload
+
+    def _bulk(self, body: bytes) -> tuple[int, dict]:
+        try:
+            text = body.decode()
+            if text.lstrip().startswith("["):
+                items = json.loads(text)
+            else:
+                items = [json.loads(line) for line in text.splitlines() if line]
+        except ValueError:
+            return 400, {"error": "invalid bulk body"}
+        self.stats.bulk_items += len(items)
+        return 200, {
+            "errors": False,
+            "items": [{"_id": uuid.uuid4().hex[:20], "status": 200} for _ in items],
+        }
+
+    async def handle(self, reader: asyncio.StreamReader, writer) -> None:
+        """Serve the requests on one (possibly kept-alive) connection."""
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line.strip():
+                    break
+                method, target, _ = request_line.decode("latin-1").split(" ", 2)
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+                body = await reader.readexactly(int(headers.get("content-length", 0)))
+                status, extra_headers, payload = await self.respond(
+                    method.upper(), target, body
+                )
+                data = json.dumps(payload).encode()
+                head = [
+                    f"HTTP/1.1 {status} {REASONS[status]}",
+                    "Content-Type: application/json",
+                    f"Content-Length: {len(data)}",
+                    *(f"{k}: {v}" for k, v in extra_headers.items()),
+                ]
+                writer.write(("\r\n".join(head) + "\r\n\r\n").encode() + data)
+                await writer.drain()
+                if headers.get("connection", "").lower() == "close":
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+
+class FakeAPIServer:
+    """Runs a ``FakeRemoteAPI`` on its own event loop thread.
+
+    Usable as a context manager::
+
+        with FakeAPIServer(FakeAPIConfig(error_rate=0.05)) as server:
+            requests.put(f"{server.url}/documents/abcd-1234", json={})
+        print(server.api.stats)
+    """
+
+    def __init__(
+        self, config: FakeAPIConfig | None = None, host: str = "127.0.0.1", port=0
+    ):
+        """Initialize the server."""
+        self.api = FakeRemoteAPI(config)
+        self.host = host
+        self.port = port
+        self._loop = asyncio.new_event_loop()
+        self._thread: threading.Thread | None = None
+        self._started = threading.Event()
+
+    @property
+    def url(self) -> str:
+        """The server's base URL."""
+        return f"http://{self.host}:{self.port}"
+
+    def _run(self) -> None:
+        asyncio.set_event_loop(self._loop)
+        server = self._loop.run_until_complete(
+            asyncio.start_server(self.api.handle, self.host, self.port, backlog=1024)
+        )
+        self.port = server.sockets[0].getsockname()[1]
+        self._started.set()
+        try:
+            self._loop.run_forever()
+        finally:
+            server.close()
+            # Drop idle kept-alive connections before closing the loop
+            handlers = asyncio.all_tasks(self._loop)
+            for handler in handlers:
+                handler.cancel()
+            self._loop.run_until_complete(
+                asyncio.gather(*handlers, return_exceptions=True)
+            )
+            self._loop.run_until_complete(server.wait_closed())
+            self._loop.close()
+
+    def start(self) -> "FakeAPIServer":
+        """Start serving in a background thread."""
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        self._started.wait()
+        return self
+
+    def stop(self) -> None:
+        """Stop the server."""
+        if self._thread is not None:
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._thread.join()
+            self._thread = None
+
+    def __enter__(self) -> "FakeAPIServer":
+        return self.start()
+
+    def __exit__(self, *exc_info) -> None:
+        self.stop()
+
+
+def add_server_arguments(parser: argparse.ArgumentParser) -> None:
+    """Add the options that configure the fake remote API to a parser."""
+    parser.add_argument(
+        "--latency",
+        type=Latency.parse,
+        default=Latency("fixed", (0.02,)),
+        help='e.g. "fixed:0.02", "uniform:0.01,0.1", "exponential:0.05" or '
+        '"lognormal:0.05,0.5" (seconds)',
+    )
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--throttle-rate", type=float, default=0.0)
+    parser.add_argument("--retry-after", type=int, default=1)
+    parser.add_argument("--slow-rate", type=float, default=0.0)
+    parser.add_argument("--slow-latency", type=float, default=2.0)
+    parser.add_argument("--bulk-item-latency", type=float, default=0.0)
+    parser.add_argument("--seed", type=int, default=None)
+
+
+def config_from_arguments(args: argparse.Namespace) -> FakeAPIConfig:
+    """Build the fake remote API's config from parsed options."""
+    return FakeAPIConfig(
+        latency=args.latency,
+        error_rate=args.error_rate,
+        throttle_rate=args.throttle_rate,
+        retry_after=args.retry_after,
+        slow_rate=args.slow_rate,
+        slow_latency=args.slow_latency,
+        bulk_item_latency=args.bulk_item_latency,
+        seed=args.seed,
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8899)
+    add_server_arguments(parser)
+    args = parser.parse_args()
+    server = FakeAPIServer(config_from_arguments(args), args.host, args.port)
+    server.start()
+    print(f"Fake remote API listening on {server.url} (Ctrl-C to stop)")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.stop()
+        print(f"Requests by status: {dict(server.api.stats.statuses)}")
@@ -0,0 +1,70 @@
+#
+# This file is part of the invenio-remote-api-provisioner package.
+# Copyright (C) 2024, MESH Research.
+#
+# invenio-remote-api-provisioner is free software; you can redistribute it
+# and/or modify it under the terms of the MIT License; see
+# LICENSE file for more details.
+
+"""In-memory stand-ins for the objects the provisioner's hot paths use.
+
+Shared by the pytest-benchmark suite and the load test driver, so that
+they measure the provisioner's own code rather than database, search and
+broker round trips.
+"""
+
+from types import SimpleNamespace
+
+from .bench_payload_templates import RECORD, payload_function
+
+
+class BenchCallback:
+    """Stands in for a callback task; dispatching it does nothing."""
+
+    def apply_async(self, *args, **kwargs):
+        pass
+
+
+def owner_payload(identity, record=None, owner=None, **kwargs):
+    """The benchmark payload function, with or without the record owner."""
+    return payload_function(identity, record=record, owner=owner or {})
+
+
+class BenchRecord(dict):
+    """A published record with the attributes the component reads."""
+
+    def __init__(self, data: dict):
+        """Initialize the record."""
+        super().__init__(data)
+        self.parent = {"id": "parent-12345", "access": {"owned_by": {"user": 1}}}
+        self.is_published = True
+        self.is_draft = False
+        self.is_deleted = False
+        self.versions = SimpleNamespace(latest_index=1, index=1)
+
+
+def make_record(record_id: str = RECORD["id"]) -> BenchRecord:
+    """Make a public, published record with the given id."""
+    return BenchRecord(
+        {
+            **RECORD,
+            "id": record_id,
+            "revision_id": 3,
+            "access": {"record": "public"},
+            "custom_fields": {
+                "kcr:commons_search_recid": "2E9SqY0Bdd2QL-HGeUuA",
+                "kcr:commons_search_updated": "2024-01-01T00:00:00+00:00",
+            },
+        }
+    )
+
+
+class BenchUnitOfWork:
+    """Collects the registered task ops instead of sending them."""
+
+    def __init__(self):
+        """Initialize the unit of work."""
+        self.operations = []
+
+    def register(self, op):
+        self.operations.append(op)
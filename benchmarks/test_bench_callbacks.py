@@ -0,0 +1,66 @@
+#
+# This file is part of the invenio-remote-api-provisioner package.
+# Copyright (C) 2024, MESH Research.
+#
+# invenio-remote-api-provisioner is free software; you can redistribute it
+# and/or modify it under the terms of the MIT License; see
+# LICENSE file for more details.
+
+"""Benchmarks for routing callback events to their callback tasks."""
+
+from types import SimpleNamespace
+
+import pytest
+
+from invenio_remote_api_provisioner.ext import on_remote_api_provisioning_triggered
+
+from .conftest import ENDPOINT_COUNTS, endpoint_url, make_app
+
+EVENT_COUNT = 100
+
+
+class BenchQueue:
+    """Yields copies of the same events each time it is consumed."""
+
+    def __init__(self, events: list[dict]):
+        """Initialize the queue."""
+        self.events = events
+
+    def consume(self):
+        for event in self.events:
+            yield dict(event)
+
+
+def make_events(endpoint_count: int, with_endpoint: bool) -> list[dict]:
+    events = []
+    for number in range(EVENT_COUNT):
+        endpoint = endpoint_url(number % endpoint_count)
+        event = {
+            "response_json": {"_id": "2E9SqY0Bdd2QL-HGeUuA"},
+            "service_type": "rdm_record",
+            "service_method": "publish",
+            "request_url": f"{endpoint}/2E9SqY0Bdd2QL-HGeUuA",
+            "payload_object": {"_internal_id": f"record-{number}"},
+            "record": {"id": f"record-{number}"},
+            "draft": None,
+            "data": None,
+        }
+        if with_endpoint:
+            event["endpoint"] = endpoint
+        events.append(event)
+    return events
+
+
+@pytest.mark.parametrize("with_endpoint", [True, False], ids=["endpoint", "url"])
+@pytest.mark.parametrize("endpoint_count", ENDPOINT_COUNTS)
+def test_callback_routing(benchmark, monkeypatch, endpoint_count, with_endpoint):
+    """Route 100 events; "url" events predate the ``endpoint`` field."""
+    monkeypatch.delenv("MOCK_SIGNAL_SUBSCRIBER", raising=False)
+    app = make_app(endpoint_count)
+    queue = BenchQueue(make_events(endpoint_count, with_endpoint))
+    monkeypatch.setattr(
+        "invenio_remote_api_provisioner.ext.current_queues",
+        SimpleNamespace(queues={"remote-api-provisioning-events": queue}),
+    )
+    with app.app_context():
+        benchmark(on_remote_api_provisioning_triggered, app)
@@ -0,0 +1,40 @@
+#
+# This file is part of the invenio-remote-api-provisioner package.
+# Copyright (C) 2024, MESH Research.
+#
+# invenio-remote-api-provisioner is free software; you can redistribute it
+# and/or modify it under the terms of the MIT License; see
+# LICENSE file for more details.
+
+"""Benchmarks for building and running the service component."""
+
+import pytest
+
+from invenio_remote_api_provisioner.components import RemoteAPIProvisionerFactory
+
+from .conftest import ENDPOINT_COUNTS, make_app, make_events
+from .stand_ins import BenchUnitOfWork
+
+
+@pytest.mark.parametrize("endpoint_count", ENDPOINT_COUNTS)
+def test_factory(benchmark, endpoint_count):
+    config = {"REMOTE_API_PROVISIONER_EVENTS": make_events(endpoint_count)}
+    component_class = benchmark(RemoteAPIProvisionerFactory, config, "rdm_record")
+    assert len(component_class.endpoints) == endpoint_count
+
+
+@pytest.mark.parametrize("endpoint_count", ENDPOINT_COUNTS)
+def test_do_method_action(benchmark, endpoint_count, bench_record, bench_identity):
+    app = make_app(endpoint_count)
+    component = app.config["RDM_RECORDS_SERVICE_COMPONENTS"][-1](None)
+    uow = BenchUnitOfWork()
+
+    def publish():
+        uow.operations.clear()
+        component._do_method_action(
+            "publish", bench_identity, bench_record, draft=None, uow=uow
+        )
+
+    with app.app_context():
+        benchmark(publish)
+    assert len(uow.operations) == endpoint_count
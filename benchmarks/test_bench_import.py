@@ -0,0 +1,20 @@
+#
+# This file is part of the invenio-remote-api-provisioner package.
+# Copyright (C) 2024, MESH Research.
+#
+# invenio-remote-api-provisioner is free software; you can redistribute it
+# and/or modify it under the terms of the MIT License; see
+# LICENSE file for more details.
+
+"""Benchmarks and guards for the import time of the extension."""
+
+from .bench_import_time import PACKAGE, find_eager_imports, import_once
+
+
+def test_web_side_imports_stay_lazy():
+    assert find_eager_imports(import_once(f"{PACKAGE}.ext")) == []
+
+
+def test_import_ext(benchmark):
+    """Start an interpreter and import the extension."""
+    benchmark.pedantic(import_once, args=(f"{PACKAGE}.ext",), rounds=5, iterations=1)
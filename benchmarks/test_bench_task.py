@@ -0,0 +1,73 @@
+#
+# This file is part of the invenio-remote-api-provisioner package.
+# Copyright (C) 2024, MESH Research.
+#
+# invenio-remote-api-provisioner is free software; you can redistribute it
+# and/or modify it under the terms of the MIT License; see
+# LICENSE file for more details.
+
+"""Benchmarks for the helpers the provisioning task runs for every event."""
+
+import pytest
+
+from invenio_remote_api_provisioner.headers import get_headers
+from invenio_remote_api_provisioner.proxies import current_remote_api_provisioner
+from invenio_remote_api_provisioner.tasks import get_payload_object, get_request_url
+
+from .conftest import endpoint_url, make_app
+from .stand_ins import owner_payload
+
+KEY = ("rdm_record", endpoint_url(0), "publish")
+
+
+@pytest.fixture
+def app():
+    app = make_app(1)
+    with app.app_context():
+        yield app
+
+
+@pytest.mark.parametrize("with_record_owner", [False, True])
+def test_get_payload_object(
+    benchmark, app, bench_accounts, bench_identity, bench_record, with_record_owner
+):
+    payload_object = benchmark(
+        get_payload_object,
+        bench_identity,
+        owner_payload,
+        record=bench_record,
+        with_record_owner=with_record_owner,
+    )
+    assert payload_object["_internal_id"] == bench_record["id"]
+    assert bool(payload_object["owner"]["name"]) is with_record_owner
+
+
+def test_get_headers(benchmark, app):
+    event_config = app.config["REMOTE_API_PROVISIONER_EVENTS"]["rdm_record"][
+        endpoint_url(0)
+    ]["publish"]
+    header_set = current_remote_api_provisioner.header_sets[KEY]
+
+    def build_headers():
+        headers = get_headers(event_config, None, header_set)
+        headers.maps[0]["Idempotency-Key"] = "task-id"
+        return headers
+
+    headers = benchmark(build_headers)
+    assert headers["Authorization"] == "Bearer 12345"
+
+
+def test_get_request_url(benchmark, app, bench_identity, bench_record):
+    event_config = app.config["REMOTE_API_PROVISIONER_EVENTS"]["rdm_record"][
+        endpoint_url(0)
+    ]["publish"]
+    request_url = benchmark(
+        get_request_url,
+        bench_identity,
+        endpoint_url(0),
+        bench_record,
+        None,
+        event_config,
+        url_template=current_remote_api_provisioner.url_templates[KEY],
+    )
+    assert request_url == f"{endpoint_url(0)}/2E9SqY0Bdd2QL-HGeUuA"
@@ -56,8 +56,13 @@ Configuring event messages:
             as its arguments and returns a dictionary. This allows the
             payload to be dynamically
             generated based on the record data.
-   payload_format: the format of the payload. Currently only ``json`` is
-                   supported. Defaults to ``json``.
+   payload_template: a declarative alternative to ``payload``. See
+                     ``invenio_remote_api_provisioner.templates``.
+   payload_format: the format of the payload. One of ``json``, ``orjson``
+                   (JSON encoded with the faster orjson library) or
+                   ``msgpack``. Defaults to ``json``. The payload is encoded
+                   once per task and the same bytes are reused if the task
+                   is retried.
 
    A full configuration might look like this::
 
@@ -0,0 +1,270 @@
+#
+# This file is part of the invenio-remote-api-provisioner package.
+# Copyright (C) 2024, MESH Research.
+#
+# invenio-remote-api-provisioner is free software; you can redistribute it
+# and/or modify it under the terms of the MIT License; see
+# LICENSE file for more details.
+
+"""Authentication providers for remote API requests.
+
+An event's ``auth`` value is either an ``AuthProvider`` instance or a
+dictionary describing one, e.g.::
+
+    "auth": {
+        "type": "oauth2_client_credentials",
+        "token_url": "https://auth.example.org/oauth/token",
+        "client_id": "...",
+        "client_secret": "...",
+        "scope": "documents:write",
+    }
+
+Providers are built once, at startup, and events with the same settings
+share one provider (and so one token).
+"""
+
+import hashlib
+import json
+import threading
+import time
+
+from flask import current_app, has_app_context
+from invenio_cache import current_cache
+
+from .stores import KEY_PREFIX
+
+
+class AuthProvider:
+    """Base class for the authentication of remote API requests."""
+
+    def get_headers(self) -> dict:
+        """Get the headers that authenticate a request."""
+        raise NotImplementedError
+
+    def invalidate(self) -> None:
+        """Forget any credentials the remote API has rejected."""
+
+
+class StaticTokenAuth(AuthProvider):
+    """Authenticate with a fixed bearer token.
+
+    Parameters:
+        token (str): The bearer token.
+    """
+
+    def __init__(self, token: str):
+        """Initialize the provider."""
+        self.headers = {"Authorization": f"Bearer {token}"}
+
+    def get_headers(self) -> dict:
+        """Get the Authorization header."""
+        return self.headers
+
+
+class OAuth2ClientCredentialsAuth(AuthProvider):
+    """Authenticate with tokens from an OAuth2 client credentials grant.
+
+    The token is cached in the process (and, with ``shared_cache``, in the
+    Invenio cache for every process to use). Once a token is within
+    ``refresh_margin`` seconds of expiring, the next request still uses it
+    while a new token is fetched in the background, so only a process's
+    very first request waits for the token endpoint.
+
+    Parameters:
+        token_url (str): The authorization server's token endpoint.
+        client_id (str): The client id.
+        client_secret (str): The client secret.
+        scope (str): The scope to request, if any.
+        audience (str): The audience to request, if any.
+        refresh_margin (int): Seconds before expiry to refresh the token.
+        shared_cache (bool): Share tokens between processes through the
+            Invenio cache.
+        timeout (int): Seconds to wait for the token endpoint.
+    """
+
+    def __init__(
+        self,
+        token_url: str,
+        client_id: str,
+        client_secret: str,
+        scope: str | None = None,
+        audience: str | None = None,
+        refresh_margin: int = 300,
+        shared_cache: bool = False,
+        timeout: int = 10,
+    ):
+        """Initialize the provider."""
+        self.token_url = token_url
+        self.client_id = client_id
+        self.client_secret = client_secret
+        self.scope = scope
+        self.audience = audience
+        self.refresh_margin = refresh_margin
+        self.shared_cache = shared_cache
+        self.timeout = timeout
+        self._token: dict | None = None
+        self._lock = threading.Lock()
+        self._refreshing = False
+        # Everything sent to the token endpoint, so that providers share a
+        # cached token only if they would request the same one
+        key = hashlib.sha1(
+            json.dumps([token_url, client_id, client_secret, scope, audience]).encode()
+        ).hexdigest()
+        self.cache_key = f"{KEY_PREFIX}:oauth2-token:{key[:16]}"
+
+    def fetch_token(self) -> dict:
+        """Request a new token from the token endpoint.
+
+        Returns:
+            dict: The ``access_token``, its ``token_type``, its lifetime
+            (``expires_in``) and the time (in seconds since the epoch) it
+            ``expires_at``.
+        """
+        data = {"grant_type": "client_credentials"}
+        if self.scope:
+            data["scope"] = self.scope
+        if self.audience:
+            data["audience"] = self.audience
+        # Imported here so that building providers at startup does not
+        # load the HTTP stack in every web process
+        import requests
+
+        response = requests.post(
+            self.token_url,
+            data=data,
+            auth=(self.client_id, self.client_secret),
+            timeout=self.timeout,
+        )
+        if response.status_code != 200:
+            raise RuntimeError(
+                f"Could not get OAuth2 token from {self.token_url} "
+                f"(status code {response.status_code})"
+            )
+        body = response.json()
+        expires_in = int(body.get("expires_in", 3600))
+        return {
+            "access_token": body["access_token"],
+            "token_type": body.get("token_type", "Bearer"),
+            "expires_in": expires_in,
+            "expires_at": time.time() + expires_in,
+        }
+
+    def _store(self, token: dict) -> None:
+        self._token = token
+        if self.shared_cache and has_app_context():
+            current_cache.set(
+                self.cache_key,
+                token,
+                timeout=max(int(token["expires_at"] - time.time()), 1),
+            )
+
+    def _load_shared(self) -> dict | None:
+        if self.shared_cache and has_app_context():
+            return current_cache.get(self.cache_key)
+        return None
+
+    def _refresh(self) -> dict:
+        with self._lock:
+            # Another thread may have refreshed the token while we waited
+            token = self._token
+            if not self._is_fresh(token):
+                token = self._load_shared()
+            if not self._is_fresh(token):
+                token = self.fetch_token()
+            self._store(token)
+            return token
+
+    def _refresh_in_background(self, app) -> None:
+        try:
+            if app is not None:
+                with app.app_context():
+                    self._refresh()
+            else:
+                self._refresh()
+        # requests' exceptions are OSErrors
+        except (OSError, RuntimeError, KeyError, ValueError) as e:
+            if app is not None:
+                app.logger.warning(f"Could not refresh OAuth2 token: {e}")
+        finally:
+            self._refreshing = False
+
+    def _is_fresh(self, token: dict | None) -> bool:
+        if not token:
+            return False
+        # Short-lived tokens are refreshed halfway through their lifetime
+        margin = min(self.refresh_margin, token["expires_in"] / 2)
+        return token["expires_at"] - time.time() > margin
+
+    def get_token(self) -> dict:
+        """Get a valid token, refreshing it ahead of expiry."""
+        token = self._token
+        if not self._is_fresh(token):
+            shared = self._load_shared()
+            if self._is_fresh(shared):
+                self._token = token = shared
+        if self._is_fresh(token):
+            return token
+        if token and token["expires_at"] > time.time():
+            # Still valid: keep using it while a new one is fetched. If the
+            # lock is held, a refresh is already running.
+            if self._lock.acquire(blocking=False):
+                try:
+                    start = not self._refreshing
+                    self._refreshing = True
+                finally:
+                    self._lock.release()
+                if start:
+                    app = (
+                        current_app._get_current_object()
+                        if has_app_context()
+                        else None
+                    )
+                    threading.Thread(
+                        target=self._refresh_in_background, args=(app,), daemon=True
+                    ).start()
+            return token
+        return self._refresh()
+
+    def get_headers(self) -> dict:
+        """Get the Authorization header."""
+        token = self.get_token()
+        return {"Authorization": f"{token['token_type']} {token['access_token']}"}
+
+    def invalidate(self) -> None:
+        """Forget the cached token, e.g. after a 401 response."""
+        with self._lock:
+            self._token = None
+            if self.shared_cache and has_app_context():
+                current_cache.delete(self.cache_key)
+
+
+AUTH_PROVIDERS = {
+    "static": StaticTokenAuth,
+    "oauth2_client_credentials": OAuth2ClientCredentialsAuth,
+}
+
+
+def build_auth_provider(spec, providers: dict | None = None) -> AuthProvider:
+    """Build the auth provider for an event's ``auth`` setting.
+
+    Parameters:
+        spec (AuthProvider | dict): A provider, or a dictionary with the
+            provider ``type`` and its keyword arguments.
+        providers (dict): Providers already built, by their settings. Events
+            with the same settings get the same provider.
+
+    Returns:
+        AuthProvider: The provider.
+    """
+    if isinstance(spec, AuthProvider):
+        return spec
+    if not isinstance(spec, dict) or spec.get("type") not in AUTH_PROVIDERS:
+        raise ValueError(f"Invalid auth provider settings: {spec!r}")
+    key = json.dumps(spec, sort_keys=True, default=str)
+    if providers is not None and key in providers:
+        return providers[key]
+    options = {k: v for k, v in spec.items() if k != "type"}
+    provider = AUTH_PROVIDERS[spec["type"]](**options)
+    if providers is not None:
+        providers[key] = provider
+    return provider
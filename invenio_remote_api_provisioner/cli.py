@@ -0,0 +1,80 @@
+#
+# This file is part of the invenio-remote-api-provisioner package.
+# Copyright (C) 2024, MESH Research.
+#
+# invenio-remote-api-provisioner is free software; you can redistribute it
+# and/or modify it under the terms of the MIT License; see
+# LICENSE file for more details.
+
+"""Command line interface for invenio-remote-api-provisioner."""
+
+import json
+
+import click
+from flask.cli import with_appcontext
+
+from .status import get_status
+
+
+def _seconds(value: float | None) -> str:
+    return "-" if value is None else f"{value:g}s"
+
+
+def format_status(status: dict) -> str:
+    """Format the provisioner's status (from ``get_status``) as text."""
+    lines = [
+        "Queues: "
+        + (
+            ", ".join(
+                f"{name} {'?' if depth is None else depth}"
+                for name, depth in status["queues"].items()
+            )
+            or "-"
+        ),
+        f"Pending tasks: {status['pending']} "
+        f"(oldest about {_seconds(status['oldest_pending_age_seconds'])} old)",
+    ]
+    for endpoint, endpoint_status in status["endpoints"].items():
+        recent = endpoint_status["recent"]
+        lines += [
+            "",
+            f"{endpoint} ({', '.join(endpoint_status['service_types'])})",
+            f"  {'pending':<18}{endpoint_status['pending']} (oldest about "
+            f"{_seconds(endpoint_status['oldest_pending_age_seconds'])} old)",
+            f"  {'in flight':<18}{endpoint_status['in_flight']} (started in the "
+            f"last {status['window_seconds']}s)",
+            f"  {'last ' + str(status['window_seconds']) + 's':<18}"
+            f"{recent['sent']} sent, {recent['skipped']} skipped, "
+            f"{recent['failed']} failed "
+            f"({endpoint_status['error_rate']:.1%} errors), "
+            f"{recent['retried']} retried, {recent['dead_lettered']} dead-lettered",
+        ]
+        for stage, latency in endpoint_status["latency_seconds"].items():
+            percentiles = ", ".join(
+                f"{name} {_seconds(value)}"
+                for name, value in latency.items()
+                if name.startswith("p")
+            )
+            lines.append(
+                f"  {stage:<18}{percentiles} "
+                f"({latency['count']} events, {latency['slo_breaches']} SLO breaches)"
+            )
+        lines.append(f"  {'dead letters':<18}{endpoint_status['dead_letters']}")
+    return "\n".join(lines)
+
+
+@click.group()
+def remote_api_provisioner():
+    """Remote API provisioner commands."""
+
+
+@remote_api_provisioner.command("status")
+@click.option("--json", "as_json", is_flag=True, help="Print the status as JSON.")
+@with_appcontext
+def status(as_json):
+    """Show the provisioner's backlog and the recent activity per endpoint."""
+    current_status = get_status()
+    if as_json:
+        click.echo(json.dumps(current_status, indent=2))
+    else:
+        click.echo(format_status(current_status))
@@ -10,25 +10,122 @@
 """RDM service component to trigger external provisioning messages."""
 
 
-import arrow
+import copy
+from collections import Counter
+from typing import TYPE_CHECKING
+from uuid import uuid4
+
 from flask import current_app
 from flask_principal import Identity
 from invenio_drafts_resources.services.records.components import (
     ServiceComponent,
 )
-from invenio_rdm_records.records.api import RDMDraft, RDMRecord
 from invenio_records_resources.services.uow import (
-    TaskOp,
     UnitOfWork,
     unit_of_work,
 )
 
-from .tasks import send_remote_api_update
+from .server_timing import record_component_time
+from .templates import get_template_paths
+from .timings import EventTimer, phase, reset_current_timer, set_current_timer
+from .tracing import inject_context, start_span
+from .uow import ProvisionerTaskOp
+from .utils import (
+    get_previous_revision,
+    project_fields,
+    watched_fields_changed,
+)
+
+if TYPE_CHECKING:
+    from invenio_rdm_records.records.api import RDMDraft, RDMRecord
 
 # from .signals import remote_api_provisioning_triggered
 # from .utils import get_user_idp_info
 
 
+def _project_documents(record, draft, data, record_fields: tuple) -> tuple:
+    """Project the record, its parent, draft and data to the given fields.
+
+    Paths starting with ``parent.`` select fields of the parent record,
+    since the task exposes the parent as ``record["parent"]``.
+    """
+    parent_fields = ["id"] + [
+        f[len("parent.") :] for f in record_fields if f.startswith("parent.")
+    ]
+    return (
+        project_fields(record, record_fields),
+        project_fields(record.parent, parent_fields),
+        project_fields(draft, record_fields),
+        project_fields(data, record_fields),
+    )
+
+
+def _copy_documents(documents: tuple) -> tuple:
+    """Copy the documents for one task, so no two tasks share them.
+
+    Payload functions may change the record they are given, and tasks run
+    eagerly get the documents as they are rather than deserialized.
+    """
+    return tuple(
+        copy.deepcopy(dict(document)) if isinstance(document, dict) else document
+        for document in documents
+    )
+
+
+# Fields the provisioning task itself reads from every record
+BASE_RECORD_FIELDS = {"id", "slug", "revision_id"}
+
+
+def get_event_record_fields(event_config: dict) -> set[str] | None:
+    """Get the record fields an event's task depends on.
+
+    The fields are those declared in the event's ``record_fields`` list
+    plus those read by its ``payload_template`` and ``url_template``.
+    Fields can only be inferred from templates alone if no other callable
+    (url factory, http method function or callback) might read the record
+    too.
+
+    Returns:
+        set[str] | None: Dotted record paths, or None if the event needs
+        the whole record.
+    """
+    declared = event_config.get("record_fields")
+    template = event_config.get("payload_template")
+    if declared is None and (
+        not template
+        or event_config.get("callback")
+        or (
+            callable(event_config.get("url_factory"))
+            and not event_config.get("url_template")
+        )
+        or callable(event_config.get("http_method"))
+    ):
+        return None
+    fields = set(declared or []) | BASE_RECORD_FIELDS
+    template_paths = get_template_paths(template or {})
+    if event_config.get("url_template"):
+        template_paths |= get_template_paths(
+            {"url": {"format": event_config["url_template"]}}
+        )
+    for path in template_paths:
+        root, _, rest = path.partition(".")
+        if root in ("record", "draft", "data"):
+            if not rest:
+                return None
+            fields.add(rest)
+    return fields
+
+
+def updated_within(timestamp: str | None, seconds: float) -> bool:
+    """Check whether an ISO 8601 timestamp is less than ``seconds`` old."""
+    if not timestamp:
+        return False
+    # Only records with a timing field need a date parser
+    import arrow
+
+    return arrow.get(timestamp).shift(seconds=seconds) > arrow.utcnow()
+
+
 def RemoteAPIProvisionerFactory(app_config, service_type):
     """Factory function to construct a service component to emit messages.
 
@@ -75,9 +172,23 @@ def RemoteAPIProvisionerFactory(app_config, service_type):
     - callback: a callback function to update the record or draft after
                 the remote API call is successful
     - url_factory: a callable that returns the URL string
+    - url_template: a URL string with ``{selector}`` placeholders (e.g.
+                    "{endpoint}/{record.id}"), used instead of url_factory
     - auth_token: the authentication token to use for the request
     - timing_field: the name of the custom field that stores the last
                       update date/time of the record
+    - watch_fields: a list of dotted JSON paths (e.g. "metadata.title");
+                    if given, the event is only sent when one of these
+                    fields differs from the record's previous revision
+    - record_fields: a list of dotted paths of the record fields the
+                     event's payload, url and callback functions read;
+                     if every endpoint for a service method declares
+                     them (or they can be inferred from a payload
+                     template), only those fields are sent to the task
+
+    Endpoints that share a payload function for the same service method
+    have their tasks flagged to memoize the payload, so it is built once
+    per service call rather than once per endpoint.
 
     The component class is responsible for sending the message to the
     endpoint, handling any response, and calling any callback function
@@ -87,6 +198,42 @@ def RemoteAPIProvisionerFactory(app_config, service_type):
     endpoints = all_endpoints.get(service_type, {})
     service_type = service_type
 
+    # The union of the fields needed by every endpoint for each service
+    # method, or None where some endpoint needs the whole record
+    record_projections: dict[str, tuple | None] = {}
+    for events in endpoints.values():
+        for method_name, event_config in events.items():
+            if method_name in record_projections and (
+                record_projections[method_name] is None
+            ):
+                continue
+            event_fields = get_event_record_fields(event_config)
+            if event_fields is None:
+                record_projections[method_name] = None
+            else:
+                known_fields = set(record_projections.get(method_name) or ())
+                record_projections[method_name] = tuple(
+                    sorted(known_fields | event_fields)
+                )
+
+    # The endpoints whose payload function is shared with another endpoint
+    # for the same service method, so their tasks can reuse one payload
+    memoized_payloads: dict[str, set[str]] = {}
+    for method_name in {m for events in endpoints.values() for m in events}:
+        payload_functions = {
+            endpoint: events[method_name].get("payload")
+            for endpoint, events in endpoints.items()
+            if method_name in events
+            and callable(events[method_name].get("payload"))
+            and not events[method_name].get("payload_template")
+        }
+        usage = Counter(payload_functions.values())
+        memoized_payloads[method_name] = {
+            endpoint
+            for endpoint, payload in payload_functions.items()
+            if usage[payload] > 1
+        }
+
     @unit_of_work()
     def publish(self, identity, record, draft=None, uow=None, **kwargs):
         self._do_method_action(
@@ -118,12 +265,58 @@ def RemoteAPIProvisionerFactory(app_config, service_type):
         self,
         service_method: str,
         identity: Identity,
-        record: RDMRecord,
-        draft: RDMDraft | None = None,
+        record: "RDMRecord",
+        draft: "RDMDraft | None" = None,
         data: dict | None = None,
         uow: UnitOfWork | None = None,
         **kwargs,
     ):
+        timer = EventTimer()
+        token = set_current_timer(timer)
+        try:
+            with start_span(
+                "remote_api_provisioner.dispatch",
+                attributes={
+                    "provisioner.service_type": self.service_type,
+                    "provisioner.service_method": service_method,
+                },
+            ):
+                self._queue_events(
+                    service_method,
+                    identity,
+                    record,
+                    draft=draft,
+                    data=data,
+                    uow=uow,
+                    origin_time=timer.started_at,
+                    **kwargs,
+                )
+        finally:
+            reset_current_timer(token)
+        record_component_time(self.service_type, service_method, timer)
+
+    def _queue_events(
+        self,
+        service_method: str,
+        identity: Identity,
+        record: "RDMRecord",
+        draft: "RDMDraft | None" = None,
+        data: dict | None = None,
+        uow: UnitOfWork | None = None,
+        origin_time: float | None = None,
+        **kwargs,
+    ):
+        previous_revision = None
+        previous_revision_loaded = False
+        record_fields = self.record_projections.get(service_method)
+        projected = None
+        memoized_endpoints = self.memoized_payloads.get(service_method, set())
+        # The task module, and the HTTP stack it needs, is only imported
+        # once an event is queued
+        from .tasks import send_remote_api_update
+
+        dispatch_id = uuid4().hex
+        trace_context = inject_context()
         for endpoint, events in self.endpoints.items():
             if service_method in events.keys():
                 # current_app.logger.debug(f"service_method: {service_method}")
@@ -135,20 +328,40 @@ def RemoteAPIProvisionerFactory(app_config, service_type):
                 # )
                 event_config = events[service_method]
                 timing_field = event_config.get("timing_field")
+
+                # Drop the event if none of the fields the remote API
+                # cares about have changed since the last revision
+                watch_fields = event_config.get("watch_fields")
+                if watch_fields and record is not None:
+                    if not previous_revision_loaded:
+                        with phase("previous_revision"):
+                            previous_revision = get_previous_revision(record)
+                        previous_revision_loaded = True
+                    if not watched_fields_changed(
+                        record, previous_revision, watch_fields
+                    ):
+                        current_app.logger.debug(
+                            f"No watched fields changed for {service_method} "
+                            f"on {record.get('id')}. Not sending to {endpoint}."
+                        )
+                        continue
                 # Prevent infinite loop if callback triggers a
                 # subsequent publish by not issuing signal
                 # if record has been updated in the last 30 seconds
                 # NOTE: You will need to update the timing field value in your
                 # callback function. We cannot do this here in case the API
                 # call is not successful.
-                if service_type == "rdm_record":
-                    visibility = record.get("access", {}).get("record", None)
-                    if not visibility and draft:
-                        visibility = draft.get("access", {}).get("record", "public")
-                elif service_type == "community":
-                    visibility = record.get("access", {}).get("visibility", None)
-                else:
-                    raise ValueError(f"Invalid service type: {service_type}")
+                with phase("visibility"):
+                    if service_type == "rdm_record":
+                        visibility = record.get("access", {}).get("record", None)
+                        if not visibility and draft:
+                            visibility = draft.get("access", {}).get(
+                                "record", "public"
+                            )
+                    elif service_type == "community":
+                        visibility = record.get("access", {}).get("visibility", None)
+                    else:
+                        raise ValueError(f"Invalid service type: {service_type}")
 
                 last_update = None
                 if record and visibility == "public":
@@ -167,21 +380,30 @@ def RemoteAPIProvisionerFactory(app_config, service_type):
                     current_app.logger.info(
                         f"Record {recid} last updated " f"at {last_update}"
                     )
-                    last_update_dt = (
-                        arrow.get(last_update)
-                        if last_update
-                        else arrow.utcnow().shift(days=-1)
-                    )
-                    if last_update_dt.shift(seconds=5) > arrow.utcnow():
+                    with phase("timing_check"):
+                        updated_recently = updated_within(last_update, 5)
+                    if updated_recently:
                         current_app.logger.info(
                             "Record has been updated in the last 5 seconds."
                             " Avoiding infinite loop."
                         )
-                        current_app.logger.info(last_update_dt)
+                        current_app.logger.info(last_update)
                     elif record and uow:
+                        if projected is None:
+                            # Ship only the fields the task needs, built
+                            # once and copied for every endpoint's task
+                            with phase("projection"):
+                                projected = (
+                                    _project_documents(
+                                        record, draft, data, record_fields
+                                    )
+                                    if record_fields
+                                    else (record.copy(), record.parent, draft, data)
+                                )
+                        documents = _copy_documents(projected)
                         task_payload = {
                             "identity_id": identity.id,
-                            "record": record.copy(),
+                            "record": documents[0],
                             "is_published": (
                                 record.is_published
                                 if hasattr(record, "is_published")
@@ -195,7 +417,7 @@ def RemoteAPIProvisionerFactory(app_config, service_type):
                                 if hasattr(record, "is_deleted")
                                 else None
                             ),
-                            "parent": record.parent,
+                            "parent": documents[1],
                             "latest_version_index": (
                                 getattr(record.versions, "latest_index", None)
                                 if hasattr(record, "versions")
@@ -206,14 +428,23 @@ def RemoteAPIProvisionerFactory(app_config, service_type):
                                 if hasattr(record, "versions")
                                 else None
                             ),
-                            "draft": draft,
-                            "data": data,
+                            "draft": documents[2],
+                            "data": documents[3],
                             "endpoint": endpoint,
                             "service_type": self.service_type,
                             "service_method": service_method,
+                            "dispatch_id": dispatch_id,
+                            "memoize_payload": endpoint in memoized_endpoints,
+                            "trace_context": trace_context,
+                            "origin_time": origin_time,
                         }
                         # current_app.logger.debug(f"task_payload: {task_payload}")
-                        uow.register(TaskOp(send_remote_api_update, **task_payload))
+                        with phase("register"):
+                            uow.register(
+                                ProvisionerTaskOp(
+                                    send_remote_api_update, **task_payload
+                                )
+                            )
 
     methods = list(
         set(
@@ -228,7 +459,10 @@ def RemoteAPIProvisionerFactory(app_config, service_type):
     component_props = {
         "service_type": service_type,
         "endpoints": endpoints,
+        "record_projections": record_projections,
+        "memoized_payloads": memoized_payloads,
         "_do_method_action": _do_method_action,
+        "_queue_events": _queue_events,
     }
 
     for m in methods:
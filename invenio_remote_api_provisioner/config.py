@@ -15,3 +15,93 @@ REMOTE_API_PROVISIONER_MQ_EXCHANGE = Exchange(
     type="direct",
     delivery_mode="transient",  # in-memory queue
 )
+
+# Exchange for events that could not be sent and will not be retried
+REMOTE_API_PROVISIONER_DEAD_LETTER_EXCHANGE = Exchange(
+    "remote-api-provisioner-dead-letters",
+    type="direct",
+    delivery_mode="persistent",
+)
+
+# Encoding for task arguments and callback events. One of "json", "orjson"
+# or "msgpack". Plain uncompressed "json" keeps Celery's default serializer.
+REMOTE_API_PROVISIONER_MESSAGE_SERIALIZER = "json"
+
+# Compression for encoded messages: None, "gzip" or "zstd"
+REMOTE_API_PROVISIONER_MESSAGE_COMPRESSION = None
+
+# Messages smaller than this many bytes are never compressed
+REMOTE_API_PROVISIONER_MESSAGE_COMPRESSION_THRESHOLD = 4096
+
+# Seconds before entries in the shared provisioning stores (e.g. the payload
+# hashes used by the ``skip_unchanged`` event option or the remote validators
+# used by ``conditional_request``) expire
+REMOTE_API_PROVISIONER_STORE_TIMEOUT = 60 * 60 * 24 * 30
+
+# Seconds a payload built by a payload function shared by several endpoints
+# is kept for the other endpoints' tasks from the same service call
+REMOTE_API_PROVISIONER_PAYLOAD_MEMO_TIMEOUT = 300
+
+# Number of worker processes to build payloads in. 0 (the default) builds
+# payloads in the task itself, or in a thread for events with a
+# ``payload_timeout``. Worth enabling for CPU-heavy payload functions when
+# Celery runs with the threads or gevent pool. Payload functions run in
+# the pool must be picklable and must not use the database or cache
+# connections the forked processes inherit from the Celery worker.
+REMOTE_API_PROVISIONER_PAYLOAD_PROCESSES = 0
+
+# Structured (JSON lines) logging for the provisioner's loggers, written by
+# a background thread. Records are still passed on to the application's own
+# handlers as well.
+REMOTE_API_PROVISIONER_LOG_ENABLED = False
+
+# Records below this level are discarded before they are formatted
+REMOTE_API_PROVISIONER_LOG_LEVEL = "INFO"
+
+# File to write the logs to, or None for stderr
+REMOTE_API_PROVISIONER_LOG_FILE = None
+
+# Size in bytes at which the log file is rotated, and the number of rotated
+# files to keep
+REMOTE_API_PROVISIONER_LOG_FILE_MAX_BYTES = 10_000_000
+REMOTE_API_PROVISIONER_LOG_FILE_BACKUPS = 5
+
+# Queues whose depth is reported by the metrics endpoint
+REMOTE_API_PROVISIONER_METRICS_QUEUES = [
+    "remote-api-provisioning-events",
+    "remote-api-provisioning-dead-letters",
+]
+
+# Bearer token for reading the metrics and status endpoints (e.g. for the
+# Prometheus scraper). Without it only superusers can read them.
+REMOTE_API_PROVISIONER_METRICS_TOKEN = None
+
+# Number of per-event timing breakdowns kept in memory by each process,
+# and a file to also append them to as JSON lines
+REMOTE_API_PROVISIONER_TIMINGS_BUFFER_SIZE = 1000
+REMOTE_API_PROVISIONER_TIMINGS_FILE = None
+
+# Fraction of provisioning tasks to run under cProfile (0 to disable), the
+# duration in seconds above which a sampled task's profile is kept, and the
+# directory to write the profiles to (a temporary directory if None)
+REMOTE_API_PROVISIONER_PROFILE_SAMPLE_RATE = 0.0
+REMOTE_API_PROVISIONER_PROFILE_THRESHOLD = 2.0
+REMOTE_API_PROVISIONER_PROFILE_DIR = None
+
+# Report the time the provisioner's service components add to a request
+# in the response's Server-Timing header
+REMOTE_API_PROVISIONER_SERVER_TIMING = False
+
+# Service level objectives for the end-to-end propagation of events: the
+# seconds from a service call to the remote API's acknowledgement of its
+# event ("remote_ack") and to the completion of the event's callback
+# ("callback_applied"). Slower events are counted as breaches. An event's
+# ``slo_thresholds`` config overrides these.
+REMOTE_API_PROVISIONER_SLO_THRESHOLDS = {
+    "remote_ack": 60,
+    "callback_applied": 120,
+}
+
+# Seconds of recent activity (outcomes, error rate, latency percentiles and
+# SLO breaches) reported per endpoint by the status command and endpoint
+REMOTE_API_PROVISIONER_STATUS_WINDOW = 900
@@ -0,0 +1,193 @@
+#
+# This file is part of the invenio-remote-api-provisioner package.
+# Copyright (C) 2024, MESH Research.
+#
+# invenio-remote-api-provisioner is free software; you can redistribute it
+# and/or modify it under the terms of the MIT License; see
+# LICENSE file for more details.
+
+"""Run payload functions with a time budget or in a process pool.
+
+Payload functions normally run inline in the provisioning task. An event
+may instead give them a time budget (its ``payload_timeout``), in which
+case they run in a small thread pool and the task stops waiting once the
+budget is spent. With ``REMOTE_API_PROVISIONER_PAYLOAD_PROCESSES`` set,
+they run in a pool of forked worker processes instead, so CPU-bound
+formatting does not hold the GIL while other tasks of a threaded (or
+gevent) Celery worker wait on the network.
+
+A payload function that overruns its budget cannot be interrupted; it is
+left to finish in the background and its result is discarded. Once as
+many calls are left running in a pool as it has workers, the pool has no
+worker free for the next payload, so it is retired and the next call
+starts a fresh one.
+
+The process pool is forked from the Celery worker process the first time
+it is used, and its processes inherit everything the worker had open at
+that moment: database connections, cache and broker sockets. These are
+shared with the parent, so a payload function run in the pool must not
+use them (e.g. by querying the database); it should only format the data
+it is given.
+"""
+
+import multiprocessing
+import threading
+from concurrent.futures import (
+    Executor,
+    Future,
+    ProcessPoolExecutor,
+    ThreadPoolExecutor,
+)
+from concurrent.futures import TimeoutError as FutureTimeoutError
+
+from flask import Flask, current_app
+
+PAYLOAD_THREADS = 4
+
+_executors: dict[str, Executor] = {}
+_executors_lock = threading.Lock()
+
+# The number of calls left running after their budget ran out, per pool
+_abandoned: dict[Executor, int] = {}
+
+# The app whose context payload functions run in within the forked pool
+# processes. It is inherited by the children when they are forked.
+_pool_app: Flask | None = None
+
+
+class PayloadTimeoutError(Exception):
+    """A payload function did not return within its time budget."""
+
+
+def _call_in_app_context(app: Flask, func, args: tuple, kwargs: dict):
+    with app.app_context():
+        return func(*args, **kwargs)
+
+
+def _call_in_pool_app(func, args: tuple, kwargs: dict):
+    with _pool_app.app_context():
+        return func(*args, **kwargs)
+
+
+def get_executor(processes: int = 0) -> Executor:
+    """Get the shared executor for payload functions.
+
+    Parameters:
+        processes (int): The number of worker processes, or 0 for the
+            thread pool.
+
+    Returns:
+        Executor: A process pool if ``processes`` is set (and processes can
+        be forked here), otherwise a thread pool.
+    """
+    global _pool_app
+
+    key = "processes" if processes else "threads"
+    with _executors_lock:
+        executor = _executors.get(key)
+        if executor is None:
+            if processes:
+                _pool_app = current_app._get_current_object()
+                executor = ProcessPoolExecutor(
+                    max_workers=processes,
+                    mp_context=multiprocessing.get_context("fork"),
+                )
+            else:
+                executor = ThreadPoolExecutor(
+                    max_workers=PAYLOAD_THREADS,
+                    thread_name_prefix="remote-api-payload",
+                )
+            _executors[key] = executor
+        return executor
+
+
+def _abandon(key: str, executor: Executor, future: Future, workers: int) -> None:
+    """Leave a payload call that overran its budget running in its pool.
+
+    Parameters:
+        key (str): The key of the pool in the shared executors.
+        executor (Executor): The pool running the call.
+        future (Future): The call.
+        workers (int): The number of workers of the pool.
+    """
+
+    def release(future: Future) -> None:
+        with _executors_lock:
+            if executor in _abandoned:
+                _abandoned[executor] -= 1
+
+    with _executors_lock:
+        _abandoned[executor] = _abandoned.get(executor, 0) + 1
+        if _abandoned[executor] >= workers and _executors.get(key) is executor:
+            # Every worker is stuck, so start afresh and leave the stuck
+            # calls to finish (or not) in the background
+            del _executors[key]
+            del _abandoned[executor]
+            executor.shutdown(wait=False)
+            current_app.logger.warning(
+                f"All {workers} payload {key} are stuck on payload functions "
+                "that overran their time budget; starting a new pool"
+            )
+    future.add_done_callback(release)
+
+
+def run_payload_function(
+    func,
+    *args,
+    timeout: float | None = None,
+    processes: int = 0,
+    **kwargs,
+):
+    """Call a payload function, optionally with a budget or in a pool.
+
+    Parameters:
+        func (callable): The payload function. It must be picklable (e.g.
+            a module level function or a ``PayloadTemplate``) to run in
+            the process pool.
+        *args: Positional arguments for the payload function.
+        timeout (float | None): Seconds to wait for the payload.
+        processes (int): Run the function in a pool of this many
+            processes.
+        **kwargs: Keyword arguments for the payload function.
+
+    Raises:
+        PayloadTimeoutError: If the payload is not ready within
+            ``timeout`` seconds.
+    """
+    if not timeout and not processes:
+        return func(*args, **kwargs)
+
+    if processes:
+        try:
+            executor = get_executor(processes)
+            future = executor.submit(_call_in_pool_app, func, args, kwargs)
+        except (AssertionError, OSError, ValueError) as e:
+            # e.g. daemonic worker processes may not fork children
+            current_app.logger.warning(
+                f"Cannot run payload function in a process pool ({e}); "
+                "running it in a thread instead"
+            )
+            processes = 0
+    if not processes:
+        executor = get_executor()
+        future = executor.submit(
+            _call_in_app_context,
+            current_app._get_current_object(),
+            func,
+            args,
+            kwargs,
+        )
+    try:
+        return future.result(timeout=timeout or None)
+    except FutureTimeoutError as e:
+        if not future.cancel():
+            _abandon(
+                "processes" if processes else "threads",
+                executor,
+                future,
+                processes or PAYLOAD_THREADS,
+            )
+        raise PayloadTimeoutError(
+            f"Payload function {getattr(func, '__name__', func)} did not "
+            f"return within {timeout} seconds"
+        ) from e
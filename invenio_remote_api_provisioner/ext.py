@@ -8,22 +8,28 @@
 
 import json
 import os
+import time
 
+from celery.signals import task_success
 from flask import current_app
 from invenio_queues import current_queues
-from invenio_rdm_records.services.communities.components import (
-    CommunityServiceComponents as DefaultCommunityComponents,
-)
-from invenio_rdm_records.services.components import (
-    DefaultRecordsComponents,
-)
 
 from invenio_remote_api_provisioner.signals import (
     remote_api_provisioning_triggered,
 )
 
 from . import config
+from .auth import build_auth_provider
 from .components import RemoteAPIProvisionerFactory
+from .headers import build_header_set
+from .logs import setup_logging
+from .metrics import CALLBACK_SECONDS
+from .serializers import SERIALIZER_NAME, get_message_serializer
+from .server_timing import add_server_timing
+from .slo import on_task_success
+from .templates import PayloadTemplate, compile_format
+from .tracing import start_span
+from .validation import compile_schema
 
 
 def on_remote_api_provisioning_triggered(
@@ -42,6 +48,8 @@ def on_remote_api_provisioning_triggered(
     - "response_json" (dict): The JSON response from the external API
     - "service_type" (str): The type of service that was called
     - "service_method" (str): The method of the service that was called
+    - "endpoint" (str): The configured endpoint the request was sent to
+        (if missing, the endpoint is looked up from the request URL)
     - "request_url" (str): The URL that was requested of the external API
     - "payload_object" (dict): The JSON payload that was sent to the external
         API
@@ -73,14 +81,39 @@ def on_remote_api_provisioning_triggered(
             # app_obj.logger.debug("service conf:")
             # app_obj.logger.debug(pformat(conf.keys()))
             # app_obj.logger.debug(f"event request_url: {event['request_url']}")
-            endpoint_conf = [v for k, v in conf.items() if k in event["request_url"]][0]
+            extension = app_obj.extensions["invenio-remote-api-provisioner"]
+            endpoint = extension.get_endpoint(
+                event["service_type"],
+                request_url=event["request_url"],
+                endpoint=event.get("endpoint"),
+            )
+            endpoint_conf = conf[endpoint]
             method_conf = endpoint_conf[event["service_method"]]
             callback = method_conf.get("callback")
             # Because it's called as a linked callback from another task,
             # the signature will receive the result of the prior task
             # as the first argument.
 
-            callback.delay(**event)
+            options = {}
+            serializer = get_message_serializer(app_obj.config)
+            if serializer:
+                options["serializer"] = serializer
+            published_at = event.pop("published_at", None)
+            with start_span(
+                "remote_api_provisioner.dispatch_callback",
+                carrier=event.pop("trace_context", None),
+                attributes={
+                    "provisioner.service_type": event["service_type"],
+                    "provisioner.service_method": event["service_method"],
+                    "provisioner.endpoint": endpoint,
+                },
+                kind="CONSUMER",
+            ):
+                callback.apply_async(kwargs=event, **options)
+            if published_at:
+                CALLBACK_SECONDS.labels(
+                    event["service_type"], event["service_method"]
+                ).observe(max(time.time() - published_at, 0))
 
             # callback_signature = callback.s(**event) if callback else None
 
@@ -100,6 +133,13 @@ class InvenioRemoteAPIProvisioner:
 
     def __init__(self, app=None) -> None:
         """Extention initialization."""
+        self.payload_templates = {}
+        self.payload_validators = {}
+        self.url_templates = {}
+        self.auth_providers = {}
+        self.header_sets = {}
+        self.endpoint_index = {}
+        self.callback_names = set()
         if app:
             self.init_app(app)
 
@@ -111,6 +151,8 @@ class InvenioRemoteAPIProvisioner:
                 the extension
         """
         self.init_config(app)
+        setup_logging(app)
+        self.compile_events(app)
         self.init_listeners(app)
         app.extensions["invenio-remote-api-provisioner"] = self
 
@@ -125,24 +167,114 @@ class InvenioRemoteAPIProvisioner:
             if k.startswith("REMOTE_API_PROVISIONER_"):
                 app.config.setdefault(k, getattr(config, k))
 
+        # Workers must accept the compact message content type if it is used
+        if get_message_serializer(app.config):
+            accept_content = app.config.get("CELERY_ACCEPT_CONTENT", ["json"])
+            if SERIALIZER_NAME not in accept_content:
+                app.config["CELERY_ACCEPT_CONTENT"] = [
+                    *accept_content,
+                    SERIALIZER_NAME,
+                ]
+
         records_component = RemoteAPIProvisionerFactory(app.config, "rdm_record")
-        old_record_components = app.config.get(
-            "RDM_RECORDS_SERVICE_COMPONENTS", [*DefaultRecordsComponents]
-        )
+        old_record_components = app.config.get("RDM_RECORDS_SERVICE_COMPONENTS")
+        if old_record_components is None:
+            from invenio_rdm_records.services.components import (
+                DefaultRecordsComponents,
+            )
+
+            old_record_components = [*DefaultRecordsComponents]
         app.config["RDM_RECORDS_SERVICE_COMPONENTS"] = [
             *old_record_components,
             records_component,
         ]
 
         community_component = RemoteAPIProvisionerFactory(app.config, "community")
-        old_community_components = app.config.get(
-            "COMMUNITIES_SERVICE_COMPONENTS", [*DefaultCommunityComponents]
-        )
+        old_community_components = app.config.get("COMMUNITIES_SERVICE_COMPONENTS")
+        if old_community_components is None:
+            from invenio_rdm_records.services.communities.components import (
+                CommunityServiceComponents,
+            )
+
+            old_community_components = [*CommunityServiceComponents]
         app.config["COMMUNITIES_SERVICE_COMPONENTS"] = [
             *old_community_components,
             community_component,
         ]
 
+    def compile_events(self, app) -> None:
+        """Compile the declarative parts of the event configuration.
+
+        Declarative payload templates, payload schemas, url templates,
+        auth providers and the read-only sets of fixed request headers are
+        built once here, at startup, and stored by (service type,
+        endpoint, service method). The configured endpoints are also
+        indexed by service type for ``get_endpoint``, and the names of
+        the callback tasks are collected to track their completion.
+
+        Args:
+            app (Flask): the Flask application object on which to initialize
+                the extension
+        """
+        all_events = app.config.get("REMOTE_API_PROVISIONER_EVENTS", {})
+        providers = {}
+        for service_type, endpoints in all_events.items():
+            # Longest first, so the most specific endpoint matches a URL
+            self.endpoint_index[service_type] = tuple(
+                sorted(endpoints.keys(), key=len, reverse=True)
+            )
+            for endpoint, events in endpoints.items():
+                for service_method, event_config in events.items():
+                    key = (service_type, endpoint, service_method)
+                    self.header_sets[key] = build_header_set(event_config)
+                    if event_config.get("payload_template"):
+                        self.payload_templates[key] = PayloadTemplate(
+                            event_config["payload_template"]
+                        )
+                    if event_config.get("payload_schema"):
+                        self.payload_validators[key] = compile_schema(
+                            event_config["payload_schema"]
+                        )
+                    if event_config.get("url_template"):
+                        self.url_templates[key] = compile_format(
+                            event_config["url_template"], strict=True
+                        )
+                    if getattr(event_config.get("callback"), "name", None):
+                        self.callback_names.add(event_config["callback"].name)
+                    if event_config.get("auth"):
+                        self.auth_providers[key] = build_auth_provider(
+                            event_config["auth"], providers
+                        )
+
+    def get_endpoint(
+        self,
+        service_type: str,
+        request_url: str = "",
+        endpoint: str | None = None,
+    ) -> str | None:
+        """Get the configured endpoint an event was sent to.
+
+        Args:
+            service_type (str): The service type of the event.
+            request_url (str): The URL the request was sent to, which
+                starts with (or contains) the endpoint.
+            endpoint (str): The endpoint recorded with the event, if any.
+
+        Returns:
+            str | None: The endpoint as configured in
+            REMOTE_API_PROVISIONER_EVENTS, or None if none matches.
+        """
+        endpoints = self.endpoint_index.get(service_type, ())
+        if endpoint in endpoints:
+            return endpoint
+        for candidate in endpoints:
+            if request_url.startswith(candidate):
+                return candidate
+        for candidate in endpoints:
+            if candidate in request_url:
+                return candidate
+        return None
+
     def init_listeners(self, app) -> None:
         """Initialize listeners for the extension.
 
@@ -152,3 +284,9 @@ class InvenioRemoteAPIProvisioner:
         remote_api_provisioning_triggered.connect(
             on_remote_api_provisioning_triggered, app
         )
+        app.after_request(add_server_timing)
+        # Once per process; the handler finds the app each task ran in
+        task_success.connect(
+            on_task_success,
+            dispatch_uid="invenio-remote-api-provisioner-callback-applied",
+        )
@@ -0,0 +1,66 @@
+#
+# This file is part of the invenio-remote-api-provisioner package.
+# Copyright (C) 2024, MESH Research.
+#
+# invenio-remote-api-provisioner is free software; you can redistribute it
+# and/or modify it under the terms of the MIT License; see
+# LICENSE file for more details.
+
+"""Request headers for remote API events.
+
+The fixed headers of each event are built once, at startup, by the
+extension. They are kept apart from the provisioning task so that the
+web processes building them need not import the task's HTTP stack.
+"""
+
+from collections import ChainMap
+from collections.abc import Mapping
+from types import MappingProxyType
+
+from .auth import AuthProvider
+from .serializers import PAYLOAD_CONTENT_TYPES
+
+
+def build_header_set(event_config: dict) -> Mapping:
+    """Build the fixed headers sent with every request for an event.
+
+    These are the event's configured ``headers``, the Authorization header
+    for a static ``auth_token`` and the Content-Type of its payload format.
+    The header set is read-only, so it can be shared by every task.
+
+    Returns:
+        Mapping: A read-only view of the headers.
+    """
+    headers = dict(event_config.get("headers") or {})
+    if event_config.get("auth_token") and not event_config.get("auth"):
+        headers["Authorization"] = f"Bearer {event_config['auth_token']}"
+    if event_config.get("payload") or event_config.get("payload_template"):
+        headers.setdefault(
+            "Content-Type",
+            PAYLOAD_CONTENT_TYPES[event_config.get("payload_format", "json")],
+        )
+    return MappingProxyType(headers)
+
+
+def get_headers(
+    event_config: dict,
+    auth_provider: AuthProvider | None = None,
+    header_set: Mapping | None = None,
+) -> ChainMap:
+    """Get the headers for one request.
+
+    Parameters:
+        event_config (dict): The event configuration.
+        auth_provider (AuthProvider): The event's auth provider, if any.
+        header_set (Mapping): The event's precompiled header set. Built
+            from the event configuration if not given.
+
+    Returns:
+        ChainMap: The request's own headers layered over the shared,
+        read-only header set. Add further headers for the request with
+        ``new_child`` rather than by updating the result.
+    """
+    if header_set is None:
+        header_set = build_header_set(event_config)
+    request_headers = auth_provider.get_headers() if auth_provider else {}
+    return ChainMap(dict(request_headers), header_set)
@@ -0,0 +1,170 @@
+#
+# This file is part of the invenio-remote-api-provisioner package.
+# Copyright (C) 2024, MESH Research.
+#
+# invenio-remote-api-provisioner is free software; you can redistribute it
+# and/or modify it under the terms of the MIT License; see
+# LICENSE file for more details.
+
+"""Non-blocking, structured logging for the provisioner.
+
+The pipeline is opt-in, with ``REMOTE_API_PROVISIONER_LOG_ENABLED``. The
+``invenio_remote_api_provisioner`` loggers only get a handler when the
+extension is initialized, never at import. Records at or above
+``REMOTE_API_PROVISIONER_LOG_LEVEL`` are put on an in-memory queue by a
+``QueueHandler`` and formatted and written by a ``QueueListener`` thread,
+so a task never waits for a log write. Records below the level are
+dropped by the logger before any message is formatted.
+
+Logs are written as JSON lines, one object per record, to stderr or to
+``REMOTE_API_PROVISIONER_LOG_FILE``. Values passed in a log call's
+``extra`` mapping become fields of the JSON object. Records still
+propagate to the application's own handlers (e.g. Sentry's).
+"""
+
+import atexit
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import sys
+import threading
+import time
+
+from celery import current_task
+
+LOGGER_NAME = "invenio_remote_api_provisioner"
+
+# Attributes every LogRecord has, which are not structured ``extra`` fields
+_RECORD_ATTRIBUTES = set(
+    vars(logging.LogRecord("", logging.INFO, "", 0, "", (), None))
+) | {"message", "asctime", "taskName", "task_id"}
+
+_listener: logging.handlers.QueueListener | None = None
+_queue_handler: logging.handlers.QueueHandler | None = None
+_listener_lock = threading.Lock()
+
+
+class JSONFormatter(logging.Formatter):
+    """Format log records as single-line JSON objects."""
+
+    converter = time.gmtime
+
+    def format(self, record: logging.LogRecord) -> str:
+        """Format a record, including any structured ``extra`` fields."""
+        entry = {
+            "time": self.formatTime(record, "%Y-%m-%dT%H:%M:%S")
+            + f".{int(record.msecs):03d}Z",
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        task_id = getattr(record, "task_id", None)
+        if task_id:
+            entry["task_id"] = task_id
+        for key, value in vars(record).items():
+            if key not in _RECORD_ATTRIBUTES and key not in entry:
+                entry[key] = value
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            entry["exception"] = record.exc_text
+        return json.dumps(entry, default=str)
+
+
+class DeferredQueueHandler(logging.handlers.QueueHandler):
+    """A queue handler that leaves message formatting to the listener.
+
+    The standard ``QueueHandler`` merges the message and its arguments in
+    the logging thread. Here only the traceback (which cannot outlive the
+    call) is rendered before the record is queued.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        """Prepare a record for queueing without formatting it."""
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        if not hasattr(record, "task_id"):
+            record.task_id = _current_task_id()
+        return record
+
+
+def _current_task_id() -> str | None:
+    request = getattr(current_task, "request", None)
+    return getattr(request, "id", None)
+
+
+def _build_handler(config) -> logging.Handler:
+    log_file = config.get("REMOTE_API_PROVISIONER_LOG_FILE")
+    if log_file:
+        handler = logging.handlers.RotatingFileHandler(
+            log_file,
+            maxBytes=config.get("REMOTE_API_PROVISIONER_LOG_FILE_MAX_BYTES", 10**7),
+            backupCount=config.get("REMOTE_API_PROVISIONER_LOG_FILE_BACKUPS", 5),
+        )
+    else:
+        handler = logging.StreamHandler(sys.stderr)
+    handler.setFormatter(JSONFormatter())
+    return handler
+
+
+def _restart_listener_in_child() -> None:
+    # Threads do not survive a fork (e.g. into Celery's prefork pool), so
+    # the child needs its own queue and listener thread
+    global _listener
+
+    if _listener is None or _queue_handler is None:
+        return
+    log_queue = queue.SimpleQueue()
+    _queue_handler.queue = log_queue
+    _listener = logging.handlers.QueueListener(
+        log_queue, *_listener.handlers, respect_handler_level=True
+    )
+    _listener.start()
+
+
+def stop_logging() -> None:
+    """Flush queued records and stop the listener thread."""
+    global _listener, _queue_handler
+
+    with _listener_lock:
+        if _listener is not None:
+            _listener.stop()
+            for handler in _listener.handlers:
+                handler.close()
+        if _queue_handler is not None:
+            logging.getLogger(LOGGER_NAME).removeHandler(_queue_handler)
+        _listener = None
+        _queue_handler = None
+
+
+def setup_logging(app) -> None:
+    """Set up the provisioner's logging pipeline for an app.
+
+    Only the first call in a process sets up the pipeline, since the
+    extension is initialized for both the UI and the API app.
+
+    Args:
+        app (Flask): The application whose config holds the
+            ``REMOTE_API_PROVISIONER_LOG_*`` settings.
+    """
+    global _listener, _queue_handler
+
+    if not app.config.get("REMOTE_API_PROVISIONER_LOG_ENABLED", False):
+        return
+    with _listener_lock:
+        if _listener is not None:
+            return
+        logger = logging.getLogger(LOGGER_NAME)
+        logger.setLevel(app.config.get("REMOTE_API_PROVISIONER_LOG_LEVEL", "INFO"))
+        log_queue = queue.SimpleQueue()
+        _queue_handler = DeferredQueueHandler(log_queue)
+        _listener = logging.handlers.QueueListener(
+            log_queue, _build_handler(app.config), respect_handler_level=True
+        )
+        logger.addHandler(_queue_handler)
+        _listener.start()
+    atexit.register(stop_logging)
+    os.register_at_fork(after_in_child=_restart_listener_in_child)
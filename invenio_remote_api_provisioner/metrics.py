@@ -0,0 +1,227 @@
+#
+# This file is part of the invenio-remote-api-provisioner package.
+# Copyright (C) 2024, MESH Research.
+#
+# invenio-remote-api-provisioner is free software; you can redistribute it
+# and/or modify it under the terms of the MIT License; see
+# LICENSE file for more details.
+
+"""Prometheus metrics for provisioning throughput, latency and backlog.
+
+Counters and histograms are kept with ``prometheus_client`` (an optional
+dependency; without it every metric is a no-op). When the
+``PROMETHEUS_MULTIPROC_DIR`` environment variable is set, as it must be
+for Celery's prefork pool or a multi-process web server, the values
+recorded by every process are combined when the metrics are collected.
+
+The backlog gauges are read from the shared provisioning stores and the
+provisioner's message queues when the metrics are collected, so they are
+the same whichever process serves them.
+"""
+
+import os
+import time
+from contextlib import contextmanager
+
+from flask import current_app
+from invenio_queues import current_queues
+
+from .stores import CounterBatch, get_backlog, increment_recent_counter
+
+try:
+    import prometheus_client
+    from prometheus_client import multiprocess
+    from prometheus_client.core import GaugeMetricFamily
+except ImportError:  # pragma: no cover
+    prometheus_client = None
+
+EVENT_LABELS = ("service_type", "endpoint", "service_method")
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+PROPAGATION_BUCKETS = (0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600, 1800, 3600)
+
+
+class _NoopMetric:
+    def labels(self, *args, **kwargs):
+        return self
+
+    def inc(self, amount=1):
+        pass
+
+    def observe(self, value):
+        pass
+
+
+def _metric(kind: str, name: str, documentation: str, labels: tuple, **kwargs):
+    if prometheus_client is None:
+        return _NoopMetric()
+    return getattr(prometheus_client, kind)(name, documentation, labels, **kwargs)
+
+
+EVENTS = _metric(
+    "Counter",
+    "remote_api_provisioner_events",
+    "Provisioning events by outcome",
+    (*EVENT_LABELS, "outcome"),
+)
+ENQUEUE_SECONDS = _metric(
+    "Histogram",
+    "remote_api_provisioner_enqueue_seconds",
+    "Time the service component spends queueing a service call's events",
+    ("service_type", "service_method"),
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25),
+)
+COMPONENT_PHASE_SECONDS = _metric(
+    "Histogram",
+    "remote_api_provisioner_component_phase_seconds",
+    "Time the service component spends in each phase of queueing events",
+    ("service_type", "service_method", "phase"),
+    buckets=(0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05),
+)
+PAYLOAD_BUILD_SECONDS = _metric(
+    "Histogram",
+    "remote_api_provisioner_payload_build_seconds",
+    "Time taken to build and encode an event's payload",
+    EVENT_LABELS,
+    buckets=LATENCY_BUCKETS,
+)
+HTTP_REQUEST_SECONDS = _metric(
+    "Histogram",
+    "remote_api_provisioner_http_request_seconds",
+    "Latency of requests to remote APIs",
+    EVENT_LABELS,
+    buckets=LATENCY_BUCKETS,
+)
+CALLBACK_SECONDS = _metric(
+    "Histogram",
+    "remote_api_provisioner_callback_seconds",
+    "Time from a remote API response to the dispatch of its callback",
+    ("service_type", "service_method"),
+    buckets=LATENCY_BUCKETS,
+)
+PROPAGATION_SECONDS = _metric(
+    "Histogram",
+    "remote_api_provisioner_propagation_seconds",
+    "Time from a service call to each stage of its event's propagation",
+    ("service_type", "endpoint", "stage"),
+    buckets=PROPAGATION_BUCKETS,
+)
+SLO_BREACHES = _metric(
+    "Counter",
+    "remote_api_provisioner_slo_breaches",
+    "Events whose propagation took longer than the stage's SLO threshold",
+    ("service_type", "endpoint", "stage"),
+)
+
+
+def count_event(
+    outcome: str,
+    service_type: str,
+    endpoint: str,
+    service_method: str,
+    batch: CounterBatch | None = None,
+) -> None:
+    """Count a provisioning event with the given outcome.
+
+    The event is counted in the metrics, and in the shared recent
+    counters of its endpoint used by the provisioner's status (added to
+    ``batch``, if given).
+    """
+    EVENTS.labels(service_type, endpoint, service_method, outcome).inc()
+    increment_recent_counter(f"outcome:{outcome}", endpoint, batch=batch)
+
+
+@contextmanager
+def timed(histogram, *labels):
+    """Observe the duration of a block in a histogram."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        histogram.labels(*labels).observe(time.perf_counter() - start)
+
+
+def get_queue_depth(queue_name: str) -> int | None:
+    """Get the number of messages waiting in one of the provisioner's queues."""
+    queue = current_queues.queues.get(queue_name)
+    if queue is None:
+        return None
+    try:
+        with queue.connection_pool.acquire(block=True) as connection:
+            bound = queue.queue.bind(connection.default_channel)
+            _, message_count, _ = bound.queue_declare(passive=True)
+            return message_count
+    except Exception:  # the queue may not exist yet, or the broker be down
+        return None
+
+
+class BacklogCollector:
+    """Collects the backlog gauges when the metrics are scraped."""
+
+    def collect(self):
+        """Yield the backlog gauges."""
+        pending, oldest_age = get_backlog()
+        yield GaugeMetricFamily(
+            "remote_api_provisioner_pending_events",
+            "Provisioning tasks queued but not yet started",
+            value=pending,
+        )
+        yield GaugeMetricFamily(
+            "remote_api_provisioner_oldest_pending_event_age_seconds",
+            "Estimated age of the oldest queued provisioning task",
+            value=oldest_age,
+        )
+        depth = GaugeMetricFamily(
+            "remote_api_provisioner_queue_depth",
+            "Messages waiting in the provisioner's message queues",
+            labels=("queue",),
+        )
+        for queue_name in current_app.config.get(
+            "REMOTE_API_PROVISIONER_METRICS_QUEUES", []
+        ):
+            count = get_queue_depth(queue_name)
+            if count is not None:
+                depth.add_metric((queue_name,), count)
+        yield depth
+
+
+def get_registry():
+    """Get a registry holding every process's metrics and the gauges."""
+    if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        registry = prometheus_client.CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = prometheus_client.CollectorRegistry()
+        for collector in (
+            EVENTS,
+            ENQUEUE_SECONDS,
+            COMPONENT_PHASE_SECONDS,
+            PAYLOAD_BUILD_SECONDS,
+            HTTP_REQUEST_SECONDS,
+            CALLBACK_SECONDS,
+            PROPAGATION_SECONDS,
+            SLO_BREACHES,
+        ):
+            registry.register(collector)
+    registry.register(BacklogCollector())
+    return registry
+
+
+def generate_metrics() -> tuple[bytes, str]:
+    """Render the metrics in the Prometheus text format.
+
+    Returns:
+        tuple[bytes, str]: The metrics and their content type.
+    """
+    if prometheus_client is None:
+        raise RuntimeError("Provisioning metrics require prometheus_client")
+    return (
+        prometheus_client.generate_latest(get_registry()),
+        prometheus_client.CONTENT_TYPE_LATEST,
+    )
+
+
+def write_textfile(path: str) -> None:
+    """Write the metrics to a file for node_exporter's textfile collector."""
+    if prometheus_client is None:
+        raise RuntimeError("Provisioning metrics require prometheus_client")
+    prometheus_client.write_to_textfile(path, get_registry())
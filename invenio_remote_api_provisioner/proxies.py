@@ -0,0 +1,17 @@
+#
+# This file is part of the invenio-remote-api-provisioner package.
+# Copyright (C) 2024, MESH Research.
+#
+# invenio-remote-api-provisioner is free software; you can redistribute it
+# and/or modify it under the terms of the MIT License; see
+# LICENSE file for more details.
+
+"""Proxies for invenio-remote-api-provisioner."""
+
+from flask import current_app
+from werkzeug.local import LocalProxy
+
+current_remote_api_provisioner = LocalProxy(
+    lambda: current_app.extensions["invenio-remote-api-provisioner"]
+)
+"""Proxy to the InvenioRemoteAPIProvisioner extension instance."""
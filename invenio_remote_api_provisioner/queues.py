@@ -8,7 +8,15 @@
 
 """Message queues."""
 
+from datetime import datetime, timezone
+
 from flask import current_app
+from invenio_queues import current_queues
+
+from .serializers import get_message_serializer
+from .stores import increment_counter
+
+DEAD_LETTER_QUEUE = "remote-api-provisioning-dead-letters"
 
 
 def declare_queues():
@@ -19,5 +27,56 @@ def declare_queues():
             "exchange": current_app.config[
                 "REMOTE_API_PROVISIONER_MQ_EXCHANGE"
             ],
-        }
+        },
+        {
+            "name": DEAD_LETTER_QUEUE,
+            "exchange": current_app.config[
+                "REMOTE_API_PROVISIONER_DEAD_LETTER_EXCHANGE"
+            ],
+        },
     ]
+
+
+def publish_events(
+    events: list[dict], queue_name: str = "remote-api-provisioning-events"
+) -> None:
+    """Publish events to one of the provisioner's queues.
+
+    Uses the provisioner's compact message serializer when one is
+    configured, otherwise defers to the queue's default (JSON) publishing.
+
+    Parameters:
+        events (list[dict]): The events to publish.
+        queue_name (str): The name of the queue to publish to.
+    """
+    queue = current_queues.queues[queue_name]
+    serializer = get_message_serializer()
+    if not serializer:
+        queue.publish(events)
+        return
+    with queue.create_producer() as producer:
+        for event in events:
+            producer.publish(event, serializer=serializer)
+
+
+def send_to_dead_letters(reason: str, endpoint: str = "", **details) -> None:
+    """Record an event that failed for good in the dead-letter queue.
+
+    Parameters:
+        reason (str): Why the event could not be sent.
+        endpoint (str): The endpoint the event was meant for.
+        **details: Anything else needed to inspect or replay the event
+            (e.g. the service type and method and the record id).
+    """
+    publish_events(
+        [
+            {
+                "reason": reason,
+                "endpoint": endpoint,
+                "failed_at": datetime.now(timezone.utc).isoformat(),
+                **details,
+            }
+        ],
+        queue_name=DEAD_LETTER_QUEUE,
+    )
+    increment_counter("dead-letters", endpoint)
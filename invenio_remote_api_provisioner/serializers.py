@@ -0,0 +1,284 @@
+#
+# This file is part of the invenio-remote-api-provisioner package.
+# Copyright (C) 2024, MESH Research.
+#
+# invenio-remote-api-provisioner is free software; you can redistribute it
+# and/or modify it under the terms of the MIT License; see
+# LICENSE file for more details.
+
+"""Compact message encoding for task and callback payloads.
+
+The records, drafts and parents handed to ``send_remote_api_update`` and
+the callback events published to the ``remote-api-provisioning-events``
+queue are large JSON documents. This module registers a kombu serializer
+that can encode those messages with ``orjson`` or ``msgpack`` and compress
+them with ``gzip`` or ``zstd`` once they exceed a size threshold.
+
+Every encoded message starts with a two-byte header naming the codec and
+the compression used, so a consumer can always decode a message no matter
+how the producing process was configured.
+
+Messages accept the same values as kombu's default JSON serializer:
+values JSON cannot hold (datetimes, UUIDs, decimals...) are encoded with
+kombu's JSON encoder and decoded back into their types (except that
+``orjson`` writes UUIDs as plain strings itself). Request payloads
+get no such help, so their values must be JSON (or msgpack) values.
+
+The serializer is only used when the ``REMOTE_API_PROVISIONER_MESSAGE_*``
+config variables ask for something other than plain, uncompressed JSON.
+"""
+
+import gzip
+import json
+import logging
+import time
+
+from flask import current_app, has_app_context
+from kombu.serialization import register
+from kombu.utils import json as kombu_json
+
+try:
+    import msgpack
+except ImportError:  # pragma: no cover
+    msgpack = None
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover
+    zstandard = None
+
+SERIALIZER_NAME = "remote-api-provisioner"
+CONTENT_TYPE = "application/x-remote-api-provisioner"
+
+CODECS = {"json": b"j", "orjson": b"o", "msgpack": b"m"}
+PAYLOAD_CONTENT_TYPES = {
+    "json": "application/json",
+    "orjson": "application/json",
+    "msgpack": "application/msgpack",
+}
+COMPRESSIONS = {None: b"-", "gzip": b"g", "zstd": b"z"}
+
+logger = logging.getLogger(__name__)
+
+# Encodes the values JSON cannot hold as kombu's JSON serializer does
+_kombu_default = kombu_json.JSONEncoder().default
+# Let orjson pass the types it would turn into strings to the default
+_ORJSON_PASSTHROUGH = (
+    (
+        orjson.OPT_PASSTHROUGH_DATETIME
+        | orjson.OPT_PASSTHROUGH_DATACLASS
+        | orjson.OPT_PASSTHROUGH_SUBCLASS
+    )
+    if orjson
+    else 0
+)
+
+
+def _encode_body(obj, codec: str, default=None) -> bytes:
+    if codec == "orjson":
+        if orjson is None:
+            raise RuntimeError("The orjson message codec requires orjson")
+        if default is None:
+            return orjson.dumps(obj)
+        return orjson.dumps(obj, default=default, option=_ORJSON_PASSTHROUGH)
+    elif codec == "msgpack":
+        if msgpack is None:
+            raise RuntimeError("The msgpack message codec requires msgpack")
+        return msgpack.packb(obj, use_bin_type=True, default=default)
+    elif codec == "json":
+        return json.dumps(obj, separators=(",", ":"), default=default).encode()
+    raise ValueError(f"Unknown message codec: {codec}")
+
+
+def _decode_body(body: bytes, codec_flag: bytes):
+    # Only bodies holding kombu's type envelopes need its (slower) decoding
+    typed = b"__type__" in body
+    if codec_flag == CODECS["msgpack"]:
+        if msgpack is None:
+            raise RuntimeError("Cannot decode msgpack message without msgpack")
+        return msgpack.unpackb(
+            body,
+            raw=False,
+            object_hook=getattr(kombu_json, "object_hook", None) if typed else None,
+        )
+    elif codec_flag in (CODECS["json"], CODECS["orjson"]):
+        if typed:
+            return kombu_json.loads(body)
+        return orjson.loads(body) if orjson else json.loads(body)
+    raise ValueError(f"Unknown message codec flag: {codec_flag!r}")
+
+
+def _compress(
+    body: bytes, compression: str | None, level: int | None = None
+) -> bytes:
+    if compression == "gzip":
+        return gzip.compress(body, compresslevel=5 if level is None else level)
+    elif compression == "zstd":
+        if zstandard is None:
+            raise RuntimeError("The zstd message compression requires zstandard")
+        return zstandard.ZstdCompressor(
+            level=3 if level is None else level
+        ).compress(body)
+    raise ValueError(f"Unknown message compression: {compression}")
+
+
+def _decompress(body: bytes, compression_flag: bytes) -> bytes:
+    if compression_flag == COMPRESSIONS[None]:
+        return body
+    elif compression_flag == COMPRESSIONS["gzip"]:
+        return gzip.decompress(body)
+    elif compression_flag == COMPRESSIONS["zstd"]:
+        if zstandard is None:
+            raise RuntimeError("Cannot decode zstd message without zstandard")
+        return zstandard.ZstdDecompressor().decompress(body)
+    raise ValueError(f"Unknown message compression flag: {compression_flag!r}")
+
+
+def encode_message(
+    obj,
+    codec: str = "json",
+    compression: str | None = None,
+    threshold: int = 4096,
+) -> bytes:
+    """Encode a message object into framed bytes.
+
+    Parameters:
+        obj: The message object to encode. Values JSON cannot hold are
+            encoded as kombu's JSON serializer encodes them.
+        codec (str): One of ``json``, ``orjson`` or ``msgpack``.
+        compression (str | None): ``gzip``, ``zstd`` or None.
+        threshold (int): Only compress bodies of at least this many bytes.
+
+    Returns:
+        bytes: The two-byte header followed by the encoded body.
+    """
+    start = time.perf_counter()
+    body = _encode_body(obj, codec, default=_kombu_default)
+    raw_size = len(body)
+    applied = None
+    if compression and raw_size >= threshold:
+        body = _compress(body, compression)
+        applied = compression
+    message = CODECS[codec] + COMPRESSIONS[applied] + body
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug(
+            "Encoded message with %s/%s: %d bytes -> %d bytes in %.3f ms",
+            codec,
+            applied or "uncompressed",
+            raw_size,
+            len(message),
+            (time.perf_counter() - start) * 1000,
+        )
+    return message
+
+
+def decode_message(message: bytes):
+    """Decode framed bytes produced by ``encode_message``."""
+    start = time.perf_counter()
+    if isinstance(message, str):
+        message = message.encode("latin-1")
+    codec_flag, compression_flag = message[:1], message[1:2]
+    obj = _decode_body(_decompress(message[2:], compression_flag), codec_flag)
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug(
+            "Decoded %d byte message in %.3f ms",
+            len(message),
+            (time.perf_counter() - start) * 1000,
+        )
+    return obj
+
+
+def encode_payload(
+    payload_object, payload_format: str = "json"
+) -> tuple[bytes, str]:
+    """Encode a remote API request payload into bytes.
+
+    Parameters:
+        payload_object: The payload object returned by the payload function.
+        payload_format (str): One of ``json``, ``orjson`` or ``msgpack``.
+
+    Returns:
+        tuple[bytes, str]: The encoded request body and its Content-Type.
+    """
+    if payload_format not in PAYLOAD_CONTENT_TYPES:
+        raise ValueError(f"Unsupported payload format: {payload_format}")
+    return (
+        _encode_body(payload_object, payload_format),
+        PAYLOAD_CONTENT_TYPES[payload_format],
+    )
+
+
+def compress_payload(
+    body: bytes,
+    compression: str | None = None,
+    threshold: int = 1024,
+    level: int | None = None,
+) -> tuple[bytes, str | None]:
+    """Compress an encoded request body for sending to a remote API.
+
+    Parameters:
+        body (bytes): The encoded request body.
+        compression (str | None): ``gzip``, ``zstd`` or None.
+        threshold (int): Only compress bodies of at least this many bytes.
+        level (int | None): The compression level. Defaults to 5 for
+            gzip and 3 for zstd.
+
+    Returns:
+        tuple[bytes, str | None]: The (possibly) compressed body and the
+        value for its Content-Encoding header, or None if the body was
+        left uncompressed.
+    """
+    if not compression or len(body) < threshold:
+        return body, None
+    return _compress(body, compression, level), compression
+
+
+def _get_settings() -> tuple[str, str | None, int]:
+    config = current_app.config if has_app_context() else {}
+    return (
+        config.get("REMOTE_API_PROVISIONER_MESSAGE_SERIALIZER", "json"),
+        config.get("REMOTE_API_PROVISIONER_MESSAGE_COMPRESSION"),
+        config.get("REMOTE_API_PROVISIONER_MESSAGE_COMPRESSION_THRESHOLD", 4096),
+    )
+
+
+def dumps(obj) -> bytes:
+    """Encode a message using the codec configured for the current app."""
+    codec, compression, threshold = _get_settings()
+    return encode_message(obj, codec, compression, threshold)
+
+
+def loads(message: bytes):
+    """Decode a message encoded by ``dumps`` in any process."""
+    return decode_message(message)
+
+
+def get_message_serializer(config: dict | None = None) -> str | None:
+    """Return the kombu serializer name to use for provisioning messages.
+
+    Returns None when the configuration asks for plain uncompressed JSON,
+    so that Celery and kombu fall back to their default serializer.
+    """
+    if config is None:
+        if not has_app_context():
+            return None
+        config = current_app.config
+    codec = config.get("REMOTE_API_PROVISIONER_MESSAGE_SERIALIZER", "json")
+    compression = config.get("REMOTE_API_PROVISIONER_MESSAGE_COMPRESSION")
+    if codec == "json" and not compression:
+        return None
+    return SERIALIZER_NAME
+
+
+register(
+    SERIALIZER_NAME,
+    dumps,
+    loads,
+    content_type=CONTENT_TYPE,
+    content_encoding="binary",
+)
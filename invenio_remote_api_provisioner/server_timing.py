@@ -0,0 +1,106 @@
+#
+# This file is part of the invenio-remote-api-provisioner package.
+# Copyright (C) 2024, MESH Research.
+#
+# invenio-remote-api-provisioner is free software; you can redistribute it
+# and/or modify it under the terms of the MIT License; see
+# LICENSE file for more details.
+
+"""Accounting for the time the service components add to service calls.
+
+The time each service call spends in the provisioner's component, and in
+each phase of it, is recorded in the metrics histograms, along with the
+time each queued task takes to send once the unit of work has committed.
+When
+``REMOTE_API_PROVISIONER_SERVER_TIMING`` is enabled, the times for all the
+service calls made while handling a request are also summed and reported
+to the client in the response's ``Server-Timing`` header.
+"""
+
+from flask import current_app, g, has_request_context
+
+from .metrics import COMPONENT_PHASE_SECONDS, ENQUEUE_SECONDS
+from .timings import EventTimer
+
+METRIC_PREFIX = "provisioner"
+
+
+def record_component_time(
+    service_type: str, service_method: str, timer: EventTimer
+) -> None:
+    """Record the time a service call spent in the component.
+
+    Parameters:
+        service_type (str): The component's service type.
+        service_method (str): The service method called.
+        timer (EventTimer): The timer for the call, with its phases.
+    """
+    total = timer.elapsed()
+    ENQUEUE_SECONDS.labels(service_type, service_method).observe(total)
+    for name, seconds in timer.phases.items():
+        COMPONENT_PHASE_SECONDS.labels(service_type, service_method, name).observe(
+            seconds
+        )
+    _add_request_timings((("total", total), *timer.phases.items()))
+
+
+def record_post_commit_time(
+    service_type: str, service_method: str, seconds: float
+) -> None:
+    """Record the time a queued task took to send after the commit.
+
+    Publishing the task to the broker and counting it happen when the
+    unit of work commits, after the component has returned, but still
+    within the service call.
+
+    Parameters:
+        service_type (str): The task's service type.
+        service_method (str): The service method called.
+        seconds (float): The time taken.
+    """
+    COMPONENT_PHASE_SECONDS.labels(service_type, service_method, "post_commit").observe(
+        seconds
+    )
+    _add_request_timings((("total", seconds), ("post_commit", seconds)))
+
+
+def _add_request_timings(timings) -> None:
+    """Add seconds by phase to the component times of the current request."""
+    if has_request_context():
+        request_timings = g.setdefault("remote_api_provisioner_timings", {})
+        for name, seconds in timings:
+            request_timings[name] = request_timings.get(name, 0.0) + seconds
+
+
+def format_server_timing(timings: dict) -> str:
+    """Format component times as ``Server-Timing`` metrics.
+
+    Parameters:
+        timings (dict): Seconds by phase, with the component's ``total``.
+
+    Returns:
+        str: e.g. ``provisioner;dur=1.52;desc="Remote API provisioning",
+        provisioner-register;dur=0.31``.
+    """
+    metrics = [
+        f'{METRIC_PREFIX};dur={timings.get("total", 0.0) * 1000:.2f};'
+        'desc="Remote API provisioning"'
+    ]
+    metrics.extend(
+        f"{METRIC_PREFIX}-{name.replace('_', '-')};dur={seconds * 1000:.2f}"
+        for name, seconds in timings.items()
+        if name != "total"
+    )
+    return ", ".join(metrics)
+
+
+def add_server_timing(response):
+    """Add the component's time to a response's ``Server-Timing`` header."""
+    timings = g.pop("remote_api_provisioner_timings", None)
+    if timings and current_app.config.get("REMOTE_API_PROVISIONER_SERVER_TIMING"):
+        existing = response.headers.get("Server-Timing")
+        value = format_server_timing(timings)
+        response.headers["Server-Timing"] = (
+            f"{existing}, {value}" if existing else value
+        )
+    return response
@@ -0,0 +1,148 @@
+#
+# This file is part of the invenio-remote-api-provisioner package.
+# Copyright (C) 2024, MESH Research.
+#
+# invenio-remote-api-provisioner is free software; you can redistribute it
+# and/or modify it under the terms of the MIT License; see
+# LICENSE file for more details.
+
+"""End-to-end propagation latency of provisioning events.
+
+Each event is stamped with its origin time (when the service call that
+triggered it began) by the service component. The time from the origin
+to each later stage of the event is recorded per endpoint:
+
+- ``remote_ack``: the remote API acknowledged the request, so the change
+  is visible there;
+- ``callback_applied``: the event's callback task finished.
+
+Each stage has an SLO threshold in seconds, set for all events in
+``REMOTE_API_PROVISIONER_SLO_THRESHOLDS`` and overridden for one event by
+its ``slo_thresholds`` config. Events slower than the threshold are
+counted as breaches, both in the Prometheus metrics and in the shared
+provisioning stores.
+"""
+
+import logging
+import time
+from bisect import bisect_left
+
+from flask import current_app
+
+from .metrics import PROPAGATION_BUCKETS, PROPAGATION_SECONDS, SLO_BREACHES
+from .stores import CounterBatch
+
+logger = logging.getLogger(__name__)
+
+STAGES = ("remote_ack", "callback_applied")
+
+
+def get_slo_threshold(stage: str, event_config: dict | None = None) -> float | None:
+    """Get the SLO threshold of a propagation stage, in seconds.
+
+    Parameters:
+        stage (str): One of ``STAGES``.
+        event_config (dict): The event's configuration, whose
+            ``slo_thresholds`` override the configured defaults.
+
+    Returns:
+        float | None: The threshold, or None if the stage has no SLO.
+    """
+    thresholds = (event_config or {}).get("slo_thresholds") or {}
+    if stage in thresholds:
+        return thresholds[stage]
+    return current_app.config.get("REMOTE_API_PROVISIONER_SLO_THRESHOLDS", {}).get(
+        stage
+    )
+
+
+def record_propagation(
+    stage: str,
+    service_type: str,
+    endpoint: str,
+    origin_time: float,
+    event_config: dict | None = None,
+) -> float:
+    """Record the time an event took to reach a propagation stage.
+
+    Parameters:
+        stage (str): One of ``STAGES``.
+        service_type (str): The service type of the event.
+        endpoint (str): The configured endpoint of the event.
+        origin_time (float): When the event's service call began, in
+            seconds since the epoch.
+        event_config (dict): The event's configuration.
+
+    Returns:
+        float: The propagation latency in seconds.
+    """
+    latency = max(time.time() - origin_time, 0.0)
+    PROPAGATION_SECONDS.labels(service_type, endpoint, stage).observe(latency)
+    threshold = get_slo_threshold(stage, event_config)
+    breached = threshold is not None and latency > threshold
+    with CounterBatch() as batch:
+        batch.increment(f"slo-events:{stage}", endpoint)
+        bucket = bisect_left(PROPAGATION_BUCKETS, latency)
+        batch.increment_recent(f"latency:{stage}:{bucket}", endpoint)
+        if breached:
+            batch.increment(f"slo-breaches:{stage}", endpoint)
+            batch.increment_recent(f"slo-breaches:{stage}", endpoint)
+    if breached:
+        SLO_BREACHES.labels(service_type, endpoint, stage).inc()
+        logger.warning(
+            "Event took %.1fs to reach %s (SLO %ss)",
+            latency,
+            stage,
+            threshold,
+            extra={"service_type": service_type, "endpoint": endpoint},
+        )
+    return latency
+
+
+def on_callback_applied(app, sender=None, **kwargs) -> None:
+    """Record the propagation of an event whose callback task succeeded.
+
+    Connected to Celery's ``task_success`` signal, which is sent for every
+    task, so tasks that are not provisioning callbacks are ignored before
+    any work is done.
+
+    Parameters:
+        app (Flask): The application whose callbacks are tracked.
+        sender: The task that succeeded.
+    """
+    extension = app.extensions.get("invenio-remote-api-provisioner")
+    if extension is None or getattr(sender, "name", None) not in (
+        extension.callback_names
+    ):
+        return
+    event = getattr(sender.request, "kwargs", None) or {}
+    origin_time = event.get("origin_time")
+    if not origin_time:
+        return
+    service_type = event.get("service_type")
+    endpoint = event.get("endpoint")
+    with app.app_context():
+        event_config = (
+            app.config.get("REMOTE_API_PROVISIONER_EVENTS", {})
+            .get(service_type, {})
+            .get(endpoint, {})
+            .get(event.get("service_method"), {})
+        )
+        record_propagation(
+            "callback_applied", service_type, endpoint, origin_time, event_config
+        )
+
+
+def on_task_success(sender=None, **kwargs) -> None:
+    """Record the propagation of an event whose callback task succeeded.
+
+    Connected to Celery's ``task_success`` signal once per process. The
+    application is looked up when the signal is sent: it is the Flask
+    application of the task's Celery app, the one the task ran in.
+
+    Parameters:
+        sender: The task that succeeded.
+    """
+    app = getattr(getattr(sender, "app", None), "flask_app", None)
+    if app is not None:
+        on_callback_applied(app, sender=sender, **kwargs)
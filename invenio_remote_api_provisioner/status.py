@@ -0,0 +1,165 @@
+#
+# This file is part of the invenio-remote-api-provisioner package.
+# Copyright (C) 2024, MESH Research.
+#
+# invenio-remote-api-provisioner is free software; you can redistribute it
+# and/or modify it under the terms of the MIT License; see
+# LICENSE file for more details.
+
+"""Operational status of the provisioner, per endpoint.
+
+The status is built from counters kept in the shared provisioning stores
+as events are queued, run and answered, plus the depth of the
+provisioner's message queues as reported by the broker. Reading it costs
+a handful of cache reads per endpoint, whatever the size of the backlog,
+and never consumes or scans a queue.
+"""
+
+import functools
+
+from flask import current_app
+
+from .metrics import PROPAGATION_BUCKETS, get_queue_depth
+from .slo import STAGES
+from .stores import (
+    get_backlog,
+    get_counter,
+    get_current_slot,
+    get_recent_counters,
+    increment_recent_counter,
+)
+
+OUTCOMES = ("sent", "skipped", "failed", "retried", "dead_lettered")
+PERCENTILES = (50, 95, 99)
+
+
+def track_in_flight(func):
+    """Count the runs of a provisioning task in progress, per endpoint.
+
+    Runs are counted in the recent counter slot they start in, and
+    uncounted in the same slot when they end. A run whose worker dies
+    before it ends is then no longer counted once its slot has left the
+    status window, and neither are runs that last longer than the window.
+    """
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        endpoint = kwargs.get("endpoint", "")
+        slot = get_current_slot()
+        increment_recent_counter("in-flight", endpoint, slot=slot)
+        try:
+            return func(*args, **kwargs)
+        finally:
+            increment_recent_counter("in-flight", endpoint, delta=-1, slot=slot)
+
+    return wrapper
+
+
+def estimate_percentile(bucket_counts: list[int], percent: int) -> float | None:
+    """Estimate a latency percentile from counts per ``PROPAGATION_BUCKETS``.
+
+    Parameters:
+        bucket_counts (list[int]): The number of latencies up to each
+            bucket bound (and not in an earlier bucket), with a last count
+            for latencies above the highest bound.
+        percent (int): The percentile, from 1 to 99.
+
+    Returns:
+        float | None: The upper bound of the bucket holding the
+        percentile (the highest bound if it is above it), or None if
+        there are no latencies.
+    """
+    total = sum(bucket_counts)
+    if not total:
+        return None
+    cumulative = 0
+    for bound, count in zip(PROPAGATION_BUCKETS, bucket_counts):
+        cumulative += count
+        if cumulative >= total * percent / 100:
+            return bound
+    return PROPAGATION_BUCKETS[-1]
+
+
+def get_endpoint_status(endpoint: str) -> dict:
+    """Get the status of one endpoint.
+
+    Parameters:
+        endpoint (str): The endpoint as configured in
+            ``REMOTE_API_PROVISIONER_EVENTS``.
+
+    Returns:
+        dict: The endpoint's pending tasks, the runs in flight (that
+        started within the recent window, see ``track_in_flight``), the
+        outcomes, error rate, propagation latency percentiles and SLO
+        breaches over the recent window, and its dead-letter count.
+    """
+    pending, oldest_age = get_backlog(endpoint)
+    bucket_names = {
+        stage: [
+            f"latency:{stage}:{index}" for index in range(len(PROPAGATION_BUCKETS) + 1)
+        ]
+        for stage in STAGES
+    }
+    recent = get_recent_counters(
+        [
+            "in-flight",
+            *(f"outcome:{outcome}" for outcome in OUTCOMES),
+            *(f"slo-breaches:{stage}" for stage in STAGES),
+            *(name for names in bucket_names.values() for name in names),
+        ],
+        endpoint,
+    )
+    outcomes = {outcome: recent[f"outcome:{outcome}"] for outcome in OUTCOMES}
+    attempts = outcomes["sent"] + outcomes["skipped"] + outcomes["failed"]
+    latency = {}
+    for stage, names in bucket_names.items():
+        counts = [recent[name] for name in names]
+        latency[stage] = {
+            f"p{percent}": estimate_percentile(counts, percent)
+            for percent in PERCENTILES
+        }
+        latency[stage]["count"] = sum(counts)
+        latency[stage]["slo_breaches"] = recent[f"slo-breaches:{stage}"]
+    return {
+        "pending": pending,
+        "oldest_pending_age_seconds": round(oldest_age, 1),
+        "in_flight": max(recent["in-flight"], 0),
+        "recent": outcomes,
+        "error_rate": round(outcomes["failed"] / attempts, 4) if attempts else 0.0,
+        "latency_seconds": latency,
+        "dead_letters": get_counter("dead-letters", endpoint),
+    }
+
+
+def get_status() -> dict:
+    """Get the status of the provisioner and each configured endpoint.
+
+    Returns:
+        dict: The depth of the provisioner's message queues, the pending
+        tasks and the age of the oldest, and the status of each endpoint
+        (see ``get_endpoint_status``) with the service types it serves.
+    """
+    endpoints = {}
+    for service_type, configured in current_app.config.get(
+        "REMOTE_API_PROVISIONER_EVENTS", {}
+    ).items():
+        for endpoint in configured:
+            endpoints.setdefault(endpoint, []).append(service_type)
+    pending, oldest_age = get_backlog()
+    return {
+        "window_seconds": current_app.config.get(
+            "REMOTE_API_PROVISIONER_STATUS_WINDOW", 900
+        ),
+        "queues": {
+            queue_name: get_queue_depth(queue_name)
+            for queue_name in current_app.config.get(
+                "REMOTE_API_PROVISIONER_METRICS_QUEUES", []
+            )
+        },
+        "pending": pending,
+        "oldest_pending_age_seconds": round(oldest_age, 1),
+        "endpoints": {
+            endpoint: {"service_types": service_types, **get_endpoint_status(endpoint)}
+            for endpoint, service_types in endpoints.items()
+        },
+    }
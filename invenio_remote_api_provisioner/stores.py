@@ -0,0 +1,380 @@
+#
+# This file is part of the invenio-remote-api-provisioner package.
+# Copyright (C) 2024, MESH Research.
+#
+# invenio-remote-api-provisioner is free software; you can redistribute it
+# and/or modify it under the terms of the MIT License; see
+# LICENSE file for more details.
+
+"""Shared stores for provisioning state kept between tasks.
+
+State is kept in the Invenio cache (Redis in a standard InvenioRDM
+deployment), so it is shared by all web and worker processes and survives
+worker restarts. Every entry expires after
+``REMOTE_API_PROVISIONER_STORE_TIMEOUT`` seconds, which keeps the stores
+bounded.
+
+Shared counters are bookkeeping for the metrics and status, and are
+updated through a ``CounterBatch``, which sends several updates in one
+round trip and never lets a cache outage fail the request or task being
+counted.
+"""
+
+import hashlib
+import json
+import logging
+import time
+from contextlib import nullcontext
+
+from flask import current_app
+from invenio_cache import current_cache
+
+logger = logging.getLogger(__name__)
+
+KEY_PREFIX = "remote-api-provisioner"
+# The number of slots the window of the recent counters is divided into
+WINDOW_SLOTS = 5
+
+
+def _endpoint_key(endpoint: str) -> str:
+    return hashlib.sha1(endpoint.encode()).hexdigest()[:16]
+
+
+class EndpointRecordStore:
+    """A key-value store holding one value per (endpoint, record id).
+
+    Parameters:
+        namespace (str): The name of the store, used to keep its keys
+            separate from those of other stores.
+    """
+
+    def __init__(self, namespace: str):
+        """Initialize the store."""
+        self.namespace = namespace
+
+    def _key(self, endpoint: str, record_id: str) -> str:
+        return f"{KEY_PREFIX}:{self.namespace}:{_endpoint_key(endpoint)}:{record_id}"
+
+    def get(self, endpoint: str, record_id: str, default=None):
+        """Get the value stored for an endpoint and record."""
+        value = current_cache.get(self._key(endpoint, record_id))
+        return default if value is None else value
+
+    def set(self, endpoint: str, record_id: str, value) -> None:
+        """Store a value for an endpoint and record."""
+        current_cache.set(
+            self._key(endpoint, record_id),
+            value,
+            timeout=current_app.config.get("REMOTE_API_PROVISIONER_STORE_TIMEOUT"),
+        )
+
+    def delete(self, endpoint: str, record_id: str) -> None:
+        """Remove the value stored for an endpoint and record."""
+        current_cache.delete(self._key(endpoint, record_id))
+
+
+def _counter_key(name: str, endpoint: str = "") -> str:
+    if endpoint:
+        return f"{KEY_PREFIX}:counter:{name}:{_endpoint_key(endpoint)}"
+    return f"{KEY_PREFIX}:counter:{name}"
+
+
+class CounterBatch:
+    """Shared counter updates sent to the cache together.
+
+    Used as a context manager, the batch is sent when the block exits.
+    With a Redis cache the updates are sent in one pipeline; with other
+    caches they are applied one at a time. If the cache is unavailable
+    the updates are dropped with a warning rather than raised.
+    """
+
+    def __init__(self):
+        """Initialize an empty batch."""
+        self._updates: list[tuple[str, str, object, int | None]] = []
+
+    def __enter__(self) -> "CounterBatch":
+        """Collect updates until the block exits."""
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        """Send the collected updates."""
+        self.send()
+
+    def increment(self, name: str, endpoint: str = "", delta: int = 1) -> None:
+        """Increment a shared counter (see ``increment_counter``)."""
+        self._updates.append(("inc", _counter_key(name, endpoint), delta, None))
+
+    def increment_recent(
+        self, name: str, endpoint: str = "", delta: int = 1, slot: int | None = None
+    ) -> None:
+        """Increment a recent counter (see ``increment_recent_counter``)."""
+        window, slots = _window_slots()
+        key = f"{_counter_key(name, endpoint)}:{slots[-1] if slot is None else slot}"
+        self._updates.append(("inc_recent", key, delta, int(window * 2)))
+
+    def set(self, key: str, value, timeout: int | None = None) -> None:
+        """Set a cache key."""
+        self._updates.append(("set", key, value, timeout))
+
+    def send(self) -> None:
+        """Send the collected updates, and empty the batch."""
+        updates, self._updates = self._updates, []
+        if not updates:
+            return
+        try:
+            backend = current_cache.cache
+            client = getattr(backend, "_write_client", None)
+            if hasattr(client, "pipeline"):
+                self._send_pipeline(backend, client, updates)
+            else:
+                self._send_each(backend, updates)
+        except Exception as e:
+            logger.warning(
+                "Could not update %s provisioning counters: %s", len(updates), e
+            )
+
+    @staticmethod
+    def _send_pipeline(backend, client, updates: list) -> None:
+        # Mirrors the Redis commands of the cache's own inc, add and set
+        serializer = getattr(backend, "serializer", None)
+        dump = serializer.dumps if serializer else backend.dump_object
+        pipeline = client.pipeline(transaction=False)
+        for kind, key, value, timeout in updates:
+            key = backend.key_prefix + key
+            if kind == "inc":
+                pipeline.incrby(key, value)
+            elif kind == "inc_recent":
+                pipeline.set(key, b"0", nx=True, ex=timeout)
+                pipeline.incrby(key, value)
+            else:
+                timeout = backend._normalize_timeout(timeout)
+                if timeout == -1:
+                    pipeline.set(key, dump(value))
+                else:
+                    pipeline.setex(key, timeout, dump(value))
+        pipeline.execute()
+
+    @staticmethod
+    def _send_each(backend, updates: list) -> None:
+        # The cache backend, as Flask-Caching's wrapper has no inc
+        for kind, key, value, timeout in updates:
+            if kind == "inc":
+                backend.inc(key, value)
+            elif kind == "inc_recent":
+                backend.add(key, 0, timeout=timeout)
+                backend.inc(key, value)
+            else:
+                backend.set(key, value, timeout=timeout)
+
+
+def _batch(batch: CounterBatch | None):
+    # Add to the caller's batch, or send the updates at the end of the block
+    return nullcontext(batch) if batch is not None else CounterBatch()
+
+
+def increment_counter(
+    name: str, endpoint: str = "", delta: int = 1, batch: CounterBatch | None = None
+) -> None:
+    """Increment a shared counter, optionally scoped to one endpoint.
+
+    Parameters:
+        name (str): The counter's name.
+        endpoint (str): The endpoint the counter is scoped to, if any.
+        delta (int): The amount to add.
+        batch (CounterBatch): A batch to add the update to, instead of
+            sending it at once.
+    """
+    with _batch(batch) as batch:
+        batch.increment(name, endpoint, delta)
+
+
+def get_counter(name: str, endpoint: str = "") -> int:
+    """Get the value of a shared counter."""
+    return int(current_cache.get(_counter_key(name, endpoint)) or 0)
+
+
+def _window_slots() -> tuple[float, range]:
+    window = current_app.config.get("REMOTE_API_PROVISIONER_STATUS_WINDOW", 900)
+    slot_seconds = window / WINDOW_SLOTS
+    current = int(time.time() // slot_seconds)
+    return window, range(current - WINDOW_SLOTS + 1, current + 1)
+
+
+def get_current_slot() -> int:
+    """Get the slot of the recent counters that events now fall in."""
+    return _window_slots()[1][-1]
+
+
+def increment_recent_counter(
+    name: str,
+    endpoint: str = "",
+    delta: int = 1,
+    batch: CounterBatch | None = None,
+    slot: int | None = None,
+) -> None:
+    """Increment a shared counter of recent events.
+
+    Recent counters are kept in ``WINDOW_SLOTS`` slots spanning
+    ``REMOTE_API_PROVISIONER_STATUS_WINDOW`` seconds, each of which
+    expires once it has left the window. The parameters are those of
+    ``increment_counter``, plus the ``slot`` to update (by default the
+    current one, see ``get_current_slot``).
+    """
+    with _batch(batch) as batch:
+        batch.increment_recent(name, endpoint, delta, slot)
+
+
+def get_recent_counters(names: list[str], endpoint: str = "") -> dict[str, int]:
+    """Get the values of several recent counters with one cache read.
+
+    Returns:
+        dict[str, int]: Each counter's total over the last
+        ``REMOTE_API_PROVISIONER_STATUS_WINDOW`` seconds (or a little less,
+        since the current slot is not yet full).
+    """
+    _, slots = _window_slots()
+    keys = [
+        f"{_counter_key(name, endpoint)}:{slot}" for name in names for slot in slots
+    ]
+    values = iter(current_cache.get_many(*keys) if keys else [])
+    return {name: sum(int(next(values) or 0) for _ in slots) for name in names}
+
+
+def track_enqueued(
+    count: int = 1, endpoint: str = "", batch: CounterBatch | None = None
+) -> None:
+    """Count provisioning tasks sent to the task queue.
+
+    Parameters:
+        count (int): The number of tasks.
+        endpoint (str): The endpoint the tasks are for, which is also
+            counted separately.
+        batch (CounterBatch): A batch to add the updates to.
+    """
+    with _batch(batch) as batch:
+        batch.increment("pending", delta=count)
+        if endpoint:
+            batch.increment("pending", endpoint, delta=count)
+
+
+def track_started(enqueued_at: float, endpoint: str = "") -> None:
+    """Record that a queued provisioning task has started.
+
+    Parameters:
+        enqueued_at (float): When the task was queued, in seconds since the
+            epoch.
+        endpoint (str): The endpoint the task is for.
+    """
+    timeout = current_app.config.get("REMOTE_API_PROVISIONER_STORE_TIMEOUT")
+    with CounterBatch() as batch:
+        batch.increment("pending", delta=-1)
+        batch.set(_head_key(), enqueued_at, timeout=timeout)
+        if endpoint:
+            batch.increment("pending", endpoint, delta=-1)
+            batch.set(_head_key(endpoint), enqueued_at, timeout=timeout)
+
+
+def _head_key(endpoint: str = "") -> str:
+    if endpoint:
+        return f"{KEY_PREFIX}:backlog:head-enqueued-at:{_endpoint_key(endpoint)}"
+    return f"{KEY_PREFIX}:backlog:head-enqueued-at"
+
+
+def get_backlog(endpoint: str = "") -> tuple[int, float]:
+    """Get the number of queued tasks and the age of the oldest one.
+
+    Tasks are taken from the queue in the order they were queued, so the
+    oldest pending task was queued at about the time the most recently
+    started task was. Its age is estimated from that task's queue time.
+
+    Parameters:
+        endpoint (str): Only count the tasks for this endpoint.
+
+    Returns:
+        tuple[int, float]: The number of pending tasks and the estimated
+        age of the oldest, in seconds (0 if none are pending).
+    """
+    pending = max(get_counter("pending", endpoint), 0)
+    if not pending:
+        return 0, 0.0
+    head = current_cache.get(_head_key(endpoint))
+    if head is None:
+        return pending, 0.0
+    return pending, max(time.time() - float(head), 0.0)
+
+
+def get_payload_hash(http_method: str, request_url: str, payload_object) -> str:
+    """Hash a request in canonical form.
+
+    The payload is serialized with sorted keys so that logically equal
+    payloads always hash the same. The method and URL are part of the hash,
+    so that e.g. a POST after a DELETE of the same record is never treated
+    as unchanged.
+    """
+    canonical = json.dumps(
+        [http_method.upper(), request_url, payload_object],
+        sort_keys=True,
+        separators=(",", ":"),
+        default=str,
+    )
+    return hashlib.sha256(canonical.encode()).hexdigest()
+
+
+def get_callable_name(func) -> str:
+    """Get the importable name of a function, e.g. ``package.module.func``."""
+    return f"{getattr(func, '__module__', '')}.{getattr(func, '__qualname__', func)}"
+
+
+class PayloadMemo:
+    """Payloads built during one service call, shared by its tasks.
+
+    When several endpoints use the same payload function for a service
+    method, each endpoint's task would otherwise call it with the same
+    arguments. The first task to build the payload stores it here and the
+    others reuse it. Entries are keyed by the dispatch (the service call
+    that queued the tasks), the payload function, the record revision and
+    whether the record owner was included, and expire after
+    ``REMOTE_API_PROVISIONER_PAYLOAD_MEMO_TIMEOUT`` seconds.
+    """
+
+    def _key(
+        self, dispatch_id: str, func, record: dict, with_record_owner: bool
+    ) -> str:
+        parts = [
+            dispatch_id,
+            get_callable_name(func),
+            str(record.get("id")),
+            str(record.get("revision_id")),
+            str(bool(with_record_owner)),
+        ]
+        digest = hashlib.sha1("|".join(parts).encode()).hexdigest()
+        return f"{KEY_PREFIX}:payload-memo:{digest}"
+
+    def get(self, dispatch_id: str, func, record: dict, with_record_owner: bool):
+        """Get the memoized payload, counting the hit or miss."""
+        value = current_cache.get(
+            self._key(dispatch_id, func, record, with_record_owner)
+        )
+        increment_counter(
+            "payload-memo-misses" if value is None else "payload-memo-hits",
+            get_callable_name(func),
+        )
+        return value
+
+    def set(
+        self, dispatch_id: str, func, record: dict, with_record_owner: bool, value
+    ) -> None:
+        """Memoize the payload built for a dispatch."""
+        current_cache.set(
+            self._key(dispatch_id, func, record, with_record_owner),
+            value,
+            timeout=current_app.config.get(
+                "REMOTE_API_PROVISIONER_PAYLOAD_MEMO_TIMEOUT", 300
+            ),
+        )
+
+
+acknowledged_payloads = EndpointRecordStore("acknowledged-payload")
+payload_hashes = EndpointRecordStore("payload-hash")
+payload_memo = PayloadMemo()
+validators = EndpointRecordStore("validator")
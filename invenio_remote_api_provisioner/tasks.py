@@ -9,46 +9,183 @@
 """Celery task to send record event notices to remote API."""
 
 import logging
-import logging.handlers
-import os
+import threading
+import time
+from collections import ChainMap, OrderedDict
 from collections.abc import Callable
-from pathlib import Path
 
+import jsonpatch
 import requests
 
 # from celery import current_app as current_celery_app
 from celery import shared_task
-from celery.utils.log import get_task_logger
 from flask import Response
 from flask import current_app as app
 from flask_principal import Identity
 from invenio_access.permissions import system_identity
 from invenio_access.utils import get_identity
 from invenio_accounts import current_accounts
-from invenio_queues import current_queues
 from invenio_rdm_records.records.api import RDMDraft, RDMRecord
 
+from .executors import PayloadTimeoutError, run_payload_function
+from .headers import get_headers
+from .metrics import (
+    HTTP_REQUEST_SECONDS,
+    PAYLOAD_BUILD_SECONDS,
+    count_event,
+    timed,
+)
+from .proxies import current_remote_api_provisioner
+from .queues import publish_events, send_to_dead_letters
+from .serializers import compress_payload, encode_payload
 from .signals import remote_api_provisioning_triggered
+from .slo import record_propagation
+from .status import track_in_flight
+from .stores import (
+    acknowledged_payloads,
+    get_callable_name,
+    get_payload_hash,
+    increment_counter,
+    payload_hashes,
+    payload_memo,
+    track_started,
+    validators,
+)
+from .templates import MissingSelectorError
+from .timings import phase, record_timings
+from .tracing import inject_context, set_attributes, start_span, traced_task
 from .utils import get_user_idp_info
+from .validation import PayloadValidationError
 
-task_logger = get_task_logger(__name__)
+# Handlers are attached by the extension (see ``logs.setup_logging``)
+task_logger = logging.getLogger(__name__)
 
-task_logger.setLevel(logging.DEBUG)
-formatter = logging.Formatter(
-    "%(asctime)s:RemoteAPIProvisioner:%(levelname)s: %(message)s"
-)
-log_folder = Path(__file__).parent / "logs"
-os.makedirs(log_folder, exist_ok=True)
-file_handler = logging.handlers.RotatingFileHandler(
-    log_folder / "celery.log",
-    mode="a",
-    maxBytes=1000000,
-    backupCount=5,
-)
-file_handler.setFormatter(formatter)
-if task_logger.hasHandlers():
-    task_logger.handlers.clear()
-task_logger.addHandler(file_handler)
+# Encoded request bodies keyed by Celery task id. Retries keep their task
+# id, so a retried task reuses the payload built by its first attempt.
+ENCODED_PAYLOAD_CACHE_SIZE = 256
+_encoded_payloads: OrderedDict = OrderedDict()
+_encoded_payloads_lock = threading.Lock()
+
+
+def get_cached_payload(task_id: str | None) -> tuple | None:
+    """Get the cached payload, body and body headers for a task, if any."""
+    if not task_id:
+        return None
+    with _encoded_payloads_lock:
+        return _encoded_payloads.get(task_id)
+
+
+def cache_payload(task_id: str | None, entry: tuple) -> None:
+    """Cache the payload, body and body headers built for a task."""
+    if not task_id:
+        return
+    with _encoded_payloads_lock:
+        _encoded_payloads[task_id] = entry
+        _encoded_payloads.move_to_end(task_id)
+        while len(_encoded_payloads) > ENCODED_PAYLOAD_CACHE_SIZE:
+            _encoded_payloads.popitem(last=False)
+
+
+def discard_cached_payload(task_id: str | None) -> None:
+    """Forget the cached payload for a task once it has finished."""
+    if not task_id:
+        return
+    with _encoded_payloads_lock:
+        _encoded_payloads.pop(task_id, None)
+
+
+# Responses to a JSON Patch meaning the remote document no longer matches
+# the payload the patch was computed against
+DELTA_CONFLICT_STATUS_CODES = (409, 412, 422)
+
+
+def encode_request_body(
+    payload_object,
+    event_config: dict,
+    payload_format: str | None = None,
+    content_type: str | None = None,
+) -> tuple[bytes, dict]:
+    """Encode and (optionally) compress a request body for an event.
+
+    Parameters:
+        payload_object: The object to send.
+        event_config (dict): The event configuration, providing the
+            default payload format and the request compression settings.
+        payload_format (str | None): Overrides the event's payload format.
+        content_type (str | None): Overrides the format's Content-Type.
+
+    Returns:
+        tuple[bytes, dict]: The request body and the Content-Type and
+        Content-Encoding headers that describe it.
+    """
+    request_body, payload_content_type = encode_payload(
+        payload_object, payload_format or event_config.get("payload_format", "json")
+    )
+    body_headers = {"Content-Type": content_type or payload_content_type}
+    request_body, content_encoding = compress_payload(
+        request_body,
+        event_config.get("request_compression"),
+        threshold=event_config.get("request_compression_threshold", 1024),
+        level=event_config.get("request_compression_level"),
+    )
+    if content_encoding:
+        body_headers["Content-Encoding"] = content_encoding
+    return request_body, body_headers
+
+
+def get_payload_patch(
+    acknowledged: dict | None, payload_object, event_config: dict
+) -> list | None:
+    """Get the JSON Patch from the last acknowledged payload to a new one.
+
+    Parameters:
+        acknowledged (dict | None): The ``acknowledged_payloads`` entry for
+            the endpoint and record: the last payload the remote API
+            accepted and the number of patches sent since the last full
+            snapshot.
+        payload_object: The new payload.
+        event_config (dict): The event configuration.
+
+    Returns:
+        list | None: The RFC 6902 patch operations, or None if a full
+        snapshot should be sent instead.
+    """
+    if not acknowledged or acknowledged.get("payload") is None:
+        return None
+    if acknowledged.get("deltas", 0) >= event_config.get(
+        "delta_snapshot_interval", 20
+    ):
+        return None
+    return jsonpatch.make_patch(acknowledged["payload"], payload_object).patch
+
+
+def get_record_owner(identity: Identity) -> dict:
+    """Get the details of the user performing the service operation.
+
+    Parameters:
+        identity (Identity): The identity of the user.
+
+    Returns:
+        dict: The user's id, email, username, profile and IDP details.
+    """
+    if identity.id == "system":
+        return {
+            "id": "system",
+            "email": "",
+            "username": "system",
+        }
+    user = current_accounts.datastore.get_user_by_id(identity.id)
+    owner = {
+        "id": identity.id,
+        "email": user.email,
+        "username": user.username,
+    }
+    # Add user profile data if available
+    if hasattr(user, "user_profile") and user.user_profile:
+        owner.update(user.user_profile)
+    # Add IDP info
+    owner.update(get_user_idp_info(user))
+    return owner
 
 
 def get_payload_object(
@@ -57,6 +194,9 @@ def get_payload_object(
     record: dict = {},
     data: dict = {},
     with_record_owner: bool = False,
+    payload_timeout: float | None = None,
+    payload_processes: int = 0,
+    validator: Callable | None = None,
     **kwargs,
 ) -> dict:
     """Get the payload object for the notification.
@@ -74,6 +214,15 @@ def get_payload_object(
                                     true then the payload callable
                                     receives the record owner as a
                                     keyword argument.
+        payload_timeout (float): Seconds the payload callable may take
+                                    before ``PayloadTimeoutError`` is
+                                    raised.
+        payload_processes (int): Build the payload in a pool of this
+                                    many worker processes.
+        validator (callable): The compiled schema validator for the
+                                    endpoint's payloads, which raises
+                                    ``PayloadValidationError`` for an
+                                    invalid payload.
         **kwargs: Any additional keyword arguments passed through
                     from the parent service method. This includes
                     ``errors`` where there are operation problems.
@@ -82,29 +231,25 @@ def get_payload_object(
     """
     owner = None
     if with_record_owner:
-        if identity.id == "system":
-            owner = {
-                "id": "system",
-                "email": "",
-                "username": "system",
-            }
-        else:
-            user = current_accounts.datastore.get_user_by_id(identity.id)
-            owner = {
-                "id": identity.id,
-                "email": user.email,
-                "username": user.username,
-            }
-            # Add user profile data if available
-            if hasattr(user, "user_profile") and user.user_profile:
-                owner.update(user.user_profile)
-            # Add IDP info
-            owner.update(get_user_idp_info(user))
+        with phase("owner_lookup"):
+            owner = get_record_owner(identity)
 
     if callable(payload):
-        payload_object = payload(
-            identity, record=record, owner=owner, data=data, **kwargs
-        )
+        with start_span(
+            "remote_api_provisioner.build_payload",
+            attributes={"provisioner.payload_function": get_callable_name(payload)},
+        ):
+            with phase("payload_build"):
+                payload_object = run_payload_function(
+                    payload,
+                    identity,
+                    record=record,
+                    owner=owner,
+                    data=data,
+                    timeout=payload_timeout,
+                    processes=payload_processes,
+                    **kwargs,
+                )
     elif isinstance(payload, dict):
         payload_object = payload
     else:
@@ -117,6 +262,8 @@ def get_payload_object(
     elif not payload_object:
         raise RuntimeError("Payload object is empty")
     else:
+        if validator:
+            validator(payload_object)
         return payload_object
 
 
@@ -136,22 +283,27 @@ def get_http_method(
     return http_method
 
 
-def get_headers(event_config: dict) -> dict:
-    headers: dict = event_config.get("headers", {})
-    if event_config.get("auth_token"):
-        headers["Authorization"] = f"Bearer {event_config['auth_token']}"
-    return headers
-
-
 def get_request_url(
     identity: Identity,
     endpoint: str,
     record: RDMRecord,
     draft: RDMDraft,
     event_config: dict,
+    url_template: Callable | None = None,
+    data: dict | None = None,
     **kwargs,
 ) -> str:
-    if event_config.get("url_factory"):
+    if url_template:
+        request_url = url_template(
+            {
+                **kwargs,
+                "endpoint": endpoint,
+                "record": record,
+                "draft": draft,
+                "data": data,
+            }
+        )
+    elif event_config.get("url_factory"):
         request_url = event_config["url_factory"](
             identity, record=record, draft=draft, **kwargs
         )
@@ -161,14 +313,50 @@ def get_request_url(
     return request_url
 
 
+def send_request(
+    method: str, url: str, body, headers: ChainMap, labels: tuple
+) -> requests.Response:
+    """Send a request to a remote API, timing and tracing it.
+
+    The trace context is added to the headers in a layer of its own.
+
+    Parameters:
+        method (str): The HTTP method.
+        url (str): The request URL.
+        body: The encoded request body, if any.
+        headers (ChainMap): The request headers.
+        labels (tuple): The event's service type, endpoint and service
+            method, for the request's metrics.
+    """
+    with start_span(
+        method.upper(),
+        attributes={"http.request.method": method.upper(), "url.full": url},
+        kind="CLIENT",
+    ) as span:
+        with timed(HTTP_REQUEST_SECONDS, *labels), phase("http"):
+            response = requests.request(
+                method,
+                url=url,
+                data=body,
+                allow_redirects=False,
+                timeout=10,
+                headers=headers.new_child(inject_context()),
+            )
+        set_attributes(span, {"http.response.status_code": response.status_code})
+    return response
+
+
 # TODO: Make retries configurable
 @shared_task(
     bind=False,
     ignore_result=True,
-    retry_for=(RuntimeError, TimeoutError),
+    autoretry_for=(RuntimeError, TimeoutError),
     retry_backoff=True,
     retry_kwargs={"max_retries": 5},
 )
+@traced_task("remote_api_provisioner.send_remote_api_update")
+@record_timings
+@track_in_flight
 def send_remote_api_update(
     identity_id: str = "",
     record: dict = {},
@@ -184,6 +372,11 @@ def send_remote_api_update(
     service_type: str = "",
     service_method: str = "",
     data: dict = {},
+    dispatch_id: str | None = None,
+    memoize_payload: bool = False,
+    enqueued_at: float | None = None,
+    trace_context: dict | None = None,
+    origin_time: float | None = None,
     **kwargs,
 ) -> tuple[Response, dict | str | int | list | None]:
     """Send a record event update to a remote API.
@@ -204,6 +397,18 @@ def send_remote_api_update(
                             this task. (One of "rdm_record" or "community".)
         service_method (str): The name of the service method that triggers
                             this task.
+        dispatch_id (str): Identifies the service call that queued this
+                            task (and the tasks for its other endpoints).
+        memoize_payload (bool): Whether the payload function is shared
+                            with other endpoints, so that the payload
+                            built by the first of this dispatch's tasks
+                            should be reused by the others.
+        enqueued_at (float): When the task was queued, in seconds since
+                            the epoch.
+        trace_context (dict): The trace context of the service call, which
+                            the task's span continues.
+        origin_time (float): When the service call that triggered the
+                            event began, in seconds since the epoch.
         **kwargs: Any additional keyword arguments passed through
                     from the parent service method.
 
@@ -233,11 +438,12 @@ def send_remote_api_update(
 
     # with app.app_context():
 
-    if identity_id != "system":
-        user_object = current_accounts.datastore.get_user_by_id(identity_id)
-        identity = get_identity(user_object)
-    else:
-        identity = system_identity
+    with phase("identity_lookup"):
+        if identity_id != "system":
+            user_object = current_accounts.datastore.get_user_by_id(identity_id)
+            identity = get_identity(user_object)
+        else:
+            identity = system_identity
 
     event_config = (
         app.config.get("REMOTE_API_PROVISIONER_EVENTS", {})
@@ -253,34 +459,238 @@ def send_remote_api_update(
     # task_logger.warning(f"Record: {type(record)}")
     # task_logger.warning(f"Draft: {type(draft)}")
 
-    payload_object = None
-    if event_config.get("payload"):
+    task_id = send_remote_api_update.request.id
+    record_id = record.get("id") or (data or {}).get("slug")
+    log_fields = {
+        "service_type": service_type,
+        "service_method": service_method,
+        "endpoint": endpoint,
+        "record_id": record_id,
+    }
+    labels = (service_type, endpoint, service_method)
+    if send_remote_api_update.request.retries:
+        count_event("retried", *labels)
+    elif enqueued_at:
+        track_started(enqueued_at, endpoint)
+
+    cached_payload = get_cached_payload(task_id)
+    if cached_payload:
+        payload_object, request_body, body_headers = cached_payload
+    else:
+        build_start = time.perf_counter()
+        payload_object = None
+        request_body, body_headers = None, {}
+        payload = current_remote_api_provisioner.payload_templates.get(
+            (service_type, endpoint, service_method), event_config.get("payload")
+        )
+        schema_validator = current_remote_api_provisioner.payload_validators.get(
+            (service_type, endpoint, service_method)
+        )
+        with_record_owner = event_config.get("with_record_owner", False)
+        memoize = memoize_payload and dispatch_id and callable(payload)
+        if memoize:
+            payload_object = payload_memo.get(
+                dispatch_id, payload, record, with_record_owner
+            )
+        if payload:
+            try:
+                if payload_object is not None:
+                    if schema_validator:
+                        schema_validator(payload_object)
+                else:
+                    payload_object = get_payload_object(
+                        identity,
+                        payload,
+                        record=record,
+                        draft=draft,
+                        data=data,
+                        with_record_owner=with_record_owner,
+                        payload_timeout=event_config.get("payload_timeout"),
+                        payload_processes=app.config.get(
+                            "REMOTE_API_PROVISIONER_PAYLOAD_PROCESSES", 0
+                        ),
+                        validator=schema_validator,
+                        **kwargs,
+                    )
+                    if memoize:
+                        payload_memo.set(
+                            dispatch_id,
+                            payload,
+                            record,
+                            with_record_owner,
+                            payload_object,
+                        )
+                # current_app.logger.debug("Payload object:")
+                # current_app.logger.debug(pformat(payload_object))
+            except (PayloadTimeoutError, PayloadValidationError) as e:
+                # A slow or invalid payload would be just as slow or
+                # invalid on retry, and the remote API would reject it
+                task_logger.error(
+                    "Could not send %s %s update for record %s: %s",
+                    service_type,
+                    service_method,
+                    record_id,
+                    e,
+                    extra=log_fields,
+                )
+                send_to_dead_letters(
+                    str(e),
+                    endpoint=endpoint,
+                    service_type=service_type,
+                    service_method=service_method,
+                    record_id=record_id,
+                    identity_id=identity_id,
+                    task_id=task_id,
+                    payload_object=getattr(e, "payload_object", None),
+                )
+                discard_cached_payload(task_id)
+                count_event("dead_lettered", *labels)
+                return None, None
+            except (RuntimeError, ValueError) as e:
+                task_logger.error(
+                    "Could not send %s %s update for record %s: "
+                    "Problem assembling update payload: %s",
+                    service_type,
+                    service_method,
+                    record_id,
+                    e,
+                    extra=log_fields,
+                )
+        if payload_object is not None:
+            # Encode once; retries of this task reuse the same bytes
+            request_body, body_headers = encode_request_body(
+                payload_object, event_config
+            )
+            cache_payload(task_id, (payload_object, request_body, body_headers))
+        PAYLOAD_BUILD_SECONDS.labels(*labels).observe(
+            time.perf_counter() - build_start
+        )
+
+    with phase("url_build"):
         try:
-            payload_object = get_payload_object(
+            request_url = get_request_url(
                 identity,
-                event_config["payload"],
-                record=record,
-                draft=draft,
+                endpoint,
+                record,
+                draft,
+                event_config,
+                url_template=current_remote_api_provisioner.url_templates.get(
+                    (service_type, endpoint, service_method)
+                ),
                 data=data,
-                with_record_owner=event_config.get("with_record_owner", False),
                 **kwargs,
             )
-            # current_app.logger.debug("Payload object:")
-            # current_app.logger.debug(pformat(payload_object))
-        except (RuntimeError, ValueError) as e:
+        except MissingSelectorError as e:
+            # e.g. the remote id of a record that was never sent; a request
+            # to the URL without it would hit the wrong resource
             task_logger.error(
-                f"Could not send "
-                f"{service_type} {service_method} "
-                f"update for record {record.get('id') or data.get('slug')}: "
-                "Problem assembling "
-                f"update payload: {e}"
+                "Could not send %s %s update for record %s: %s",
+                service_type,
+                service_method,
+                record_id,
+                e,
+                extra=log_fields,
             )
-
-    request_url = get_request_url(
-        identity, endpoint, record, draft, event_config, **kwargs
-    )
+            send_to_dead_letters(
+                str(e),
+                endpoint=endpoint,
+                service_type=service_type,
+                service_method=service_method,
+                record_id=record_id,
+                identity_id=identity_id,
+                task_id=task_id,
+                payload_object=payload_object,
+            )
+            discard_cached_payload(task_id)
+            count_event("dead_lettered", *labels)
+            return None, None
     http_method = get_http_method(identity, record, draft, event_config, **kwargs)
-    request_headers = get_headers(event_config)
+    auth_provider = current_remote_api_provisioner.auth_providers.get(
+        (service_type, endpoint, service_method)
+    )
+    request_headers = get_headers(
+        event_config,
+        auth_provider,
+        current_remote_api_provisioner.header_sets.get(
+            (service_type, endpoint, service_method)
+        ),
+    )
+    request_headers.maps[0].update(body_headers)
+    idempotency_header = event_config.get("idempotency_header")
+    if idempotency_header and task_id:
+        # Retries keep their task id, so the remote API can spot repeats
+        request_headers.maps[0][idempotency_header] = task_id
+
+    # Skip sends that would repeat the last successful request unchanged
+    payload_hash = None
+    if event_config.get("skip_unchanged") and record_id:
+        payload_hash = get_payload_hash(http_method, request_url, payload_object)
+        if payload_hashes.get(endpoint, record_id) == payload_hash:
+            task_logger.info(
+                "Skipping %s %s update for record %s: "
+                "payload unchanged since last send",
+                service_type,
+                service_method,
+                record_id,
+                extra=log_fields,
+            )
+            increment_counter("skipped-unchanged", endpoint)
+            count_event("skipped", *labels)
+            discard_cached_payload(task_id)
+            return None, None
+
+    # Send back the validator (ETag or version) from the last write
+    conditional_header = event_config.get("conditional_request")
+    remote_validator = None
+    if conditional_header and record_id:
+        remote_validator = validators.get(endpoint, record_id)
+        if conditional_header == "If-None-Match":
+            # The remote API skips the write if it still has the version
+            # our validator names, so only send it with the same payload
+            if payload_hash is None:
+                payload_hash = get_payload_hash(
+                    http_method, request_url, payload_object
+                )
+            if payload_hashes.get(endpoint, record_id) != payload_hash:
+                remote_validator = None
+        if remote_validator:
+            request_headers.maps[0][conditional_header] = remote_validator
+
+    # Send only the changes since the last payload the remote API accepted
+    delta_mode = (
+        event_config.get("payload_mode") == "delta"
+        and record_id
+        and payload_object is not None
+    )
+    acknowledged = None
+    patch = None
+    send_method, send_body, send_headers = http_method, request_body, request_headers
+    if delta_mode and http_method.upper() in ("PUT", "PATCH"):
+        acknowledged = acknowledged_payloads.get(endpoint, record_id)
+        patch = get_payload_patch(acknowledged, payload_object, event_config)
+        if patch is not None and not patch:
+            task_logger.info(
+                "Skipping %s %s update for record %s: "
+                "no changes since last acknowledged payload",
+                service_type,
+                service_method,
+                record_id,
+                extra=log_fields,
+            )
+            increment_counter("skipped-unchanged", endpoint)
+            count_event("skipped", *labels)
+            discard_cached_payload(task_id)
+            return None, None
+        if patch:
+            patch_body, patch_headers = encode_request_body(
+                patch,
+                event_config,
+                payload_format="json",
+                content_type="application/json-patch+json",
+            )
+            send_method = "PATCH"
+            send_body = patch_body
+            send_headers = request_headers.new_child(patch_headers)
 
     # task_logger.warning("Sending remote api update ************")
     # task_logger.info("payload:")
@@ -291,33 +701,129 @@ def send_remote_api_update(
     # task_logger.info(f"record_id: {record['id']}")
     # task_logger.info(f"draft_id: {draft.get('id')}")
 
-    response = requests.request(
-        http_method,
-        url=request_url,
-        json=payload_object,
-        allow_redirects=False,
-        timeout=10,
-        headers=request_headers,
-    )
-    print(response)
+    response = send_request(send_method, request_url, send_body, send_headers, labels)
+    if auth_provider and response.status_code == 401:
+        # The token may have been revoked early; get a new one and retry once
+        task_logger.warning(
+            "Remote API at %s rejected our credentials; refreshing and retrying",
+            endpoint,
+            extra=log_fields,
+        )
+        auth_provider.invalidate()
+        auth_headers = auth_provider.get_headers()
+        request_headers.maps[0].update(auth_headers)
+        response = send_request(
+            send_method, request_url, send_body, send_headers, labels
+        )
+    if (
+        remote_validator
+        and response.status_code == 412
+        and conditional_header == "If-Match"
+    ):
+        # Our validator is stale (the remote document changed since our
+        # last write), so drop it and send the update unconditionally
+        task_logger.warning(
+            "Remote API at %s rejected our validator for record %s; "
+            "sending unconditionally",
+            endpoint,
+            record_id,
+            extra=log_fields,
+        )
+        validators.delete(endpoint, record_id)
+        del request_headers.maps[0][conditional_header]
+        remote_validator = None
+        response = send_request(
+            send_method, request_url, send_body, send_headers, labels
+        )
+    if patch and response.status_code in DELTA_CONFLICT_STATUS_CODES:
+        # The remote document has drifted from our last acknowledged
+        # payload, so fall back to a full snapshot
+        task_logger.warning(
+            "JSON Patch for record %s rejected by %s (status code %s); "
+            "sending full payload",
+            record_id,
+            endpoint,
+            response.status_code,
+            extra=log_fields,
+        )
+        increment_counter("delta-conflicts", endpoint)
+        acknowledged_payloads.delete(endpoint, record_id)
+        patch = None
+        response = send_request(
+            http_method, request_url, request_body, request_headers, labels
+        )
+    if remote_validator and response.status_code in (304, 412):
+        # The remote API already has this version, so there is nothing
+        # to reindex and no new response for the callback to record
+        task_logger.info(
+            "Remote API skipped %s %s update for record %s (status code %s)",
+            service_type,
+            service_method,
+            record_id,
+            response.status_code,
+            extra=log_fields,
+        )
+        discard_cached_payload(task_id)
+        count_event("skipped", *labels)
+        return response.text, None
     if response.status_code != 200:  # FIXME: Always 200?
         task_logger.error(
-            f"Error sending notification (status code {response.status_code})"
+            "Error sending notification (status code %s): %s",
+            response.status_code,
+            response.text,
+            extra={**log_fields, "status_code": response.status_code},
         )
-        task_logger.error(response.text)
+        count_event("failed", *labels)
         raise RuntimeError(
             f"Error sending notification (status code {response.status_code})"
         )
     else:
-        task_logger.info("Notification sent successfully")
-        task_logger.info("response:")
-        task_logger.info(response.json())
-        task_logger.info("-----------------------")
+        acknowledged_at = time.time()
+        discard_cached_payload(task_id)
+        count_event("sent", *labels)
+        if origin_time:
+            record_propagation(
+                "remote_ack", service_type, endpoint, origin_time, event_config
+            )
+        if payload_hash:
+            payload_hashes.set(endpoint, record_id, payload_hash)
+        if conditional_header and record_id:
+            new_validator = response.headers.get(
+                event_config.get("validator_header", "ETag")
+            )
+            if new_validator:
+                validators.set(endpoint, record_id, new_validator)
+        if delta_mode:
+            if http_method.upper() == "DELETE":
+                acknowledged_payloads.delete(endpoint, record_id)
+            else:
+                acknowledged_payloads.set(
+                    endpoint,
+                    record_id,
+                    {
+                        "payload": payload_object,
+                        "deltas": acknowledged.get("deltas", 0) + 1 if patch else 0,
+                    },
+                )
+        task_logger.info(
+            "Sent %s %s update for record %s to %s",
+            service_type,
+            service_method,
+            record_id,
+            request_url,
+            extra={
+                **log_fields,
+                "status_code": response.status_code,
+                "elapsed_ms": round(response.elapsed.total_seconds() * 1000, 1),
+            },
+        )
+        if task_logger.isEnabledFor(logging.DEBUG):
+            task_logger.debug("Response: %s", response.text, extra=log_fields)
 
     try:
         response_string = response.json()
     except ValueError as e:
-        task_logger.error(f"Error decoding response: {e}")
+        task_logger.error("Error decoding response: %s", e, extra=log_fields)
         response_string = response.text
 
     callback = event_config.get("callback")
@@ -342,28 +848,32 @@ def send_remote_api_update(
             if callback_data and k in callback_data.keys():
                 del callback_data[k]
 
-        task_logger.info("Calling callback")
+        task_logger.debug("Calling callback", extra=log_fields)
 
         messages_content = [
             {
                 "response_json": response_string,
                 "service_type": service_type,
                 "service_method": service_method,
+                "endpoint": endpoint,
                 "request_url": request_url,
                 "payload_object": payload_object,
                 "record": callback_record,
                 "draft": callback_draft,
                 "data": callback_data,
+                "published_at": time.time(),
+                "trace_context": inject_context(),
+                "origin_time": origin_time,
+                "acknowledged_at": acknowledged_at,
                 **kwargs,
             }
         ]
 
-        # Publish the message to the event queue.
-        current_queues.queues["remote-api-provisioning-events"].publish(
-            messages_content
-        )
-        # Send the signal so that Invenio knows to consume the message
-        remote_api_provisioning_triggered.send(app._get_current_object())
+        with phase("callback_publish"):
+            # Publish the message to the event queue.
+            publish_events(messages_content)
+            # Send the signal so that Invenio knows to consume the message
+            remote_api_provisioning_triggered.send(app._get_current_object())
 
         # callback_result = callback.delay(
         #     response_json=response_string,
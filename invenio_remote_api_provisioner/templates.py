@@ -0,0 +1,330 @@
+#
+# This file is part of the invenio-remote-api-provisioner package.
+# Copyright (C) 2024, MESH Research.
+#
+# invenio-remote-api-provisioner is free software; you can redistribute it
+# and/or modify it under the terms of the MIT License; see
+# LICENSE file for more details.
+
+"""Declarative payload templates.
+
+A payload template is a plain (JSON serializable) dictionary describing
+how to build a remote API payload from the data passed to a payload
+function. It is compiled once into a ``PayloadTemplate`` whose instances
+are called exactly like a payload function. For example::
+
+    {
+        "_internal_id": "record.id",
+        "content_type": {"value": "work"},
+        "title": {
+            "path": "record.metadata.title",
+            "transform": "strip_html",
+            "default": "",
+        },
+        "primary_url": {"format": "https://works.example.org/records/{record.id}"},
+        "owner": {"fields": {"name": "owner.full_name"}},
+        "contributors": {
+            "path": "record.metadata.creators[*]",
+            "each": {
+                "name": "item.person_or_org.name",
+                "role": "item.role.id",
+            },
+        },
+    }
+
+Each value in the template is one of:
+
+- a selector string: a source name (``record``, ``draft``, ``data``,
+  ``owner``, any other keyword argument passed to the payload function, or
+  ``item`` inside an ``each`` mapping) followed by dotted keys, list
+  indexes (``[0]``) or wildcards (``[*]``)
+- ``{"path": selector}`` with optional ``"default"`` and ``"transform"``
+  (a transform name or a list of them)
+- ``{"value": constant}``
+- ``{"format": string}`` with ``{selector}`` placeholders
+- ``{"fields": mapping}`` for a nested object
+- ``{"path": selector, "each": mapping}`` to build one object for each item
+  of a list
+"""
+
+import re
+from collections.abc import Callable
+
+_MISSING = object()
+
+_SELECTOR_PART = re.compile(r"([^.\[\]]+)|\[(\*|\d+)\]")
+_PLACEHOLDER = re.compile(r"\{([^{}]+)\}")
+_HTML_TAG = re.compile("<.*?>")
+
+TRANSFORMS: dict[str, Callable] = {
+    "strip_html": lambda v: _HTML_TAG.sub("", v) if isinstance(v, str) else v,
+    "strip": lambda v: v.strip() if isinstance(v, str) else v,
+    "lower": lambda v: v.lower() if isinstance(v, str) else v,
+    "upper": lambda v: v.upper() if isinstance(v, str) else v,
+    "str": lambda v: "" if v is None else str(v),
+    "first": lambda v: v[0] if isinstance(v, list) and v else None,
+    "join": lambda v: ", ".join(str(i) for i in v) if isinstance(v, list) else v,
+    "compact": lambda v: [i for i in v if i] if isinstance(v, list) else v,
+    "date": lambda v: _format_date(v) if v else v,
+}
+
+
+class MissingSelectorError(ValueError):
+    """A placeholder of a strict format template selected no value."""
+
+
+def _format_date(value) -> str:
+    # Imported on first use, since few templates format dates
+    import arrow
+
+    return arrow.get(value).format("YYYY-MM-DD")
+
+
+def compile_selector(selector: str) -> Callable:
+    """Compile a selector string into a getter.
+
+    Parameters:
+        selector (str): e.g. ``record.metadata.creators[*].person_or_org``
+
+    Returns:
+        Callable: A function taking the mapping of template sources (the
+        payload function arguments by name) and returning the selected
+        value, or ``_MISSING`` if the selector does not match.
+    """
+    steps = []
+    for key, index in _SELECTOR_PART.findall(selector):
+        if key:
+            steps.append(("key", key))
+        elif index == "*":
+            steps.append(("all", None))
+        else:
+            steps.append(("index", int(index)))
+    if not steps or steps[0][0] != "key":
+        raise ValueError(f"Invalid payload template selector: {selector!r}")
+    steps = tuple(steps)
+
+    if all(kind == "key" for kind, _ in steps):
+        # Plain dotted paths are by far the most common, so give them a
+        # getter without the per-step dispatch
+        keys = tuple(key for _, key in steps)
+
+        def get_keys(value):
+            try:
+                for key in keys:
+                    value = value[key]
+            except (KeyError, TypeError, IndexError):
+                return _MISSING
+            return value
+
+        return get_keys
+
+    def walk(value, steps):
+        for position, (kind, arg) in enumerate(steps):
+            if kind == "key":
+                if not isinstance(value, dict) or arg not in value:
+                    return _MISSING
+                value = value[arg]
+            elif kind == "index":
+                if not isinstance(value, list) or arg >= len(value):
+                    return _MISSING
+                value = value[arg]
+            else:
+                if not isinstance(value, list):
+                    return _MISSING
+                rest = steps[position + 1 :]
+                return [
+                    v
+                    for v in (walk(item, rest) for item in value)
+                    if v is not _MISSING
+                ]
+        return value
+
+    return lambda value: walk(value, steps)
+
+
+def _compile_field(spec) -> Callable:
+    """Compile one field spec into a function of the template sources."""
+    if isinstance(spec, str):
+        spec = {"path": spec}
+    if not isinstance(spec, dict):
+        raise ValueError(f"Invalid payload template field: {spec!r}")
+
+    if "value" in spec:
+        value = spec["value"]
+        return lambda sources: value
+
+    if "format" in spec:
+        return compile_format(spec["format"])
+
+    if "fields" in spec:
+        return _compile_mapping(spec["fields"])
+
+    if "path" not in spec:
+        raise ValueError(f"Invalid payload template field: {spec!r}")
+
+    getter = compile_selector(spec["path"])
+    default = spec.get("default")
+    transform_names = spec.get("transform", [])
+    if isinstance(transform_names, str):
+        transform_names = [transform_names]
+    try:
+        transforms = tuple(TRANSFORMS[t] for t in transform_names)
+    except KeyError as e:
+        raise ValueError(f"Unknown payload template transform: {e}") from e
+    each = _compile_mapping(spec["each"]) if "each" in spec else None
+
+    if not transforms and each is None:
+
+        def simple_path_field(sources):
+            value = getter(sources)
+            return default if value is _MISSING or value is None else value
+
+        return simple_path_field
+
+    def path_field(sources):
+        value = getter(sources)
+        if value is _MISSING or value is None:
+            return default
+        if each is not None:
+            items = value if isinstance(value, list) else [value]
+            value = [each({**sources, "item": item}) for item in items]
+        for transform in transforms:
+            value = transform(value)
+        return value
+
+    return path_field
+
+
+def compile_format(template: str, strict: bool = False) -> Callable:
+    """Compile a string with ``{selector}`` placeholders.
+
+    Parameters:
+        template (str): e.g. ``https://example.org/records/{record.id}``
+        strict (bool): Raise ``MissingSelectorError`` when a placeholder's
+            selector does not match, or selects None or an empty string.
+            Otherwise such placeholders are replaced with an empty string.
+
+    Returns:
+        Callable: A function taking the mapping of template sources and
+        returning the formatted string.
+    """
+    parts = []
+    position = 0
+    for match in _PLACEHOLDER.finditer(template):
+        parts.append(template[position : match.start()])
+        parts.append((match.group(1), compile_selector(match.group(1))))
+        position = match.end()
+    parts.append(template[position:])
+    parts = tuple(p for p in parts if p != "")
+
+    def format_field(sources):
+        out = []
+        for part in parts:
+            if isinstance(part, str):
+                out.append(part)
+                continue
+            selector, getter = part
+            value = getter(sources)
+            if value is _MISSING or value is None or value == "":
+                if strict:
+                    raise MissingSelectorError(
+                        f"No value for {{{selector}}} in {template!r}"
+                    )
+                value = ""
+            out.append(str(value))
+        return "".join(out)
+
+    return format_field
+
+
+def _compile_mapping(spec: dict) -> Callable:
+    """Compile a mapping of output keys to field specs."""
+    if not isinstance(spec, dict):
+        raise ValueError(f"Invalid payload template mapping: {spec!r}")
+    fields = tuple((key, _compile_field(value)) for key, value in spec.items())
+
+    def build(sources):
+        return {key: field(sources) for key, field in fields}
+
+    return build
+
+
+def get_template_paths(spec: dict) -> set[str]:
+    """Get the dotted paths of the source data a template reads.
+
+    Selectors are cut at their first list index or wildcard, so the
+    returned paths name whole lists rather than their items. Selectors
+    reading from the ``item`` of an ``each`` mapping are covered by the
+    path of the list itself and are not returned, but the mapping's other
+    selectors are.
+
+    Parameters:
+        spec (dict): A payload template, or the mapping of a ``fields``
+            or ``each`` spec within one. Its keys are output keys, so a
+            key such as ``format`` or ``value`` is not read as a spec.
+
+    Returns:
+        set[str]: Paths such as ``record.metadata.creators``.
+    """
+    paths = set()
+    for field in spec.values():
+        paths |= _get_field_paths(field)
+    return paths
+
+
+def _get_field_paths(spec) -> set[str]:
+    """Get the paths one field spec reads (see ``get_template_paths``)."""
+    paths = set()
+    if isinstance(spec, str):
+        selectors = [spec]
+    elif not isinstance(spec, dict) or "value" in spec:
+        selectors = []
+    elif "format" in spec:
+        selectors = _PLACEHOLDER.findall(spec["format"])
+    elif "fields" in spec:
+        return get_template_paths(spec["fields"])
+    elif "path" in spec:
+        selectors = [spec["path"]]
+        if "each" in spec:
+            paths |= get_template_paths(spec["each"])
+    else:
+        selectors = []
+    for selector in selectors:
+        path = selector.split("[", 1)[0].rstrip(".")
+        if path.split(".", 1)[0] != "item":
+            paths.add(path)
+    return paths
+
+
+class PayloadTemplate:
+    """A compiled declarative payload template.
+
+    Instances are called with the same arguments as a payload function,
+    so they can be used anywhere a payload function is accepted. They
+    pickle as their (serializable) spec and recompile when unpickled.
+
+    Parameters:
+        spec (dict): The declarative template.
+    """
+
+    def __init__(self, spec: dict):
+        """Compile the template."""
+        self.spec = spec
+        self._build = _compile_mapping(spec)
+
+    def __call__(self, identity, record=None, owner=None, data=None, **kwargs):
+        """Build the payload for an event."""
+        sources = {**kwargs, "record": record, "owner": owner, "data": data}
+        return self._build(sources)
+
+    def __reduce__(self):
+        """Pickle the template as its spec."""
+        return (self.__class__, (self.spec,))
+
+    def to_dict(self) -> dict:
+        """Return the serializable template spec."""
+        return self.spec
+
+    def __repr__(self):
+        """Represent the template by its spec."""
+        return f"PayloadTemplate({self.spec!r})"
@@ -0,0 +1,187 @@
+#
+# This file is part of the invenio-remote-api-provisioner package.
+# Copyright (C) 2024, MESH Research.
+#
+# invenio-remote-api-provisioner is free software; you can redistribute it
+# and/or modify it under the terms of the MIT License; see
+# LICENSE file for more details.
+
+"""Per-event timing breakdowns and profiling of slow provisioning tasks.
+
+Every provisioning task records how long it spent in each phase (looking
+up the identity and the record owner, building the payload and the URL,
+the requests to the remote API and publishing the callback event). The
+most recent records are kept in a bounded buffer in each process, and are
+also appended as JSON lines to ``REMOTE_API_PROVISIONER_TIMINGS_FILE`` if
+it is set.
+
+With ``REMOTE_API_PROVISIONER_PROFILE_SAMPLE_RATE`` above 0 a sample of
+tasks is run under ``cProfile``, and the profile of any sampled task that
+takes longer than ``REMOTE_API_PROVISIONER_PROFILE_THRESHOLD`` seconds is
+written to ``REMOTE_API_PROVISIONER_PROFILE_DIR``.
+"""
+
+import cProfile
+import functools
+import json
+import logging
+import os
+import random
+import tempfile
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from celery import current_task
+from flask import current_app, has_app_context
+
+logger = logging.getLogger(__name__)
+
+_current_timer: ContextVar["EventTimer | None"] = ContextVar(
+    "remote_api_provisioner_timer", default=None
+)
+_timings: deque = deque(maxlen=1000)
+_timings_file_lock = threading.Lock()
+
+
+class EventTimer:
+    """Accumulates the time one provisioning event spends in each phase."""
+
+    def __init__(self):
+        """Initialize the timer."""
+        self.started_at = time.time()
+        self.start = time.perf_counter()
+        self.phases: dict[str, float] = {}
+
+    def add(self, name: str, seconds: float) -> None:
+        """Add time spent in a phase. Repeated phases are summed."""
+        self.phases[name] = self.phases.get(name, 0.0) + seconds
+
+    def elapsed(self) -> float:
+        """Get the seconds since the timer started."""
+        return time.perf_counter() - self.start
+
+
+@contextmanager
+def phase(name: str):
+    """Time a phase of the current provisioning event, if any."""
+    timer = _current_timer.get()
+    if timer is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        timer.add(name, time.perf_counter() - start)
+
+
+def set_current_timer(timer: EventTimer):
+    """Make a timer the one ``phase`` adds to, returning a reset token."""
+    return _current_timer.set(timer)
+
+
+def reset_current_timer(token) -> None:
+    """Restore the timer that was current before ``set_current_timer``."""
+    _current_timer.reset(token)
+
+
+def get_timings() -> list[dict]:
+    """Get this process's most recent timing records, oldest first."""
+    return list(_timings)
+
+
+def _config(key: str, default=None):
+    if has_app_context():
+        return current_app.config.get(key, default)
+    return default
+
+
+def store_timing(entry: dict) -> None:
+    """Keep a timing record in the buffer, and the timings file if set."""
+    size = _config("REMOTE_API_PROVISIONER_TIMINGS_BUFFER_SIZE", 1000)
+    if _timings.maxlen != size:
+        _resize_buffer(size)
+    _timings.append(entry)
+    path = _config("REMOTE_API_PROVISIONER_TIMINGS_FILE")
+    if path:
+        line = json.dumps(entry, default=str) + "\n"
+        with _timings_file_lock, open(path, "a") as timings_file:
+            timings_file.write(line)
+
+
+def _resize_buffer(size: int) -> None:
+    global _timings
+
+    _timings = deque(_timings, maxlen=size)
+
+
+def _write_profile(profile: cProfile.Profile, entry: dict) -> str:
+    directory = _config("REMOTE_API_PROVISIONER_PROFILE_DIR") or os.path.join(
+        tempfile.gettempdir(), "remote-api-provisioner-profiles"
+    )
+    os.makedirs(directory, exist_ok=True)
+    name = "-".join(
+        str(entry.get(k) or "")
+        for k in ("service_type", "service_method", "record_id", "task_id")
+    )
+    path = os.path.join(directory, f"{int(entry['started_at'])}-{name}.prof")
+    profile.dump_stats(path)
+    return path
+
+
+def record_timings(func):
+    """Record the timing breakdown of a provisioning task.
+
+    Phases timed with ``phase`` during the task are added to its record.
+    A sample of tasks is profiled, as configured.
+    """
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        timer = EventTimer()
+        token = set_current_timer(timer)
+        profile = None
+        if random.random() < _config("REMOTE_API_PROVISIONER_PROFILE_SAMPLE_RATE", 0):
+            profile = cProfile.Profile()
+        error = None
+        try:
+            if profile is not None:
+                return profile.runcall(func, *args, **kwargs)
+            return func(*args, **kwargs)
+        except Exception as e:
+            error = type(e).__name__
+            raise
+        finally:
+            reset_current_timer(token)
+            total = timer.elapsed()
+            record = kwargs.get("record") or {}
+            data = kwargs.get("data") or {}
+            entry = {
+                "task_id": getattr(getattr(current_task, "request", None), "id", None),
+                "service_type": kwargs.get("service_type"),
+                "service_method": kwargs.get("service_method"),
+                "endpoint": kwargs.get("endpoint"),
+                "record_id": record.get("id") or data.get("slug"),
+                "started_at": timer.started_at,
+                "total_ms": round(total * 1000, 2),
+                "phases_ms": {
+                    name: round(seconds * 1000, 2)
+                    for name, seconds in timer.phases.items()
+                },
+                "error": error,
+            }
+            threshold = _config("REMOTE_API_PROVISIONER_PROFILE_THRESHOLD", 2.0)
+            if profile is not None and total > threshold:
+                entry["profile"] = _write_profile(profile, entry)
+                logger.warning(
+                    "Provisioning task took %.2fs; profile written to %s",
+                    total,
+                    entry["profile"],
+                    extra={k: entry[k] for k in ("service_type", "endpoint")},
+                )
+            store_timing(entry)
+
+    return wrapper
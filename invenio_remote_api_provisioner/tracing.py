@@ -0,0 +1,112 @@
+#
+# This file is part of the invenio-remote-api-provisioner package.
+# Copyright (C) 2024, MESH Research.
+#
+# invenio-remote-api-provisioner is free software; you can redistribute it
+# and/or modify it under the terms of the MIT License; see
+# LICENSE file for more details.
+
+"""OpenTelemetry tracing of provisioning events.
+
+A provisioning event is traced from the service call that triggers it,
+through the Celery task and the request to the remote API, to the
+dispatch of its callback. The trace context is carried in the task's
+``trace_context`` argument and in the callback events, and sent to the
+remote API in the ``traceparent`` header.
+
+``opentelemetry-api`` is an optional dependency. Without it, or without a
+configured tracer provider, spans are not recorded.
+"""
+
+import functools
+from contextlib import contextmanager
+
+try:
+    from opentelemetry import propagate, trace
+except ImportError:  # pragma: no cover
+    trace = None
+
+TRACER_NAME = "invenio_remote_api_provisioner"
+
+
+def _attributes(attributes: dict | None) -> dict:
+    return {k: v for k, v in (attributes or {}).items() if v is not None}
+
+
+@contextmanager
+def start_span(
+    name: str,
+    carrier: dict | None = None,
+    attributes: dict | None = None,
+    kind: str = "INTERNAL",
+):
+    """Start a span as the current span.
+
+    Parameters:
+        name (str): The span name.
+        carrier (dict): A trace context from ``inject_context``, making
+            the span a child of the span that created it. Without one,
+            the span is a child of the current span.
+        attributes (dict): Span attributes. ``None`` values are left out.
+        kind (str): The name of the span kind, e.g. "CLIENT".
+
+    Yields:
+        The span, or ``None`` if OpenTelemetry is not installed.
+    """
+    if trace is None:
+        yield None
+        return
+    context = propagate.extract(carrier) if carrier else None
+    with trace.get_tracer(TRACER_NAME).start_as_current_span(
+        name,
+        context=context,
+        kind=getattr(trace.SpanKind, kind),
+        attributes=_attributes(attributes),
+    ) as span:
+        yield span
+
+
+def set_attributes(span, attributes: dict) -> None:
+    """Add attributes to a span from ``start_span``."""
+    if span is not None:
+        span.set_attributes(_attributes(attributes))
+
+
+def inject_context() -> dict:
+    """Get the current trace context, to be sent with a message or request.
+
+    Returns:
+        dict: The ``traceparent`` (and any ``tracestate``) header values.
+        Empty if there is no current span.
+    """
+    carrier = {}
+    if trace is not None:
+        propagate.inject(carrier)
+    return carrier
+
+
+def traced_task(name: str):
+    """Trace a Celery task as a child of its ``trace_context`` argument.
+
+    Parameters:
+        name (str): The span name.
+    """
+
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with start_span(
+                name,
+                carrier=kwargs.get("trace_context"),
+                attributes={
+                    "provisioner.service_type": kwargs.get("service_type"),
+                    "provisioner.service_method": kwargs.get("service_method"),
+                    "provisioner.endpoint": kwargs.get("endpoint"),
+                },
+                kind="CONSUMER",
+            ):
+                return func(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
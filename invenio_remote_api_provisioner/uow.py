@@ -0,0 +1,58 @@
+#
+# This file is part of the invenio-remote-api-provisioner package.
+# Copyright (C) 2024, MESH Research.
+#
+# invenio-remote-api-provisioner is free software; you can redistribute it
+# and/or modify it under the terms of the MIT License; see
+# LICENSE file for more details.
+
+"""Unit of work operations for invenio-remote-api-provisioner."""
+
+import time
+
+from invenio_records_resources.services.uow import TaskOp
+
+from .metrics import count_event
+from .serializers import get_message_serializer
+from .server_timing import record_post_commit_time
+from .stores import CounterBatch, track_enqueued
+
+
+class ProvisionerTaskOp(TaskOp):
+    """Celery task operation that honours the configured message serializer.
+
+    Behaves exactly like ``TaskOp`` unless the
+    ``REMOTE_API_PROVISIONER_MESSAGE_*`` config asks for compact message
+    encoding, in which case the task is sent with the provisioner's
+    kombu serializer.
+
+    The task is stamped with the time it was queued, and counted in the
+    provisioning metrics and backlog. The time taken to send and count it
+    is added to the service component's time.
+    """
+
+    def on_post_commit(self, uow):
+        """Send the task after the transaction has been committed."""
+        start = time.perf_counter()
+        options = {}
+        serializer = get_message_serializer()
+        if serializer:
+            options["serializer"] = serializer
+        kwargs = {**self._kwargs, "enqueued_at": time.time()}
+        service_type = kwargs.get("service_type", "")
+        endpoint = kwargs.get("endpoint", "")
+        service_method = kwargs.get("service_method", "")
+        try:
+            self._celery_task.apply_async(args=self._args, kwargs=kwargs, **options)
+            # One round trip to the cache, which never raises: the task is
+            # queued and the transaction committed, so a cache outage must
+            # not fail the request now
+            with CounterBatch() as batch:
+                track_enqueued(endpoint=endpoint, batch=batch)
+                count_event(
+                    "enqueued", service_type, endpoint, service_method, batch=batch
+                )
+        finally:
+            record_post_commit_time(
+                service_type, service_method, time.perf_counter() - start
+            )
@@ -8,10 +8,13 @@
 
 """Utility functions for invenio-remote-api-provisioner."""
 
-from invenio_accounts.models import User
+from typing import TYPE_CHECKING
 
+if TYPE_CHECKING:
+    from invenio_accounts.models import User
 
-def get_user_idp_info(user: User) -> dict:
+
+def get_user_idp_info(user: "User") -> dict:
     """Get the user's IDP information.
 
     params:
@@ -35,3 +38,122 @@ def get_user_idp_info(user: User) -> dict:
             }
         )
     return user_info
+
+
+def get_path_value(obj, path: str, default=None):
+    """Get the value at a dotted JSON path in nested dicts and lists.
+
+    params:
+        obj: The dictionary (or record) to read from.
+        path: A dotted path such as ``metadata.title`` or
+            ``metadata.creators.0.person_or_org.name``. A leading ``$.``
+            (as in JSONPath) is ignored.
+        default: The value to return if the path does not exist.
+
+    Returns:
+        The value at the path, or the default.
+    """
+    value = obj
+    if path.startswith("$."):
+        path = path[2:]
+    for part in path.split("."):
+        if isinstance(value, dict) and part in value:
+            value = value[part]
+        elif isinstance(value, (list, tuple)) and part.isdigit():
+            try:
+                value = value[int(part)]
+            except IndexError:
+                return default
+        else:
+            return default
+    return value
+
+
+def get_previous_revision(record) -> dict | None:
+    """Get the last committed revision of a record.
+
+    Service components run before the record is committed, so at that
+    point the record's current ``revision_id`` still identifies the
+    revision stored in the database before the current operation.
+
+    params:
+        record: The record (or community) api object.
+
+    Returns:
+        The previous revision as a dict, or None if the record has no
+        committed revision (e.g. because it is new) or is not versioned.
+    """
+    model = getattr(record, "model", None)
+    if model is None or model.version_id is None:
+        return None
+    try:
+        return record.revisions[record.revision_id]
+    except IndexError:  # the model is not versioned
+        return None
+
+
+def watched_fields_changed(
+    record, previous: dict | None, watch_fields: list[str]
+) -> bool:
+    """Check whether any watched field differs from the previous revision.
+
+    params:
+        record: The record in its current (uncommitted) state.
+        previous: The previous revision of the record, or None.
+        watch_fields: Dotted JSON paths of the fields to compare.
+
+    Returns:
+        True if any watched field changed, or if there is no previous
+        revision to compare with.
+    """
+    if previous is None:
+        return True
+    missing = object()
+    return any(
+        get_path_value(record, path, missing)
+        != get_path_value(previous, path, missing)
+        for path in watch_fields
+    )
+
+
+def project_fields(obj: dict | None, paths: list[str]) -> dict | None:
+    """Copy only the fields at the given dotted paths from a dictionary.
+
+    Path steps only descend into dictionaries; a path that reaches a list
+    (or any other value) copies that whole value.
+
+    params:
+        obj: The dictionary (or record) to project.
+        paths: Dotted paths such as ``metadata.title``.
+
+    Returns:
+        A new nested dict holding only the selected fields, or the
+        original value if it is not a dictionary.
+    """
+    if not isinstance(obj, dict):
+        return obj
+    projected: dict = {}
+    for path in paths:
+        # Find the value to copy first, so missing fields add no parents
+        parts, value = [], obj
+        for part in path.split("."):
+            if not isinstance(value, dict):
+                break
+            if part not in value:
+                parts = []
+                break
+            parts.append(part)
+            value = value[part]
+        source, target = obj, projected
+        for position, part in enumerate(parts):
+            value = source[part]
+            if position == len(parts) - 1:
+                target[part] = value
+                break
+            existing = target.get(part)
+            if existing is value:  # already copied whole by another path
+                break
+            if not isinstance(existing, dict):
+                existing = target[part] = {}
+            source, target = value, existing
+    return projected
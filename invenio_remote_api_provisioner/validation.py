@@ -0,0 +1,84 @@
+#
+# This file is part of the invenio-remote-api-provisioner package.
+# Copyright (C) 2024, MESH Research.
+#
+# invenio-remote-api-provisioner is free software; you can redistribute it
+# and/or modify it under the terms of the MIT License; see
+# LICENSE file for more details.
+
+"""JSON Schema validation of remote API payloads.
+
+An event's ``payload_schema`` is compiled once, at startup, into a
+validator function. With ``fastjsonschema`` installed the schema is
+compiled to generated Python code; otherwise a ``jsonschema`` validator
+for the schema's draft is built and reused.
+"""
+
+from collections.abc import Callable
+
+try:
+    import fastjsonschema
+except ImportError:  # pragma: no cover
+    fastjsonschema = None
+
+
+class PayloadValidationError(Exception):
+    """A payload does not match its endpoint's schema.
+
+    Parameters:
+        message (str): The validation error.
+        payload_object: The invalid payload.
+    """
+
+    def __init__(self, message: str, payload_object=None):
+        """Initialize the error."""
+        super().__init__(message)
+        self.payload_object = payload_object
+
+
+def compile_schema(schema: dict) -> Callable:
+    """Compile a JSON Schema into a payload validator.
+
+    Parameters:
+        schema (dict): The JSON Schema for an endpoint's payloads.
+
+    Returns:
+        Callable: A function taking a payload object and raising
+        ``PayloadValidationError`` if it does not match the schema.
+
+    Raises:
+        ValueError: If the schema itself is invalid.
+    """
+    if fastjsonschema is not None:
+        try:
+            compiled = fastjsonschema.compile(schema)
+        except fastjsonschema.JsonSchemaDefinitionException as e:
+            raise ValueError(f"Invalid payload schema: {e}") from e
+
+        def validate_fast(payload_object) -> None:
+            try:
+                compiled(payload_object)
+            except fastjsonschema.JsonSchemaValueException as e:
+                raise PayloadValidationError(e.message, payload_object) from e
+
+        return validate_fast
+
+    # Only needed without fastjsonschema, and only when schemas are used
+    import jsonschema
+
+    validator_class = jsonschema.validators.validator_for(schema)
+    try:
+        validator_class.check_schema(schema)
+    except jsonschema.SchemaError as e:
+        raise ValueError(f"Invalid payload schema: {e.message}") from e
+    validator = validator_class(schema)
+
+    def validate(payload_object) -> None:
+        error = jsonschema.exceptions.best_match(validator.iter_errors(payload_object))
+        if error is not None:
+            path = "".join(f"[{p!r}]" for p in error.absolute_path)
+            raise PayloadValidationError(
+                f"data{path}: {error.message}", payload_object
+            )
+
+    return validate
@@ -0,0 +1,56 @@
+#
+# This file is part of the invenio-remote-api-provisioner package.
+# Copyright (C) 2024, MESH Research.
+#
+# invenio-remote-api-provisioner is free software; you can redistribute it
+# and/or modify it under the terms of the MIT License; see
+# LICENSE file for more details.
+
+"""Views for invenio-remote-api-provisioner."""
+
+import hmac
+
+from flask import Blueprint, Response, abort, current_app, jsonify, request
+from invenio_access.permissions import Permission, superuser_access
+
+from . import metrics
+from .status import get_status
+
+
+def _has_token() -> bool:
+    token = current_app.config.get("REMOTE_API_PROVISIONER_METRICS_TOKEN")
+    given = request.headers.get("Authorization", "").removeprefix("Bearer ")
+    return bool(token) and hmac.compare_digest(given.encode(), token.encode())
+
+
+def metrics_view():
+    """Serve the provisioning metrics in the Prometheus text format.
+
+    Readable by superusers, or with the metrics bearer token.
+    """
+    if not (_has_token() or Permission(superuser_access).can()):
+        abort(403)
+    if metrics.prometheus_client is None:
+        abort(501, "Provisioning metrics require prometheus_client")
+    body, content_type = metrics.generate_metrics()
+    return Response(body, content_type=content_type)
+
+
+def status_view():
+    """Serve the provisioner's status as JSON.
+
+    Readable by superusers, or with the metrics bearer token.
+    """
+    if not (_has_token() or Permission(superuser_access).can()):
+        abort(403)
+    return jsonify(get_status())
+
+
+def create_blueprint(app):
+    """Create the blueprint for the provisioner's API views."""
+    blueprint = Blueprint(
+        "invenio_remote_api_provisioner", __name__, url_prefix="/remote-api-provisioner"
+    )
+    blueprint.add_url_rule("/metrics", "metrics", metrics_view, methods=["GET"])
+    blueprint.add_url_rule("/status", "status", status_view, methods=["GET"])
+    return blueprint
@@ -15,13 +15,27 @@ history = open("CHANGES.md").read()
 
 install_requires = [
     "click>=7.0",
+    "jsonpatch",
+    "jsonschema",
 ]
 
-tests_require = ["pytest>=7.3.2", "pytest-runner"]
+tests_require = [
+    "opentelemetry-sdk",
+    "prometheus-client",
+    "pytest>=7.3.2",
+    "pytest-benchmark",
+    "pytest-runner",
+]
 
 dev_requires = []
 
-extras_require = {"tests": tests_require, "dev": dev_requires}
+extras_require = {
+    "tests": tests_require,
+    "dev": dev_requires,
+    "metrics": ["prometheus-client"],
+    "tracing": ["opentelemetry-api"],
+    "fast": ["fastjsonschema", "msgpack", "orjson", "zstandard"],
+}
 
 extras_require["all"] = []
 for reqs in extras_require.values():
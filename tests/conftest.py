@@ -97,6 +97,11 @@ def extra_entry_points():
             " invenio_remote_api_provisioner."
             "ext:InvenioRemoteAPIProvisioner"
         ],
+        "invenio_base.api_blueprints": [
+            "invenio_remote_api_provisioner ="
+            " invenio_remote_api_provisioner."
+            "views:create_blueprint"
+        ],
         "invenio_celery.tasks": [
             "invenio_remote_api_provisioner ="
             " invenio_remote_api_provisioner."
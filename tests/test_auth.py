@@ -0,0 +1,107 @@
+import threading
+import time
+
+import pytest
+
+from invenio_remote_api_provisioner.auth import (
+    OAuth2ClientCredentialsAuth,
+    StaticTokenAuth,
+    build_auth_provider,
+)
+
+token_url = "https://auth.example.org/oauth/token"
+spec = {
+    "type": "oauth2_client_credentials",
+    "token_url": token_url,
+    "client_id": "provisioner",
+    "client_secret": "secret",
+    "scope": "documents:write",
+}
+
+
+def test_build_auth_provider():
+    providers = {}
+    provider = build_auth_provider(spec, providers)
+    assert isinstance(provider, OAuth2ClientCredentialsAuth)
+    assert build_auth_provider(dict(spec), providers) is provider
+    static = StaticTokenAuth("12345")
+    assert build_auth_provider(static) is static
+    assert static.get_headers() == {"Authorization": "Bearer 12345"}
+    with pytest.raises(ValueError):
+        build_auth_provider({"type": "unknown"})
+
+
+def test_oauth2_token_is_cached(requests_mock):
+    requests_mock.post(
+        token_url,
+        [
+            {"json": {"access_token": "first", "expires_in": 3600}},
+            {"json": {"access_token": "second", "expires_in": 3600}},
+        ],
+    )
+    provider = build_auth_provider(spec)
+    assert provider.get_headers() == {"Authorization": "Bearer first"}
+    assert provider.get_headers() == {"Authorization": "Bearer first"}
+    assert requests_mock.call_count == 1
+    assert "grant_type=client_credentials" in requests_mock.last_request.text
+
+    # After a 401 the token is fetched again
+    provider.invalidate()
+    assert provider.get_headers() == {"Authorization": "Bearer second"}
+    assert requests_mock.call_count == 2
+
+
+def test_oauth2_token_refreshed_before_expiry(requests_mock):
+    requests_mock.post(
+        token_url,
+        [
+            {"json": {"access_token": "first", "expires_in": 3600}},
+            {"json": {"access_token": "second", "expires_in": 3600}},
+        ],
+    )
+    provider = build_auth_provider(spec)
+    provider.get_token()
+    # Nearly expired: the old token is used while a new one is fetched
+    provider._token["expires_at"] = time.time() + 60
+    assert provider.get_headers() == {"Authorization": "Bearer first"}
+    for _ in range(50):
+        if provider._token["access_token"] == "second":
+            break
+        time.sleep(0.01)
+    assert provider.get_headers() == {"Authorization": "Bearer second"}
+    assert requests_mock.call_count == 2
+
+
+def test_oauth2_refreshed_once_by_concurrent_callers(requests_mock):
+    requests_mock.post(token_url, json={"access_token": "first", "expires_in": 3600})
+    provider = build_auth_provider(spec)
+    provider.get_token()
+    provider._token["expires_at"] = time.time() + 60
+    fetches = []
+    release = threading.Event()
+
+    def slow_fetch():
+        fetches.append(1)
+        release.wait(1)
+        return {**provider._token, "access_token": "second", "expires_at": 1e12}
+
+    provider.fetch_token = slow_fetch
+    callers = [threading.Thread(target=provider.get_token) for _ in range(20)]
+    for caller in callers:
+        caller.start()
+    for caller in callers:
+        caller.join()
+    release.set()
+    for _ in range(50):
+        if provider._token["access_token"] == "second":
+            break
+        time.sleep(0.01)
+    assert provider._token["access_token"] == "second"
+    assert len(fetches) == 1
+
+
+def test_oauth2_shared_cache_key():
+    provider = build_auth_provider(spec)
+    assert build_auth_provider(dict(spec)).cache_key == provider.cache_key
+    for change in ({"audience": "https://api.example.org"}, {"client_secret": "new"}):
+        assert build_auth_provider({**spec, **change}).cache_key != provider.cache_key
@@ -0,0 +1,60 @@
+import threading
+import time
+
+import pytest
+from flask import current_app
+
+from invenio_remote_api_provisioner import executors
+from invenio_remote_api_provisioner.executors import (
+    PayloadTimeoutError,
+    run_payload_function,
+)
+
+
+def payload_function(identity, record=None, delay=0, **kwargs):
+    time.sleep(delay)
+    return {"_internal_id": record["id"], "app": current_app.name}
+
+
+def stuck_payload_function(identity, record=None, release=None, **kwargs):
+    release.wait(10)
+    return {"_internal_id": record["id"]}
+
+
+def test_run_payload_function(app):
+    record = {"id": "abcd-1234"}
+    expected = {"_internal_id": "abcd-1234", "app": app.name}
+    assert run_payload_function(payload_function, None, record=record) == expected
+    assert (
+        run_payload_function(payload_function, None, record=record, timeout=5)
+        == expected
+    )
+
+
+def test_run_payload_function_timeout(app):
+    with pytest.raises(PayloadTimeoutError):
+        run_payload_function(
+            payload_function, None, record={"id": "abcd-1234"}, delay=1, timeout=0.1
+        )
+
+
+def test_run_payload_function_replaces_stuck_pool(app, monkeypatch):
+    monkeypatch.setattr(executors, "PAYLOAD_THREADS", 2)
+    monkeypatch.setattr(executors, "_executors", {})
+    record = {"id": "abcd-1234"}
+    release = threading.Event()
+    try:
+        for _ in range(2):
+            with pytest.raises(PayloadTimeoutError):
+                run_payload_function(
+                    stuck_payload_function,
+                    None,
+                    record=record,
+                    release=release,
+                    timeout=0.1,
+                )
+        # Both threads of the first pool are stuck, so this runs in a new one
+        payload = run_payload_function(payload_function, None, record=record, timeout=5)
+    finally:
+        release.set()
+    assert payload == {"_internal_id": "abcd-1234", "app": app.name}
@@ -0,0 +1,63 @@
+import threading
+from types import MappingProxyType
+
+import pytest
+
+from invenio_remote_api_provisioner.auth import StaticTokenAuth
+from invenio_remote_api_provisioner.headers import build_header_set, get_headers
+
+
+def test_build_header_set():
+    event_config = {
+        "payload": lambda *args, **kwargs: {},
+        "headers": {"X-Source": "works"},
+        "auth_token": "12345",
+    }
+    header_set = build_header_set(event_config)
+    assert dict(header_set) == {
+        "X-Source": "works",
+        "Authorization": "Bearer 12345",
+        "Content-Type": "application/json",
+    }
+    assert isinstance(header_set, MappingProxyType)
+    with pytest.raises(TypeError):
+        header_set["Authorization"] = "Bearer other"
+    # The event config itself is never modified
+    assert event_config["headers"] == {"X-Source": "works"}
+    assert dict(build_header_set({"http_method": "DELETE"})) == {}
+
+
+def test_headers_are_not_shared_between_tasks():
+    event_config = {"headers": {"X-Source": "works"}, "auth_token": "12345"}
+    header_set = build_header_set(event_config)
+    provider = StaticTokenAuth("67890")
+    barrier = threading.Barrier(8)
+    results = {}
+
+    def task(number):
+        headers = get_headers(event_config, provider, header_set)
+        barrier.wait()
+        headers.maps[0]["Idempotency-Key"] = f"task-{number}"
+        headers = headers.new_child({"If-Match": f"etag-{number}"})
+        barrier.wait()
+        results[number] = dict(headers)
+
+    threads = [threading.Thread(target=task, args=(n,)) for n in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    for number, headers in results.items():
+        assert headers == {
+            "X-Source": "works",
+            "Authorization": "Bearer 67890",
+            "Idempotency-Key": f"task-{number}",
+            "If-Match": f"etag-{number}",
+        }
+    assert dict(header_set) == {
+        "X-Source": "works",
+        "Authorization": "Bearer 12345",
+    }
+    assert provider.get_headers() == {"Authorization": "Bearer 67890"}
+    assert event_config["headers"] == {"X-Source": "works"}
@@ -0,0 +1,48 @@
+import json
+import logging
+from types import SimpleNamespace
+
+from invenio_remote_api_provisioner.logs import (
+    LOGGER_NAME,
+    setup_logging,
+    stop_logging,
+)
+
+
+def test_structured_queued_logging(tmp_path):
+    log_file = tmp_path / "provisioner.log"
+    stop_logging()
+    setup_logging(
+        SimpleNamespace(
+            config={
+                "REMOTE_API_PROVISIONER_LOG_ENABLED": True,
+                "REMOTE_API_PROVISIONER_LOG_LEVEL": "INFO",
+                "REMOTE_API_PROVISIONER_LOG_FILE": str(log_file),
+            }
+        )
+    )
+    logger = logging.getLogger(f"{LOGGER_NAME}.tasks")
+    # The application's own handlers still get the records
+    assert logger.propagate
+    logger.debug("Response: %s", {"_id": "2E9SqY0B"})
+    logger.info(
+        "Sent %s update for record %s",
+        "publish",
+        "abcd-1234",
+        extra={"endpoint": "https://example.org/api", "status_code": 200},
+    )
+    try:
+        raise RuntimeError("Remote API unavailable")
+    except RuntimeError:
+        logger.exception("Could not send update")
+    stop_logging()
+
+    entries = [json.loads(line) for line in log_file.read_text().splitlines()]
+    assert len(entries) == 2
+    assert entries[0]["level"] == "INFO"
+    assert entries[0]["logger"] == f"{LOGGER_NAME}.tasks"
+    assert entries[0]["message"] == "Sent publish update for record abcd-1234"
+    assert entries[0]["endpoint"] == "https://example.org/api"
+    assert entries[0]["status_code"] == 200
+    assert entries[1]["level"] == "ERROR"
+    assert "RuntimeError: Remote API unavailable" in entries[1]["exception"]
@@ -0,0 +1,84 @@
+import time
+
+import pytest
+
+from invenio_remote_api_provisioner import metrics
+from invenio_remote_api_provisioner.stores import (
+    get_backlog,
+    track_enqueued,
+    track_started,
+)
+from invenio_remote_api_provisioner.views import metrics_view
+
+prometheus_client = pytest.importorskip("prometheus_client")
+
+LABELS = (
+    "rdm_record",
+    "https://search.hcommons-dev.org/api/v1/documents",
+    "publish",
+)
+
+
+def _sample(name, labels):
+    return prometheus_client.REGISTRY.get_sample_value(name, labels) or 0
+
+
+def test_count_event(app):
+    labels = dict(
+        zip(("service_type", "endpoint", "service_method"), LABELS), outcome="sent"
+    )
+    before = _sample("remote_api_provisioner_events_total", labels)
+    metrics.count_event("sent", *LABELS)
+    assert _sample("remote_api_provisioner_events_total", labels) == before + 1
+
+
+def test_timed():
+    labels = dict(zip(("service_type", "endpoint", "service_method"), LABELS))
+    before = _sample("remote_api_provisioner_http_request_seconds_count", labels)
+    with metrics.timed(metrics.HTTP_REQUEST_SECONDS, *LABELS):
+        time.sleep(0.01)
+    assert (
+        _sample("remote_api_provisioner_http_request_seconds_count", labels)
+        == before + 1
+    )
+    assert _sample("remote_api_provisioner_http_request_seconds_sum", labels) > 0
+
+
+def test_backlog(app):
+    pending, _ = get_backlog()
+    track_enqueued(3)
+    assert get_backlog()[0] == pending + 3
+    track_started(time.time() - 30)
+    pending_after, oldest_age = get_backlog()
+    assert pending_after == pending + 2
+    assert 29 < oldest_age < 60
+
+
+def test_metrics_view(app):
+    with app.test_request_context("/remote-api-provisioner/metrics"):
+        app.preprocess_request()
+        with pytest.raises(Exception) as excinfo:
+            metrics_view()
+        assert excinfo.value.code == 403
+    app.config["REMOTE_API_PROVISIONER_METRICS_TOKEN"] = "secret"
+    try:
+        with app.test_request_context(
+            "/remote-api-provisioner/metrics",
+            headers={"Authorization": "Bearer wrong"},
+        ):
+            app.preprocess_request()
+            with pytest.raises(Exception) as excinfo:
+                metrics_view()
+            assert excinfo.value.code == 403
+        with app.test_request_context(
+            "/remote-api-provisioner/metrics",
+            headers={"Authorization": "Bearer secret"},
+        ):
+            response = metrics_view()
+    finally:
+        app.config["REMOTE_API_PROVISIONER_METRICS_TOKEN"] = None
+    body = response.get_data(as_text=True)
+    assert response.status_code == 200
+    assert "remote_api_provisioner_pending_events" in body
+    assert "remote_api_provisioner_oldest_pending_event_age_seconds" in body
+    assert "remote_api_provisioner_events_total" in body
@@ -24,6 +24,20 @@ def test_extension(app, search_clear):
     assert "invenio-remote-api-provisioner" in app.extensions
 
 
+def test_get_endpoint(app):
+    extension = app.extensions["invenio-remote-api-provisioner"]
+    endpoint = "https://search.hcommons-dev.org/api/v1/documents"
+    assert extension.get_endpoint("rdm_record", endpoint=endpoint) == endpoint
+    assert (
+        extension.get_endpoint("rdm_record", request_url=f"{endpoint}/2E9SqY0B")
+        == endpoint
+    )
+    assert (
+        extension.get_endpoint("community", request_url="https://example.org/api")
+        is None
+    )
+
+
 @pytest.mark.skip(reason="Utility")
 def replace_value_in_dict(input_dict, pairs):
     for k, v in input_dict.items():
@@ -781,3 +795,62 @@ def test_ext_on_remote_api_provisioning_triggered_community(
     assert arrow.get(
         final_read_record.data["custom_fields"]["kcr:commons_search_updated"]
     ) >= arrow.utcnow().shift(seconds=-10)
+
+
+def test_component_watch_fields(
+    app,
+    minimal_record,
+    admin,
+    location,
+    resource_type_v,
+    search_clear,
+    db,
+    monkeypatch,
+):
+    """Republishing sends the event only if a watched field changed."""
+    from invenio_remote_api_provisioner.tasks import send_remote_api_update
+
+    endpoint = "https://watch.example.org/api/v1/documents"
+    events = app.config["REMOTE_API_PROVISIONER_EVENTS"]["rdm_record"]
+    extension = app.extensions["invenio-remote-api-provisioner"]
+    events[endpoint] = {
+        "publish": {
+            "http_method": "PUT",
+            "url_template": "{endpoint}/{record.id}",
+            "payload": format_commons_search_payload,
+            "watch_fields": ["metadata.title"],
+        }
+    }
+    extension.compile_events(app)
+    sent = []
+    monkeypatch.setattr(
+        send_remote_api_update,
+        "apply_async",
+        lambda args=None, kwargs=None, **options: sent.append(kwargs),
+    )
+
+    def sent_count():
+        return len([task for task in sent if task["endpoint"] == endpoint])
+
+    def republish(record_id, **metadata):
+        draft = service.edit(admin.identity, record_id)
+        data = draft.data
+        data["metadata"].update(metadata)
+        service.update_draft(admin.identity, record_id, data)
+        service.publish(admin.identity, record_id)
+        return sent_count()
+
+    service = current_rdm_records.records_service
+    try:
+        # new records are always sent
+        draft = service.create(admin.identity, minimal_record)
+        record_id = service.publish(admin.identity, draft.id).id
+        assert sent_count() == 1
+        assert republish(record_id) == 1
+        # the description is not watched
+        assert republish(record_id, description="A new description") == 1
+        assert republish(record_id, title="A Romans Story 2") == 2
+    finally:
+        events.pop(endpoint)
+        extension.url_templates.pop(("rdm_record", endpoint, "publish"), None)
+        extension.compile_events(app)
@@ -0,0 +1,101 @@
+import gzip
+import uuid
+from datetime import date, datetime
+from decimal import Decimal
+
+import pytest
+from kombu.utils import json as kombu_json
+
+from invenio_remote_api_provisioner.serializers import (
+    SERIALIZER_NAME,
+    compress_payload,
+    decode_message,
+    encode_message,
+    encode_payload,
+    get_message_serializer,
+)
+
+sample_message = {
+    "record": {
+        "id": "1234-abcd",
+        "metadata": {
+            "title": "A Romans Story",
+            "description": "A very long description. " * 400,
+        },
+    },
+    "draft": None,
+    "service_type": "rdm_record",
+    "service_method": "publish",
+}
+
+
+@pytest.mark.parametrize("codec", ["json", "orjson", "msgpack"])
+@pytest.mark.parametrize("compression", [None, "gzip", "zstd"])
+def test_message_roundtrip(codec, compression):
+    if codec != "json":
+        pytest.importorskip(codec)
+    if compression == "zstd":
+        pytest.importorskip("zstandard")
+
+    encoded = encode_message(sample_message, codec, compression, threshold=1024)
+    assert decode_message(encoded) == sample_message
+
+
+@pytest.mark.parametrize("codec", ["json", "orjson", "msgpack"])
+def test_message_values_match_kombu(codec):
+    if codec != "json":
+        pytest.importorskip(codec)
+    message = {
+        "enqueued_at": datetime(2024, 5, 1, 12, 30),
+        "publication_date": date(2024, 5, 1),
+        "price": Decimal("9.99"),
+        "title": "A Romans Story",
+    }
+    if codec != "orjson":  # orjson writes UUIDs as strings itself
+        message["dispatch_id"] = uuid.UUID("12345678123456781234567812345678")
+    expected = kombu_json.loads(kombu_json.dumps(message))
+
+    assert decode_message(encode_message(message, codec)) == expected
+
+
+def test_payload_values_are_not_stringified():
+    with pytest.raises(TypeError):
+        encode_payload({"price": Decimal("9.99")})
+
+
+def test_message_compression_threshold():
+    small = {"id": "1234-abcd"}
+    encoded = encode_message(small, "json", "gzip", threshold=1024)
+    assert encoded[1:2] == b"-"  # too small to be compressed
+
+    encoded = encode_message(sample_message, "json", "gzip", threshold=1024)
+    assert encoded[1:2] == b"g"
+    assert len(encoded) < len(encode_message(sample_message, "json"))
+
+
+def test_get_message_serializer():
+    assert get_message_serializer({}) is None
+    assert (
+        get_message_serializer(
+            {"REMOTE_API_PROVISIONER_MESSAGE_SERIALIZER": "msgpack"}
+        )
+        == SERIALIZER_NAME
+    )
+    assert (
+        get_message_serializer(
+            {"REMOTE_API_PROVISIONER_MESSAGE_COMPRESSION": "gzip"}
+        )
+        == SERIALIZER_NAME
+    )
+
+
+def test_compress_payload():
+    body = b'{"title": "A Romans Story"}' * 100
+    assert compress_payload(body) == (body, None)
+    assert compress_payload(body[:100], "gzip") == (body[:100], None)
+
+    compressed, content_encoding = compress_payload(body, "gzip")
+    assert content_encoding == "gzip"
+    assert gzip.decompress(compressed) == body
+    # The default level trades a little size for speed
+    assert len(compress_payload(body, "gzip", level=1)[0]) >= len(compressed)
@@ -0,0 +1,68 @@
+import time
+
+from flask import Response
+
+from invenio_remote_api_provisioner.server_timing import (
+    add_server_timing,
+    format_server_timing,
+    record_component_time,
+)
+from invenio_remote_api_provisioner.timings import (
+    EventTimer,
+    phase,
+    reset_current_timer,
+    set_current_timer,
+)
+
+
+def test_format_server_timing():
+    assert format_server_timing(
+        {"total": 0.00152, "register": 0.00031, "timing_check": 0.0002}
+    ) == (
+        'provisioner;dur=1.52;desc="Remote API provisioning", '
+        "provisioner-register;dur=0.31, provisioner-timing-check;dur=0.20"
+    )
+
+
+def _component_call():
+    timer = EventTimer()
+    token = set_current_timer(timer)
+    try:
+        with phase("visibility"):
+            time.sleep(0.001)
+        with phase("register"):
+            time.sleep(0.001)
+    finally:
+        reset_current_timer(token)
+    record_component_time("rdm_record", "publish", timer)
+
+
+def test_server_timing_header(app):
+    app.config["REMOTE_API_PROVISIONER_SERVER_TIMING"] = True
+    try:
+        with app.test_request_context("/api/records/abcd-1234/draft/actions/publish"):
+            # e.g. a publish that also updates the community
+            _component_call()
+            _component_call()
+            response = add_server_timing(
+                Response(headers={"Server-Timing": "db;dur=12.00"})
+            )
+    finally:
+        app.config["REMOTE_API_PROVISIONER_SERVER_TIMING"] = False
+    metrics = {
+        m.split(";")[0]: float(m.split("dur=")[1].split(";")[0])
+        for m in response.headers["Server-Timing"].split(", ")
+    }
+    assert metrics["db"] == 12.0
+    assert metrics["provisioner-visibility"] >= 2
+    assert metrics["provisioner-register"] >= 2
+    assert metrics["provisioner"] >= (
+        metrics["provisioner-visibility"] + metrics["provisioner-register"]
+    )
+
+
+def test_server_timing_disabled(app):
+    with app.test_request_context("/api/records/abcd-1234/draft/actions/publish"):
+        _component_call()
+        response = add_server_timing(Response())
+    assert "Server-Timing" not in response.headers
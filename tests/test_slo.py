@@ -0,0 +1,97 @@
+import time
+from types import SimpleNamespace
+
+from invenio_remote_api_provisioner.slo import (
+    get_slo_threshold,
+    on_callback_applied,
+    on_task_success,
+    record_propagation,
+)
+from invenio_remote_api_provisioner.stores import get_counter
+
+ENDPOINT = "https://search.hcommons-dev.org/api/v1/documents"
+
+
+def test_get_slo_threshold(app):
+    assert get_slo_threshold("remote_ack") == 60
+    assert get_slo_threshold("remote_ack", {"slo_thresholds": {"remote_ack": 5}}) == 5
+    assert (
+        get_slo_threshold("callback_applied", {"slo_thresholds": {"remote_ack": 5}})
+        == 120
+    )
+    assert get_slo_threshold("unknown") is None
+
+
+def test_record_propagation(app):
+    events = get_counter("slo-events:remote_ack", ENDPOINT)
+    breaches = get_counter("slo-breaches:remote_ack", ENDPOINT)
+
+    latency = record_propagation("remote_ack", "rdm_record", ENDPOINT, time.time() - 2)
+    assert 2 <= latency < 60
+    assert get_counter("slo-events:remote_ack", ENDPOINT) == events + 1
+    assert get_counter("slo-breaches:remote_ack", ENDPOINT) == breaches
+
+    record_propagation(
+        "remote_ack",
+        "rdm_record",
+        ENDPOINT,
+        time.time() - 2,
+        {"slo_thresholds": {"remote_ack": 1}},
+    )
+    assert get_counter("slo-events:remote_ack", ENDPOINT) == events + 2
+    assert get_counter("slo-breaches:remote_ack", ENDPOINT) == breaches + 1
+
+
+def test_on_callback_applied(app):
+    extension = app.extensions["invenio-remote-api-provisioner"]
+    extension.callback_names.add("tests.callback")
+    before = get_counter("slo-events:callback_applied", ENDPOINT)
+    event = {
+        "service_type": "rdm_record",
+        "service_method": "publish",
+        "endpoint": ENDPOINT,
+        "origin_time": time.time() - 1,
+    }
+    try:
+        on_callback_applied(
+            app,
+            sender=SimpleNamespace(
+                name="tests.callback", request=SimpleNamespace(kwargs=event)
+            ),
+        )
+        on_callback_applied(
+            app,
+            sender=SimpleNamespace(
+                name="tests.other_task", request=SimpleNamespace(kwargs=event)
+            ),
+        )
+    finally:
+        extension.callback_names.discard("tests.callback")
+    assert get_counter("slo-events:callback_applied", ENDPOINT) == before + 1
+
+
+def test_on_task_success(app):
+    extension = app.extensions["invenio-remote-api-provisioner"]
+    extension.callback_names.add("tests.callback")
+    before = get_counter("slo-events:callback_applied", ENDPOINT)
+    request = SimpleNamespace(
+        kwargs={
+            "service_type": "rdm_record",
+            "service_method": "publish",
+            "endpoint": ENDPOINT,
+            "origin_time": time.time() - 1,
+        }
+    )
+    try:
+        # recorded in the app of the task's Celery app
+        on_task_success(
+            sender=SimpleNamespace(
+                name="tests.callback",
+                request=request,
+                app=SimpleNamespace(flask_app=app),
+            )
+        )
+        on_task_success(sender=SimpleNamespace(name="tests.callback", request=request))
+    finally:
+        extension.callback_names.discard("tests.callback")
+    assert get_counter("slo-events:callback_applied", ENDPOINT) == before + 1
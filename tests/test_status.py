@@ -0,0 +1,111 @@
+import json
+import time
+
+import pytest
+
+from invenio_remote_api_provisioner.cli import status
+from invenio_remote_api_provisioner.metrics import count_event
+from invenio_remote_api_provisioner.slo import record_propagation
+from invenio_remote_api_provisioner.status import (
+    estimate_percentile,
+    get_endpoint_status,
+    get_status,
+    track_in_flight,
+)
+from invenio_remote_api_provisioner.stores import (
+    WINDOW_SLOTS,
+    get_current_slot,
+    increment_recent_counter,
+    track_enqueued,
+    track_started,
+)
+from invenio_remote_api_provisioner.views import status_view
+
+ENDPOINT = "https://status.example.org/api/v1/documents"
+
+
+def test_estimate_percentile():
+    # PROPAGATION_BUCKETS start (0.5, 1, 2.5, 5, ...)
+    counts = [50, 40, 9, 1] + [0] * 9
+    assert estimate_percentile(counts, 50) == 0.5
+    assert estimate_percentile(counts, 90) == 1
+    assert estimate_percentile(counts, 99) == 2.5
+    assert estimate_percentile([0] * 12 + [3], 50) == 3600
+    assert estimate_percentile([0] * 13, 50) is None
+
+
+def test_track_in_flight(app):
+    @track_in_flight
+    def task(endpoint=""):
+        return get_endpoint_status(endpoint)["in_flight"]
+
+    before = get_endpoint_status(ENDPOINT)["in_flight"]
+    assert task(endpoint=ENDPOINT) == before + 1
+    assert get_endpoint_status(ENDPOINT)["in_flight"] == before
+
+    # A run that was never uncounted ages out with its slot
+    increment_recent_counter(
+        "in-flight", ENDPOINT, slot=get_current_slot() - WINDOW_SLOTS
+    )
+    assert get_endpoint_status(ENDPOINT)["in_flight"] == before
+
+
+def test_get_endpoint_status(app):
+    before = get_endpoint_status(ENDPOINT)
+
+    track_enqueued(2, endpoint=ENDPOINT)
+    track_started(time.time() - 10, endpoint=ENDPOINT)
+    for outcome in ("sent", "sent", "sent", "failed"):
+        count_event(outcome, "rdm_record", ENDPOINT, "publish")
+    record_propagation("remote_ack", "rdm_record", ENDPOINT, time.time() - 2)
+
+    after = get_endpoint_status(ENDPOINT)
+    assert after["pending"] == before["pending"] + 1
+    assert 9 < after["oldest_pending_age_seconds"] < 60
+    assert after["recent"]["sent"] == before["recent"]["sent"] + 3
+    assert after["recent"]["failed"] == before["recent"]["failed"] + 1
+    assert 0 < after["error_rate"] < 1
+    remote_ack = after["latency_seconds"]["remote_ack"]
+    assert remote_ack["count"] == before["latency_seconds"]["remote_ack"]["count"] + 1
+    assert remote_ack["p50"] is not None
+
+
+def test_get_status(app):
+    status = get_status()
+    assert status["window_seconds"] == 900
+    assert set(status["queues"]) == set(
+        app.config["REMOTE_API_PROVISIONER_METRICS_QUEUES"]
+    )
+    for service_type, endpoints in app.config["REMOTE_API_PROVISIONER_EVENTS"].items():
+        for endpoint in endpoints:
+            assert service_type in status["endpoints"][endpoint]["service_types"]
+
+
+def test_status_view(app):
+    with app.test_request_context("/remote-api-provisioner/status"):
+        app.preprocess_request()
+        with pytest.raises(Exception) as excinfo:
+            status_view()
+        assert excinfo.value.code == 403
+    app.config["REMOTE_API_PROVISIONER_METRICS_TOKEN"] = "secret"
+    try:
+        with app.test_request_context(
+            "/remote-api-provisioner/status",
+            headers={"Authorization": "Bearer secret"},
+        ):
+            response = status_view()
+    finally:
+        app.config["REMOTE_API_PROVISIONER_METRICS_TOKEN"] = None
+    assert response.status_code == 200
+    assert "endpoints" in response.json
+
+
+def test_status_command(app):
+    runner = app.test_cli_runner()
+    result = runner.invoke(status, ["--json"])
+    assert result.exit_code == 0, result.output
+    assert "endpoints" in json.loads(result.output)
+
+    result = runner.invoke(status)
+    assert result.exit_code == 0, result.output
+    assert "Pending tasks:" in result.output
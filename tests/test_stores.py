@@ -0,0 +1,88 @@
+from invenio_cache import current_cache
+
+from invenio_remote_api_provisioner import stores
+from invenio_remote_api_provisioner.stores import (
+    KEY_PREFIX,
+    CounterBatch,
+    get_callable_name,
+    get_counter,
+    get_payload_hash,
+    get_recent_counters,
+    increment_counter,
+    payload_hashes,
+    payload_memo,
+)
+
+from .helpers.api_helpers import format_commons_search_payload
+
+
+def test_payload_hash_is_canonical():
+    url = "https://search.hcommons-dev.org/api/v1/documents"
+    first = get_payload_hash("post", url, {"title": "A", "other_urls": []})
+    second = get_payload_hash("POST", url, {"other_urls": [], "title": "A"})
+    assert first == second
+    assert first != get_payload_hash("PUT", url, {"title": "A", "other_urls": []})
+    assert first != get_payload_hash("POST", url, {"title": "B", "other_urls": []})
+
+
+def test_payload_hash_store(app):
+    endpoint = "https://search.hcommons-dev.org/api/v1/documents"
+    payload_hash = get_payload_hash("POST", endpoint, {"title": "A"})
+    assert payload_hashes.get(endpoint, "abcd-1234") is None
+    payload_hashes.set(endpoint, "abcd-1234", payload_hash)
+    assert payload_hashes.get(endpoint, "abcd-1234") == payload_hash
+    assert payload_hashes.get(endpoint, "efgh-5678") is None
+    payload_hashes.delete(endpoint, "abcd-1234")
+    assert payload_hashes.get(endpoint, "abcd-1234") is None
+
+    before = get_counter("skipped-unchanged", endpoint)
+    increment_counter("skipped-unchanged", endpoint)
+    assert get_counter("skipped-unchanged", endpoint) == before + 1
+
+
+class UnavailableCache:
+    def __getattr__(self, name):
+        raise ConnectionError("cache unavailable")
+
+
+def test_counter_batch(app, monkeypatch):
+    endpoint = "https://search.hcommons-dev.org/api/v1/documents"
+    before = get_counter("batched", endpoint)
+    recent = get_recent_counters(["batched"], endpoint)["batched"]
+    with CounterBatch() as batch:
+        batch.increment("batched", endpoint, delta=2)
+        batch.increment_recent("batched", endpoint)
+        batch.set(f"{KEY_PREFIX}:batched-at", 1700000000.5)
+        assert get_counter("batched", endpoint) == before
+    assert get_counter("batched", endpoint) == before + 2
+    assert get_recent_counters(["batched"], endpoint)["batched"] == recent + 1
+    assert current_cache.get(f"{KEY_PREFIX}:batched-at") == 1700000000.5
+
+    monkeypatch.setattr(stores, "current_cache", UnavailableCache())
+    with CounterBatch() as batch:
+        batch.increment("batched", endpoint)
+    increment_counter("batched", endpoint)
+
+
+def test_payload_memo(app):
+    record = {"id": "abcd-1234", "revision_id": 3}
+    payload = {"_internal_id": "abcd-1234", "title": "A Romans Story"}
+    func = format_commons_search_payload
+    name = get_callable_name(func)
+    assert name == "tests.helpers.api_helpers.format_commons_search_payload"
+    hits, misses = (
+        get_counter("payload-memo-hits", name),
+        get_counter("payload-memo-misses", name),
+    )
+
+    assert payload_memo.get("dispatch-1", func, record, True) is None
+    payload_memo.set("dispatch-1", func, record, True, payload)
+    assert payload_memo.get("dispatch-1", func, record, True) == payload
+    assert payload_memo.get("dispatch-1", func, record, False) is None
+    assert payload_memo.get("dispatch-2", func, record, True) is None
+    assert (
+        payload_memo.get("dispatch-1", func, {**record, "revision_id": 4}, True)
+        is None
+    )
+    assert get_counter("payload-memo-hits", name) == hits + 1
+    assert get_counter("payload-memo-misses", name) == misses + 4
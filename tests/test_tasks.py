@@ -0,0 +1,353 @@
+import gzip
+import json
+from uuid import uuid4
+
+import msgpack
+import pytest
+
+from invenio_remote_api_provisioner.stores import (
+    acknowledged_payloads,
+    get_counter,
+    validators,
+)
+from invenio_remote_api_provisioner.tasks import (
+    get_payload_patch,
+    send_remote_api_update,
+)
+
+TASK_ENDPOINT = "https://tasks.example.org/api/v1/documents"
+
+previous = {
+    "_internal_id": "abcd-1234",
+    "title": "A Romans Story",
+    "other_urls": ["https://example.org/1"],
+}
+
+
+def test_get_payload_patch():
+    payload = {**previous, "title": "A Roman Story", "other_urls": []}
+    patch = get_payload_patch({"payload": previous, "deltas": 3}, payload, {})
+    assert sorted(patch, key=lambda op: op["path"]) == [
+        {"op": "remove", "path": "/other_urls/0"},
+        {"op": "replace", "path": "/title", "value": "A Roman Story"},
+    ]
+    assert get_payload_patch({"payload": previous}, dict(previous), {}) == []
+
+
+def test_get_payload_patch_needs_snapshot():
+    payload = {**previous, "title": "A Roman Story"}
+    assert get_payload_patch(None, payload, {}) is None
+    assert get_payload_patch({"payload": previous, "deltas": 20}, payload, {}) is None
+    assert (
+        get_payload_patch(
+            {"payload": previous, "deltas": 2},
+            payload,
+            {"delta_snapshot_interval": 2},
+        )
+        is None
+    )
+
+
+def title_payload(identity, record=None, **kwargs):
+    return {"_internal_id": record["id"], "title": record["title"]}
+
+
+@pytest.fixture
+def task_event(app):
+    """Configure the ``rdm_record`` ``publish`` event for TASK_ENDPOINT.
+
+    Returns a function that takes the event's config (on top of a PUT to
+    ``{endpoint}/{record.id}`` with ``title_payload``) and compiles it.
+    """
+    events = app.config["REMOTE_API_PROVISIONER_EVENTS"]["rdm_record"]
+    extension = app.extensions["invenio-remote-api-provisioner"]
+    key = ("rdm_record", TASK_ENDPOINT, "publish")
+
+    def configure(**event_config):
+        events[TASK_ENDPOINT] = {
+            "publish": {
+                "http_method": "PUT",
+                "url_template": "{endpoint}/{record.id}",
+                "payload": title_payload,
+                **event_config,
+            }
+        }
+        extension.compile_events(app)
+
+    yield configure
+    events.pop(TASK_ENDPOINT, None)
+    for compiled in (
+        extension.header_sets,
+        extension.payload_templates,
+        extension.payload_validators,
+        extension.url_templates,
+        extension.auth_providers,
+    ):
+        compiled.pop(key, None)
+    extension.compile_events(app)
+
+
+def run_task(record_id, title="A Romans Story", **kwargs):
+    """Run the provisioning task eagerly for a record, as the system."""
+    return send_remote_api_update.apply(
+        kwargs={
+            "identity_id": "system",
+            "record": {"id": record_id, "title": title},
+            "endpoint": TASK_ENDPOINT,
+            "service_type": "rdm_record",
+            "service_method": "publish",
+            **kwargs,
+        },
+        task_id=uuid4().hex,
+    )
+
+
+def test_task_payload_format(app, task_event, requests_mock):
+    record_id = uuid4().hex
+    url = f"{TASK_ENDPOINT}/{record_id}"
+    requests_mock.put(url, json={"ok": True})
+
+    task_event()
+    assert run_task(record_id).successful()
+    request = requests_mock.last_request
+    assert request.headers["Content-Type"] == "application/json"
+    assert json.loads(request.body) == {
+        "_internal_id": record_id,
+        "title": "A Romans Story",
+    }
+
+    task_event(payload_format="msgpack")
+    assert run_task(record_id).successful()
+    request = requests_mock.last_request
+    assert request.headers["Content-Type"] == "application/msgpack"
+    assert msgpack.unpackb(request.body) == {
+        "_internal_id": record_id,
+        "title": "A Romans Story",
+    }
+
+
+def test_task_reuses_encoded_payload_on_retry(app, task_event, requests_mock):
+    record_id = uuid4().hex
+    requests_mock.put(
+        f"{TASK_ENDPOINT}/{record_id}",
+        [{"status_code": 500, "text": "busy"}, {"json": {"ok": True}}],
+    )
+    calls = []
+
+    def counted_payload(identity, record=None, **kwargs):
+        calls.append(record["id"])
+        return title_payload(identity, record=record)
+
+    task_event(payload=counted_payload)
+    assert run_task(record_id).successful()
+    assert requests_mock.call_count == 2
+    assert calls == [record_id]
+    first, second = requests_mock.request_history
+    assert first.body == second.body
+
+
+def test_task_request_compression(app, task_event, requests_mock):
+    record_id = uuid4().hex
+    requests_mock.put(f"{TASK_ENDPOINT}/{record_id}", json={"ok": True})
+
+    task_event(request_compression="gzip", request_compression_threshold=10)
+    assert run_task(record_id).successful()
+    request = requests_mock.last_request
+    assert request.headers["Content-Encoding"] == "gzip"
+    assert request.headers["Content-Type"] == "application/json"
+    assert json.loads(gzip.decompress(request.body))["_internal_id"] == record_id
+
+    task_event(request_compression="gzip")
+    assert run_task(record_id).successful()
+    request = requests_mock.last_request
+    assert "Content-Encoding" not in request.headers
+    assert json.loads(request.body)["_internal_id"] == record_id
+
+
+def test_task_skip_unchanged(app, task_event, requests_mock):
+    record_id = uuid4().hex
+    requests_mock.put(f"{TASK_ENDPOINT}/{record_id}", json={"ok": True})
+    task_event(skip_unchanged=True)
+
+    assert run_task(record_id).successful()
+    assert requests_mock.call_count == 1
+    assert run_task(record_id).result == (None, None)
+    assert requests_mock.call_count == 1
+    assert run_task(record_id, title="A Roman Story").successful()
+    assert requests_mock.call_count == 2
+    assert json.loads(requests_mock.last_request.body)["title"] == "A Roman Story"
+
+
+def test_task_conditional_request_not_modified(app, task_event, requests_mock):
+    record_id = uuid4().hex
+    requests_mock.put(
+        f"{TASK_ENDPOINT}/{record_id}",
+        [
+            {"json": {"ok": True}, "headers": {"ETag": '"v1"'}},
+            {"status_code": 304},
+            {"json": {"ok": True}, "headers": {"ETag": '"v2"'}},
+        ],
+    )
+    task_event(conditional_request="If-None-Match")
+
+    assert run_task(record_id).successful()
+    assert "If-None-Match" not in requests_mock.last_request.headers
+    assert validators.get(TASK_ENDPOINT, record_id) == '"v1"'
+
+    result = run_task(record_id)
+    assert result.successful()
+    assert result.result[1] is None
+    assert requests_mock.call_count == 2
+    assert requests_mock.last_request.headers["If-None-Match"] == '"v1"'
+
+    # A changed payload is a new version, so it is sent unconditionally
+    result = run_task(record_id, title="A Roman Story")
+    assert result.successful()
+    assert requests_mock.call_count == 3
+    request = requests_mock.last_request
+    assert "If-None-Match" not in request.headers
+    assert json.loads(request.body)["title"] == "A Roman Story"
+    assert validators.get(TASK_ENDPOINT, record_id) == '"v2"'
+
+
+def test_task_conditional_request_stale_validator(app, task_event, requests_mock):
+    record_id = uuid4().hex
+    requests_mock.put(
+        f"{TASK_ENDPOINT}/{record_id}",
+        [
+            {"status_code": 412},
+            {"json": {"ok": True}, "headers": {"ETag": '"v3"'}},
+        ],
+    )
+    validators.set(TASK_ENDPOINT, record_id, '"v1"')
+    task_event(conditional_request="If-Match")
+
+    assert run_task(record_id).successful()
+    conditional, unconditional = requests_mock.request_history
+    assert conditional.headers["If-Match"] == '"v1"'
+    assert "If-Match" not in unconditional.headers
+    assert json.loads(unconditional.body)["_internal_id"] == record_id
+    assert validators.get(TASK_ENDPOINT, record_id) == '"v3"'
+
+
+def test_task_delta_patch(app, task_event, requests_mock):
+    record_id = uuid4().hex
+    url = f"{TASK_ENDPOINT}/{record_id}"
+    requests_mock.put(url, json={"ok": True})
+    requests_mock.patch(url, [{"status_code": 409}, {"json": {"ok": True}}])
+    task_event(payload_mode="delta")
+
+    # Nothing acknowledged yet, so the full payload is sent
+    assert run_task(record_id).successful()
+    assert requests_mock.last_request.method == "PUT"
+    assert acknowledged_payloads.get(TASK_ENDPOINT, record_id)["deltas"] == 0
+
+    # The patch conflicts with the remote document, so it is sent in full
+    assert run_task(record_id, title="A Roman Story").successful()
+    patch_request, put_request = requests_mock.request_history[1:]
+    assert patch_request.method == "PATCH"
+    assert patch_request.headers["Content-Type"] == "application/json-patch+json"
+    assert json.loads(patch_request.body) == [
+        {"op": "replace", "path": "/title", "value": "A Roman Story"}
+    ]
+    assert put_request.method == "PUT"
+    assert json.loads(put_request.body)["title"] == "A Roman Story"
+    assert acknowledged_payloads.get(TASK_ENDPOINT, record_id) == {
+        "payload": {"_internal_id": record_id, "title": "A Roman Story"},
+        "deltas": 0,
+    }
+
+    assert run_task(record_id, title="Roman Stories").successful()
+    assert requests_mock.call_count == 4
+    assert requests_mock.last_request.method == "PATCH"
+    assert acknowledged_payloads.get(TASK_ENDPOINT, record_id)["deltas"] == 1
+
+    # Unchanged payloads are not sent at all
+    assert run_task(record_id, title="Roman Stories").result == (None, None)
+    assert requests_mock.call_count == 4
+
+
+def test_task_dead_letters_invalid_payload(app, task_event, requests_mock):
+    record_id = uuid4().hex
+    requests_mock.put(f"{TASK_ENDPOINT}/{record_id}", json={"ok": True})
+    task_event(
+        payload_schema={
+            "type": "object",
+            "properties": {"title": {"type": "string", "maxLength": 10}},
+        }
+    )
+    dead_letters = get_counter("dead-letters", TASK_ENDPOINT)
+
+    # An invalid payload is not sent, nor retried
+    result = run_task(record_id)
+    assert result.successful()
+    assert result.result == (None, None)
+    assert requests_mock.call_count == 0
+    assert get_counter("dead-letters", TASK_ENDPOINT) == dead_letters + 1
+
+    assert run_task(record_id, title="A Story").successful()
+    assert requests_mock.call_count == 1
+    assert get_counter("dead-letters", TASK_ENDPOINT) == dead_letters + 1
+
+
+def test_task_url_template_delete(app, task_event, requests_mock):
+    remote_id = "2E9SqY0Bdd2QL-HGeUuA"
+    requests_mock.delete(f"{TASK_ENDPOINT}/{remote_id}", status_code=200)
+    task_event(
+        http_method="DELETE",
+        payload=None,
+        url_template="{endpoint}/{record.custom_fields.kcr:commons_search_recid}",
+    )
+    record = {
+        "id": uuid4().hex,
+        "custom_fields": {"kcr:commons_search_recid": remote_id},
+    }
+
+    assert run_task(record["id"], record=record).successful()
+    assert requests_mock.call_count == 1
+    assert requests_mock.last_request.method == "DELETE"
+
+
+def test_task_dead_letters_missing_url_value(app, task_event, requests_mock):
+    requests_mock.put(TASK_ENDPOINT, json={"ok": True})
+    task_event(url_template="{endpoint}/{record.custom_fields.remote_id}")
+    dead_letters = get_counter("dead-letters", TASK_ENDPOINT)
+
+    result = run_task(uuid4().hex)
+    assert result.successful()
+    assert result.result == (None, None)
+    assert requests_mock.call_count == 0
+    assert get_counter("dead-letters", TASK_ENDPOINT) == dead_letters + 1
+
+
+def test_task_refreshes_rejected_token(app, task_event, requests_mock):
+    record_id = uuid4().hex
+    token_url = "https://auth.example.org/oauth/token"
+    requests_mock.post(
+        token_url,
+        [
+            {"json": {"access_token": "revoked", "expires_in": 3600}},
+            {"json": {"access_token": "fresh", "expires_in": 3600}},
+        ],
+    )
+    requests_mock.put(
+        f"{TASK_ENDPOINT}/{record_id}",
+        [{"status_code": 401}, {"json": {"ok": True}}],
+    )
+    task_event(
+        auth={
+            "type": "oauth2_client_credentials",
+            "token_url": token_url,
+            "client_id": "tasks",
+            "client_secret": "secret",
+        }
+    )
+
+    result = run_task(record_id)
+    assert result.successful()
+    sent = [r for r in requests_mock.request_history if r.method == "PUT"]
+    assert [r.headers["Authorization"] for r in sent] == [
+        "Bearer revoked",
+        "Bearer fresh",
+    ]
+    assert sent[0].body == sent[1].body
@@ -0,0 +1,137 @@
+import pickle
+
+import pytest
+from invenio_remote_api_provisioner.templates import (
+    MissingSelectorError,
+    PayloadTemplate,
+    compile_format,
+    get_template_paths,
+)
+
+record = {
+    "id": "abcd-1234",
+    "created": "2024-05-01T12:00:00+00:00",
+    "metadata": {
+        "title": "<p>A Romans Story</p>",
+        "creators": [
+            {
+                "person_or_org": {"name": "Brown, Troy"},
+                "role": {"id": "author"},
+            },
+            {"person_or_org": {"name": "Troy Inc."}},
+        ],
+    },
+}
+owner = {"full_name": "My User", "id_from_idp": "myuser"}
+
+template_spec = {
+    "_internal_id": "record.id",
+    "content_type": {"value": "work"},
+    "primary_url": {"format": "https://works.kcommons.org/records/{record.id}"},
+    "title": {"path": "record.metadata.title", "transform": "strip_html"},
+    "description": {"path": "record.metadata.description", "default": ""},
+    "first_creator": "record.metadata.creators[0].person_or_org.name",
+    "creator_names": {
+        "path": "record.metadata.creators[*].person_or_org.name",
+        "transform": "join",
+    },
+    "contributors": {
+        "path": "record.metadata.creators[*]",
+        "each": {
+            "name": "item.person_or_org.name",
+            "role": {"path": "item.role.id", "default": ""},
+        },
+    },
+    "owner": {"fields": {"name": "owner.full_name"}},
+    "publication_date": {"path": "record.created", "transform": "date"},
+}
+
+expected_payload = {
+    "_internal_id": "abcd-1234",
+    "content_type": "work",
+    "primary_url": "https://works.kcommons.org/records/abcd-1234",
+    "title": "A Romans Story",
+    "description": "",
+    "first_creator": "Brown, Troy",
+    "creator_names": "Brown, Troy, Troy Inc.",
+    "contributors": [
+        {"name": "Brown, Troy", "role": "author"},
+        {"name": "Troy Inc.", "role": ""},
+    ],
+    "owner": {"name": "My User"},
+    "publication_date": "2024-05-01",
+}
+
+
+def test_payload_template():
+    template = PayloadTemplate(template_spec)
+    assert template(None, record=record, owner=owner) == expected_payload
+
+
+def test_payload_template_is_serializable():
+    template = pickle.loads(pickle.dumps(PayloadTemplate(template_spec)))
+    assert template.to_dict() == template_spec
+    assert template(None, record=record, owner=owner) == expected_payload
+
+
+def test_get_template_paths():
+    assert get_template_paths(template_spec) == {
+        "record.id",
+        "record.metadata.title",
+        "record.metadata.description",
+        "record.metadata.creators",
+        "owner.full_name",
+        "record.created",
+    }
+    spec = {
+        "files": {
+            "path": "record.files.entries[*]",
+            "each": {
+                "url": {"format": "{record.links.self}/files/{item.key}"},
+                "size": "item.size",
+                "access": "record.access.files",
+            },
+        },
+    }
+    assert get_template_paths(spec) == {
+        "record.files.entries",
+        "record.links.self",
+        "record.access.files",
+    }
+
+
+@pytest.mark.parametrize(
+    "spec",
+    [
+        {"title": 42},
+        {"title": {"default": ""}},
+        {"title": {"path": "[0].title"}},
+        {"title": {"path": "record.title", "transform": "unknown"}},
+    ],
+)
+def test_invalid_payload_template(spec):
+    with pytest.raises(ValueError):
+        PayloadTemplate(spec)
+
+
+def test_url_template():
+    endpoint = "https://search.hcommons-dev.org/api/v1/documents"
+    url_template = compile_format(
+        "{endpoint}/{record.custom_fields.kcr:commons_search_recid}", strict=True
+    )
+    sources = {
+        "endpoint": endpoint,
+        "record": {"custom_fields": {"kcr:commons_search_recid": "2E9SqY0B"}},
+    }
+    assert url_template(sources) == f"{endpoint}/2E9SqY0B"
+    for record in (
+        {},
+        {"custom_fields": {"kcr:commons_search_recid": None}},
+        {"custom_fields": {"kcr:commons_search_recid": ""}},
+    ):
+        with pytest.raises(MissingSelectorError):
+            url_template({"endpoint": endpoint, "record": record})
+
+    # Payload format fields are lenient
+    title = compile_format("{record.metadata.title} ({record.metadata.subtitle})")
+    assert title({"record": {"metadata": {"title": "Romans"}}}) == "Romans ()"
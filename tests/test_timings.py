@@ -0,0 +1,73 @@
+import json
+import pstats
+import time
+
+import pytest
+
+from invenio_remote_api_provisioner.timings import (
+    get_timings,
+    phase,
+    record_timings,
+)
+
+
+@record_timings
+def fake_task(service_type="", endpoint="", service_method="", record=None):
+    with phase("payload_build"):
+        time.sleep(0.01)
+    for _ in range(2):
+        with phase("http"):
+            time.sleep(0.005)
+    if record.get("id") == "fail":
+        raise RuntimeError("Error sending notification")
+    return "ok"
+
+
+EVENT = {
+    "service_type": "rdm_record",
+    "endpoint": "https://search.hcommons-dev.org/api/v1/documents",
+    "service_method": "publish",
+}
+
+
+def test_timing_breakdown(app, tmp_path):
+    timings_file = tmp_path / "timings.jsonl"
+    app.config["REMOTE_API_PROVISIONER_TIMINGS_FILE"] = str(timings_file)
+    try:
+        assert fake_task(**EVENT, record={"id": "abcd-1234"}) == "ok"
+        with pytest.raises(RuntimeError):
+            fake_task(**EVENT, record={"id": "fail"})
+    finally:
+        app.config["REMOTE_API_PROVISIONER_TIMINGS_FILE"] = None
+
+    ok, failed = get_timings()[-2:]
+    assert ok["record_id"] == "abcd-1234"
+    assert ok["endpoint"] == EVENT["endpoint"]
+    assert ok["error"] is None
+    assert set(ok["phases_ms"]) == {"payload_build", "http"}
+    assert ok["phases_ms"]["http"] >= 10
+    assert ok["total_ms"] >= sum(ok["phases_ms"].values())
+    assert failed["error"] == "RuntimeError"
+    lines = timings_file.read_text().splitlines()
+    assert [json.loads(line)["record_id"] for line in lines] == ["abcd-1234", "fail"]
+
+
+def test_phase_without_task():
+    with phase("http"):
+        pass
+
+
+def test_slow_task_profile(app, tmp_path):
+    app.config.update(
+        REMOTE_API_PROVISIONER_PROFILE_SAMPLE_RATE=1.0,
+        REMOTE_API_PROVISIONER_PROFILE_THRESHOLD=0.01,
+        REMOTE_API_PROVISIONER_PROFILE_DIR=str(tmp_path),
+    )
+    try:
+        fake_task(**EVENT, record={"id": "abcd-1234"})
+    finally:
+        app.config["REMOTE_API_PROVISIONER_PROFILE_SAMPLE_RATE"] = 0.0
+    entry = get_timings()[-1]
+    assert entry["profile"].startswith(str(tmp_path))
+    stats = pstats.Stats(entry["profile"])
+    assert any(func[2] == "fake_task" for func in stats.stats)
@@ -0,0 +1,78 @@
+import pytest
+
+from invenio_remote_api_provisioner.tracing import (
+    inject_context,
+    start_span,
+    traced_task,
+)
+
+trace = pytest.importorskip("opentelemetry.trace")
+sdk_trace = pytest.importorskip("opentelemetry.sdk.trace")
+in_memory = pytest.importorskip(
+    "opentelemetry.sdk.trace.export.in_memory_span_exporter"
+)
+export = pytest.importorskip("opentelemetry.sdk.trace.export")
+
+
+@pytest.fixture(scope="module")
+def span_exporter():
+    exporter = in_memory.InMemorySpanExporter()
+    provider = sdk_trace.TracerProvider()
+    provider.add_span_processor(export.SimpleSpanProcessor(exporter))
+    trace.set_tracer_provider(provider)
+    yield exporter
+
+
+def test_trace_context_is_carried_to_the_task(span_exporter):
+    span_exporter.clear()
+
+    @traced_task("remote_api_provisioner.send_remote_api_update")
+    def task(service_type="", endpoint="", service_method="", trace_context=None):
+        return inject_context()
+
+    with start_span("remote_api_provisioner.dispatch"):
+        trace_context = inject_context()
+    assert trace_context["traceparent"]
+
+    # The task runs later, in another process, with only the message
+    task_context = task(
+        service_type="rdm_record",
+        endpoint="https://search.hcommons-dev.org/api/v1/documents",
+        service_method="publish",
+        trace_context=trace_context,
+    )
+    spans = {s.name: s for s in span_exporter.get_finished_spans()}
+    dispatch = spans["remote_api_provisioner.dispatch"]
+    send = spans["remote_api_provisioner.send_remote_api_update"]
+    assert send.context.trace_id == dispatch.context.trace_id
+    assert send.parent.span_id == dispatch.context.span_id
+    assert send.kind == trace.SpanKind.CONSUMER
+    assert send.attributes["provisioner.service_method"] == "publish"
+    assert task_context["traceparent"] != trace_context["traceparent"]
+
+
+def test_traceparent_is_sent_to_remote_api(app, span_exporter, requests_mock):
+    from collections import ChainMap
+
+    from invenio_remote_api_provisioner.tasks import send_request
+
+    span_exporter.clear()
+    url = "https://search.hcommons-dev.org/api/v1/documents/abcd-1234"
+    requests_mock.put(url, json={"_id": "abcd-1234"})
+    headers = ChainMap({}, {"Content-Type": "application/json"})
+    with start_span("remote_api_provisioner.send_remote_api_update"):
+        response = send_request(
+            "put", url, b"{}", headers, ("rdm_record", url, "publish")
+        )
+    assert response.status_code == 200
+    sent_headers = requests_mock.last_request.headers
+    assert sent_headers["Content-Type"] == "application/json"
+    assert "traceparent" not in headers
+
+    spans = {s.name: s for s in span_exporter.get_finished_spans()}
+    client = spans["PUT"]
+    assert client.kind == trace.SpanKind.CLIENT
+    assert client.attributes["http.response.status_code"] == 200
+    trace_id, span_id = sent_headers["traceparent"].split("-")[1:3]
+    assert int(trace_id, 16) == client.context.trace_id
+    assert int(span_id, 16) == client.context.span_id
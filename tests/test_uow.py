@@ -0,0 +1,41 @@
+from flask import g
+
+from invenio_remote_api_provisioner import stores
+from invenio_remote_api_provisioner.uow import ProvisionerTaskOp
+
+ENDPOINT = "https://uow.example.org/api/v1/documents"
+
+
+class UnavailableCache:
+    def __getattr__(self, name):
+        raise ConnectionError("cache unavailable")
+
+
+class FakeTask:
+    def __init__(self):
+        self.sent = []
+
+    def apply_async(self, args=None, kwargs=None, **options):
+        self.sent.append(kwargs)
+
+
+def test_on_post_commit_survives_cache_outage(app, monkeypatch):
+    monkeypatch.setattr(stores, "current_cache", UnavailableCache())
+    task = FakeTask()
+    ProvisionerTaskOp(
+        task, endpoint=ENDPOINT, service_type="rdm_record", service_method="publish"
+    ).on_post_commit(None)
+    assert task.sent[0]["endpoint"] == ENDPOINT
+    assert task.sent[0]["enqueued_at"]
+
+
+def test_on_post_commit_is_timed(app):
+    task = FakeTask()
+    with app.test_request_context("/api/records/abcd-1234/draft/actions/publish"):
+        ProvisionerTaskOp(
+            task, endpoint=ENDPOINT, service_type="rdm_record", service_method="publish"
+        ).on_post_commit(None)
+        timings = g.remote_api_provisioner_timings
+    assert len(task.sent) == 1
+    assert timings["post_commit"] > 0
+    assert timings["total"] >= timings["post_commit"]
@@ -0,0 +1,103 @@
+from invenio_remote_api_provisioner.components import get_event_record_fields
+from invenio_remote_api_provisioner.utils import (
+    get_path_value,
+    project_fields,
+    watched_fields_changed,
+)
+
+record = {
+    "id": "abcd-1234",
+    "metadata": {
+        "title": "A Romans Story",
+        "creators": [{"person_or_org": {"name": "Brown, Troy"}}],
+    },
+    "custom_fields": {"kcr:commons_search_recid": "2E9SqY0Bdd2QL-HGeUuA"},
+    "stats": {"this_version": {"views": 3}},
+}
+
+
+def test_get_path_value():
+    assert get_path_value(record, "metadata.title") == "A Romans Story"
+    assert get_path_value(record, "$.metadata.title") == "A Romans Story"
+    assert (
+        get_path_value(record, "metadata.creators.0.person_or_org.name")
+        == "Brown, Troy"
+    )
+    assert (
+        get_path_value(record, "custom_fields.kcr:commons_search_recid")
+        == "2E9SqY0Bdd2QL-HGeUuA"
+    )
+    assert get_path_value(record, "metadata.creators.1") is None
+    assert get_path_value(record, "metadata.subjects", []) == []
+
+
+def test_watched_fields_changed():
+    watch_fields = ["metadata.title", "metadata.creators"]
+    previous = {
+        **record,
+        "stats": {"this_version": {"views": 2}},
+    }
+    assert not watched_fields_changed(record, previous, watch_fields)
+    assert watched_fields_changed(record, previous, ["stats"])
+    assert watched_fields_changed(record, None, watch_fields)
+
+    retitled = {**previous, "metadata": {**record["metadata"], "title": "B"}}
+    assert watched_fields_changed(record, retitled, watch_fields)
+
+
+def test_project_fields():
+    assert project_fields(record, ["id", "metadata.title", "stats.missing"]) == {
+        "id": "abcd-1234",
+        "metadata": {"title": "A Romans Story"},
+    }
+    assert project_fields(record, ["metadata.title", "metadata"]) == {
+        "metadata": record["metadata"]
+    }
+    assert project_fields(None, ["id"]) is None
+
+
+def test_get_event_record_fields():
+    template = {
+        "title": "record.metadata.title",
+        "contributors": {
+            "path": "record.metadata.creators[*]",
+            "each": {"name": "item.person_or_org.name"},
+        },
+        "owner": "owner.full_name",
+    }
+    assert get_event_record_fields({"payload_template": template}) == {
+        "id",
+        "slug",
+        "revision_id",
+        "metadata.title",
+        "metadata.creators",
+    }
+    # output keys named like field spec keys are still output keys
+    template = {
+        "title": "record.metadata.title",
+        "format": "record.metadata.resource_type.id",
+        "value": {"path": "record.metadata.rights[*]"},
+        "fields": {"fields": {"path": "record.metadata.publisher"}},
+    }
+    assert get_event_record_fields(
+        {"payload_template": template, "url_template": "https://x.org/{record.id}"}
+    ) == {
+        "id",
+        "slug",
+        "revision_id",
+        "metadata.title",
+        "metadata.resource_type.id",
+        "metadata.rights",
+        "metadata.publisher",
+    }
+    # callables might read anything unless fields are declared
+    assert (
+        get_event_record_fields(
+            {"payload_template": template, "url_factory": lambda *a, **k: ""}
+        )
+        is None
+    )
+    assert get_event_record_fields(
+        {"payload": lambda *a, **k: {}, "record_fields": ["custom_fields"]}
+    ) == {"id", "slug", "revision_id", "custom_fields"}
+    assert get_event_record_fields({"payload": lambda *a, **k: {}}) is None
@@ -0,0 +1,41 @@
+import pytest
+
+from invenio_remote_api_provisioner import validation
+from invenio_remote_api_provisioner.validation import (
+    PayloadValidationError,
+    compile_schema,
+)
+
+schema = {
+    "type": "object",
+    "required": ["_internal_id", "title"],
+    "properties": {
+        "_internal_id": {"type": "string"},
+        "title": {"type": "string", "minLength": 1},
+        "contributors": {
+            "type": "array",
+            "items": {"type": "object", "required": ["name"]},
+        },
+    },
+}
+
+
+@pytest.mark.parametrize("fast", [True, False])
+def test_compile_schema(fast, monkeypatch):
+    if not fast:
+        monkeypatch.setattr(validation, "fastjsonschema", None)
+    elif validation.fastjsonschema is None:
+        pytest.skip("fastjsonschema is not installed")
+    validate = compile_schema(schema)
+
+    validate({"_internal_id": "abcd-1234", "title": "A Romans Story"})
+    invalid = {"_internal_id": "abcd-1234", "title": ""}
+    with pytest.raises(PayloadValidationError) as e:
+        validate(invalid)
+    assert "title" in str(e.value)
+    assert e.value.payload_object is invalid
+    with pytest.raises(PayloadValidationError):
+        validate({"_internal_id": "abcd-1234", "title": "A", "contributors": [{}]})
+
+    with pytest.raises(ValueError):
+        compile_schema({"type": "not-a-type"})